@@ -11,38 +11,122 @@ import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 import seaborn as sns
 import random
+import os
+import sys
+import hashlib
+import json
+import io
+import glob
+import multiprocessing
+import shutil
+import sqlite3
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+import functools
+import copy
+import pickle
+import logging
+import threading
+import time
+import hmac
+import cProfile
+import contextvars
+import flask
+from types import SimpleNamespace
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshots share their frames between request threads, so a write through any frame or array
+# taken from one must copy rather than touch the snapshot. pandas 3 always copies on write;
+# older versions have to be asked
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 ### FOR LOCAL HOSTING 
-# Read the CSV file
-df = pd.read_csv('Test Financial Data.csv')
+# Read the CSV file (or a directory / glob pattern of CSV exports)
+DATA_FILE = os.environ.get('FINANCE_DASHBOARD_DATA', 'Test Financial Data.csv')
 ###
 
-# Process the Date and Amount columns
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-df['Amount'] = pd.to_numeric(df['Amount'].replace({',': '', '$': ''}, regex=True), errors='coerce')
-df = df.dropna(subset=['Amount', 'Date'])
-df['Description (Transaction Detail)'] = df['Description (Transaction Detail)'].astype(str)
+# Processes used to parse a directory of exports; defaults to one per core
+INGEST_WORKERS = int(os.environ.get('FINANCE_DASHBOARD_INGEST_WORKERS', 0)) or os.cpu_count() or 1
 
-# Filter income and expense data
-income_data = df[df['Category'] == 'INCOME']
 
-expenses_data = df[df['Category'] == 'EXPENSES'].copy()
-expenses_data['Amount'] = expenses_data['Amount'] * -1  # Make amounts positive
+def normalize_transactions(df):
+    # Process the Date and Amount columns
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df['Amount'] = pd.to_numeric(df['Amount'].replace({',': '', '$': ''}, regex=True), errors='coerce') * 100
+    df = df.dropna(subset=['Amount', 'Date'])
+    df['Amount'] = df['Amount'].round().astype(np.int64)  # Integer cents, so sums stay exact
+    df['Description (Transaction Detail)'] = df['Description (Transaction Detail)'].astype(str)
+    return df
 
-debt_data = df[df['Category'] == 'DEBT'].copy()
-debt_data['Amount'] = debt_data['Amount'] * -1  # Make amounts positive
 
-payment_data = df[df['Category'] == 'PAYMENTS'].copy()
-payment_data['Amount'] = payment_data['Amount'] * -1  # Make amounts positive
+def to_dollars(cents):
+    # Amounts are held as integer cents everywhere; convert only for display
+    return cents / 100
 
-utilities_data = df[df['Category'] == 'UTILITIES'].copy()
-utilities_data['Amount'] = utilities_data['Amount'] * -1  # Make amounts positive
 
-insurance_data = df[df['Category'] == 'INSURANCE'].copy()
-insurance_data['Amount'] = insurance_data['Amount'] * -1  # Make amounts positive
+def read_transactions(path):
+    return normalize_transactions(pd.read_csv(path))
 
-all_expense_data = df[df['Category'].isin(['EXPENSES', 'PAYMENTS', 'UTILITIES', 'INSURANCE'])].copy()
-all_expense_data['Amount'] = all_expense_data['Amount'] * -1  # Make amounts positive
+
+def source_files(source):
+    # A single CSV, every CSV in a directory, or the files matching a glob pattern
+    if os.path.isdir(source):
+        files = sorted(glob.glob(os.path.join(source, '*.csv')))
+    elif not os.path.exists(source) and any(char in source for char in '*?['):
+        files = sorted(glob.glob(source))
+    else:
+        return [source]
+    if not files:
+        raise FileNotFoundError(f"No CSV files found for {source}")
+    return files
+
+
+# Name given to ingestion worker processes. Spawn and forkserver workers receive their name before
+# they re-run the main script (earlier than any pool initializer), so the module can tell at
+# import time that it is loading inside a worker and skip everything but parsing
+INGEST_WORKER_NAME = 'finance-dashboard-ingest'
+
+
+def ingest_context():
+    # The default multiprocessing context, with every process it starts named INGEST_WORKER_NAME
+    context = copy.copy(multiprocessing.get_context())
+    context.Process = functools.partial(context.Process, name=INGEST_WORKER_NAME)
+    return context
+
+
+def read_transaction_files(paths, workers=INGEST_WORKERS):
+    # Parse the exports concurrently, one file per task, with the same normalization as a single file.
+    # Workers run pandas' own read_csv: sending a function of this module would make the pool pickle
+    # a reference to it, which waits on the import lock while the first load runs during import
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths)), mp_context=ingest_context()) as pool:
+            frames = [normalize_transactions(rows) for rows in pool.map(pd.read_csv, paths)]
+    else:
+        frames = [read_transactions(path) for path in paths]
+
+    df = pd.concat(
+        [frame.assign(_source=i) for i, frame in enumerate(frames)],
+        ignore_index=True
+    )
+
+    # Overlapping exports repeat rows; keep each transaction once, but keep genuine repeats
+    # (the same purchase twice in one file) by numbering copies within each file
+    key = ['Date', 'Sub-Category (Account)', 'Amount', 'Description (Transaction Detail)']
+    df['_copy'] = df.groupby(['_source'] + key, dropna=False).cumcount()
+    df = df.drop_duplicates(subset=key + ['_copy'])
+    return df.drop(columns=['_source', '_copy']).sort_values('Date', kind='stable')
 
 
 def generate_master_palette(n_colors):
@@ -86,74 +170,1409 @@ debt_colors_list = master_palette[40:80]
 cash_colors_list = master_palette[80:120]
 expense_colors_list = master_palette[2:500:3]
 
-def assign_colors(accounts, color_list):
-    return {acc: color_list[i % len(color_list)] for i, acc in enumerate(accounts)}
+# Color for accounts a group has none for. Color arrays carry it in one extra last slot, so
+# indexing with code -1 (an account missing from the dictionary) lands on it.
+fallback_color = '#888'
 
 
-income_colors = assign_colors(income_data['Sub-Category (Account)'].unique(), income_colors_list)
-debt_colors = assign_colors(debt_data['Sub-Category (Account)'].unique(), debt_colors_list)
-cash_colors = assign_colors(df[df['Category'] == 'CASH_ON_HAND']['Sub-Category (Account)'].unique(), cash_colors_list)
-expense_colors = assign_colors(all_expense_data['Sub-Category (Account)'].unique(), expense_colors_list)
+def build_account_dictionary(accounts):
+    # Sorted, so code order is name order and groupbys on codes list accounts as they did on names
+    return pd.Index(accounts.dropna().astype(str).unique()).sort_values()
 
 
-# Sorted list of all income categories by total amount
-income_type_sorted = (
-    income_data.groupby('Sub-Category (Account)')['Amount']
-    .sum()
-    .sort_values(ascending=False)
-    .index.tolist()
-)
+def encode_accounts(df, accounts):
+    # Account names become integer codes into the dataset's account dictionary
+    df['Sub-Category (Account)'] = pd.Categorical(df['Sub-Category (Account)'], categories=accounts)
+    return df
 
-# Sorted list of all expense categories by category (payments, utilities & insurance, expenses) then by total amount
-sorted_payments = (
-    payment_data.groupby('Sub-Category (Account)')['Amount']
-    .sum()
-    .sort_values(ascending=False)
-    .index.tolist()
-)
 
-sorted_utilities_insurance = (
-    pd.concat([utilities_data, insurance_data])
-    .groupby('Sub-Category (Account)')['Amount']
-    .sum()
-    .sort_values(ascending=False)
-    .index.tolist()
-)
+def recode_accounts(frame, accounts):
+    # The same rows under a grown dictionary, leaving the original frame untouched
+    return frame.assign(**{
+        'Sub-Category (Account)': frame['Sub-Category (Account)'].cat.set_categories(accounts)
+    })
 
 
-sorted_expenses = (
-    expenses_data.groupby('Sub-Category (Account)')['Amount']
-    .sum()
-    .sort_values(ascending=False)
-    .index.tolist()
-)
+def assign_colors(codes, n_accounts, color_list):
+    # Color per account code, handed out in order of first appearance within the group
+    colors = np.full(n_accounts + 1, fallback_color, dtype=object)
+    for i, code in enumerate(pd.unique(codes[codes >= 0])):
+        colors[code] = color_list[i % len(color_list)]
+    return colors
 
-# Combine all sorted categories preserving the desired order
 
-# expense_categories_sorted = pd.concat([
-#     sorted_payments,
-#     sorted_utilities_insurance,
-#     sorted_expenses
-# ]).index.tolist()
+def account_colors(ds, colors, accounts):
+    return colors[ds.accounts.get_indexer(accounts)].tolist()
 
-expense_categories_sorted = (
-    all_expense_data.groupby('Sub-Category (Account)')['Amount']
-    .sum()
-    .sort_values(ascending=False)
-    .index.tolist()
-)
 
-# Save for use in Dash stores
-grouped_expense_categories = {
-    'Debt Payments': sorted_payments,
-    'Utilities & Insurance': sorted_utilities_insurance,
-    'Categories': sorted_expenses
+# Categories behind each per-category frame of the dataset
+CATEGORY_FRAMES = {
+    'income_data': ['INCOME'],
+    'cash_data': ['CASH_ON_HAND'],
+    'expenses_data': ['EXPENSES'],
+    'debt_data': ['DEBT'],
+    'payment_data': ['PAYMENTS'],
+    'utilities_data': ['UTILITIES'],
+    'insurance_data': ['INSURANCE'],
+    'all_expense_data': ['EXPENSES', 'PAYMENTS', 'UTILITIES', 'INSURANCE']
+}
+
+# Categories whose amounts are negated so they read positive
+OUTFLOW_CATEGORIES = ['EXPENSES', 'DEBT', 'PAYMENTS', 'UTILITIES', 'INSURANCE']
+
+
+def split_transactions(df):
+    frames = {}
+    for name, categories in CATEGORY_FRAMES.items():
+        if set(categories) <= set(OUTFLOW_CATEGORIES):
+            subset = df[df['Category'].isin(categories)].copy()
+            subset['Amount'] = subset['Amount'] * -1  # Make amounts positive
+        else:
+            subset = df[df['Category'].isin(categories)]
+        frames[name] = subset
+    return frames
+
+
+def extend_colors(colors, previous_accounts, accounts, new_codes, color_list):
+    # Same assignment as assign_colors over the combined rows: existing accounts keep their
+    # colors (under their possibly new codes) and new ones take the next slots
+    extended = np.full(len(accounts) + 1, fallback_color, dtype=object)
+    extended[accounts.get_indexer(previous_accounts)] = colors[:-1]
+    assigned = int((colors[:-1] != fallback_color).sum())
+    for code in pd.unique(new_codes[new_codes >= 0]):
+        if extended[code] == fallback_color:
+            extended[code] = color_list[assigned % len(color_list)]
+            assigned += 1
+    return extended
+
+
+def display_descriptions(data):
+    # Transaction detail shown in tables, falling back to the account when the description is blank
+    return data['Description (Transaction Detail)'].where(
+        ~data['Description (Transaction Detail)'].str.strip().str.lower().isin(['', 'nan']),
+        data['Sub-Category (Account)']
+    )
+
+
+def account_totals(data):
+    totals = data.groupby('Sub-Category (Account)', observed=True)['Amount'].sum()
+    totals.index = totals.index.astype(str)  # By name, so totals over different dictionaries line up
+    record_scan('groupby', data, totals)
+    return totals
+
+
+def accounts_by_total(totals):
+    # Accounts ordered by their total amount, largest first
+    return totals.sort_values(ascending=False).index.tolist()
+
+
+def group_account_totals(frames):
+    return {
+        'income': account_totals(frames.income_data),
+        'payments': account_totals(frames.payment_data),
+        'utilities_insurance': account_totals(pd.concat([frames.utilities_data, frames.insurance_data])),
+        'expenses': account_totals(frames.expenses_data),
+        'all_expenses': account_totals(frames.all_expense_data)
+    }
+
+
+# Row counts offered by the Top Transactions table
+top_n_options = [5, 10, 25, 50]
+# Number of largest transactions precomputed per year and per (year, month); never fewer than the
+# largest row count offered, so every option is served in full from the index
+TOP_TRANSACTIONS_K = int(os.environ.get('TOP_TRANSACTIONS_K', 50))
+if TOP_TRANSACTIONS_K < max(top_n_options):
+    logger.warning("TOP_TRANSACTIONS_K=%s is below the largest table size; using %s", TOP_TRANSACTIONS_K, max(top_n_options))
+    TOP_TRANSACTIONS_K = max(top_n_options)
+
+
+def top_k_per_group(group_keys, amounts, k):
+    # Order rows by group, then largest amount first (ties keep file order, like nlargest)
+    positions = np.arange(len(amounts))
+    order = np.lexsort((positions, -amounts, group_keys))
+    keys, starts = np.unique(group_keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    return {
+        int(key): order[start:min(end, start + k)].astype(np.int32)
+        for key, start, end in zip(keys, starts, ends)
+    }
+
+
+def build_top_transactions_index(data, k=TOP_TRANSACTIONS_K):
+    amounts = data['Amount'].to_numpy()
+    years = data['Date'].dt.year.to_numpy().astype(np.int64)
+    months = data['Date'].dt.month.to_numpy().astype(np.int64)
+
+    by_year = top_k_per_group(years, amounts, k)
+    by_month = {
+        (key // 100, key % 100): rows
+        for key, rows in top_k_per_group(years * 100 + months, amounts, k).items()
+    }
+    return by_year, by_month
+
+
+def extend_top_k(index, new_keys, amounts, new_start, k, key_of=int):
+    # Re-rank only the groups that received rows from new_start on; a group's new top k
+    # is always among its previous top k plus its new rows
+    merged = dict(index)
+    new_rows = np.arange(new_start, len(amounts))
+    for key in np.unique(new_keys):
+        candidates = np.concatenate((
+            index.get(key_of(key), np.empty(0, dtype=np.int32)),
+            new_rows[new_keys == key]
+        ))
+        order = np.lexsort((candidates, -amounts[candidates]))
+        merged[key_of(key)] = candidates[order[:k]].astype(np.int32)
+    return merged
+
+
+def extend_top_transactions_index(by_year, by_month, amounts, new_data, k=TOP_TRANSACTIONS_K):
+    # amounts: every row's amount by position (or at least those of the new rows and the indexed ones);
+    # new_data: the rows appended at the end
+    new_start = len(amounts) - len(new_data)
+    years = new_data['Date'].dt.year.to_numpy().astype(np.int64)
+    months = new_data['Date'].dt.month.to_numpy().astype(np.int64)
+
+    by_year = extend_top_k(by_year, years, amounts, new_start, k)
+    by_month = extend_top_k(
+        by_month, years * 100 + months, amounts, new_start, k,
+        key_of=lambda key: divmod(int(key), 100)
+    )
+    return by_year, by_month
+
+
+def top_transaction_rows(ds, year, month, n):
+    if month == 0:
+        rows = ds.top_transactions_by_year.get(int(year))
+    else:
+        rows = ds.top_transactions_by_month.get((int(year), int(month)))
+    if rows is None:
+        return np.empty(0, dtype=np.int32)
+    return rows[:n]
+
+
+def build_range_sums(data):
+    # Per-account cumulative sums over date-sorted rows, so any range total is two binary searches
+    range_sums = {}
+    ordered = data.sort_values('Date', kind='stable')
+    for account, group in ordered.groupby('Sub-Category (Account)', sort=False, observed=True):
+        dates = group['Date'].to_numpy().astype('datetime64[D]')
+        cumsum = np.concatenate(([0], np.cumsum(group['Amount'].to_numpy())))
+        range_sums[account] = (dates, cumsum)
+    return range_sums
+
+
+def extend_range_sums(range_sums, new_data):
+    # Only accounts with new rows get new arrays; the rest are shared with the previous snapshot
+    range_sums = dict(range_sums)
+    ordered = new_data.sort_values('Date', kind='stable')
+    for account, group in ordered.groupby('Sub-Category (Account)', sort=False, observed=True):
+        new_dates = group['Date'].to_numpy().astype('datetime64[D]')
+        new_amounts = group['Amount'].to_numpy()
+        if account not in range_sums:
+            range_sums[account] = (new_dates, np.concatenate(([0], np.cumsum(new_amounts))))
+            continue
+
+        dates, cumsum = range_sums[account]
+        if new_dates[0] >= dates[-1]:
+            # Usual case: the new rows are the latest, so the prefix sums just continue
+            range_sums[account] = (
+                np.concatenate((dates, new_dates)),
+                np.concatenate((cumsum, cumsum[-1] + np.cumsum(new_amounts)))
+            )
+        else:
+            # Back-dated rows: re-accumulate this account only
+            all_dates = np.concatenate((dates, new_dates))
+            order = np.argsort(all_dates, kind='stable')
+            amounts = np.concatenate((np.diff(cumsum), new_amounts))[order]
+            range_sums[account] = (all_dates[order], np.concatenate(([0], np.cumsum(amounts))))
+    return range_sums
+
+
+def range_total(range_sums, accounts, start_date, end_date):
+    # Total of the selected accounts with start_date <= Date <= end_date
+    start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    end = np.datetime64(pd.Timestamp(end_date).date(), 'D')
+    total = 0
+    for account in accounts:
+        if account not in range_sums:
+            continue
+        dates, cumsum = range_sums[account]
+        total += cumsum[np.searchsorted(dates, end, side='right')] - cumsum[np.searchsorted(dates, start, side='left')]
+    return total
+
+
+def range_period_totals(range_sums, accounts, start_date, end_date, freq='M'):
+    # Totals per calendar month (or year) clipped to the range, from prefix-sum differences
+    periods = pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq=freq)
+    edges = [pd.Timestamp(start_date)] + [p.start_time for p in periods[1:]] + [pd.Timestamp(end_date) + pd.Timedelta(days=1)]
+    edges = pd.DatetimeIndex(edges).to_numpy().astype('datetime64[D]')
+
+    totals = np.zeros(len(periods), dtype=np.int64)
+    for account in accounts:
+        if account not in range_sums:
+            continue
+        dates, cumsum = range_sums[account]
+        totals += np.diff(cumsum[np.searchsorted(dates, edges, side='left')])
+
+    if freq == 'M':
+        index = pd.MultiIndex.from_arrays([periods.year, periods.month])
+    else:
+        index = pd.Index(periods.year)
+    return pd.Series(totals, index=index)
+
+
+def build_daily_cube(data):
+    # Dense day x account totals for every (year, month) that has rows
+    # The account axis is the whole account dictionary, indexed by code
+    accounts = data['Sub-Category (Account)'].cat.categories
+    codes = data['Sub-Category (Account)'].cat.codes.to_numpy()
+    years = data['Date'].dt.year.to_numpy().astype(np.int64)
+    months = data['Date'].dt.month.to_numpy().astype(np.int64)
+    days = data['Date'].dt.day.to_numpy().astype(np.int64)
+    amounts = data['Amount'].to_numpy()
+
+    valid = codes >= 0
+    month_keys, month_codes = np.unique((years * 100 + months)[valid], return_inverse=True)
+    totals = np.zeros((len(month_keys), 31, len(accounts)), dtype=np.int64)
+    counts = np.zeros((len(month_keys), len(accounts)), dtype=np.int32)
+    np.add.at(totals, (month_codes, days[valid] - 1, codes[valid]), amounts[valid])
+    np.add.at(counts, (month_codes, codes[valid]), 1)
+
+    cube = {}
+    for i, key in enumerate(month_keys):
+        year, month = divmod(int(key), 100)
+        # Keep which accounts had rows so zero-sum accounts still get a trace, as a groupby would
+        cube[(year, month)] = (totals[i, :calendar.monthrange(year, month)[1]], counts[i] > 0)
+    return {'accounts': pd.Index(accounts), 'months': cube}
+
+
+def extend_daily_cube(cube, new_data):
+    # Add new rows into copies of the months they touch; other months are shared with the previous snapshot
+    accounts = new_data['Sub-Category (Account)'].cat.categories
+    if accounts.equals(cube['accounts']):
+        months = dict(cube['months'])
+    else:
+        # A new account widens every month to the grown dictionary
+        cols = accounts.get_indexer(cube['accounts'])
+        months = {}
+        for key, (totals, present) in cube['months'].items():
+            widened = np.zeros((totals.shape[0], len(accounts)), dtype=np.int64)
+            widened[:, cols] = totals
+            widened_present = np.zeros(len(accounts), dtype=bool)
+            widened_present[cols] = present
+            months[key] = (widened, widened_present)
+
+    codes = new_data['Sub-Category (Account)'].cat.codes.to_numpy()
+    valid = codes >= 0
+    dates = new_data['Date'][valid]
+    codes = codes[valid]
+    month_keys = (dates.dt.year * 100 + dates.dt.month).to_numpy()
+    days = dates.dt.day.to_numpy()
+    amounts = new_data['Amount'].to_numpy()[valid]
+
+    for key in np.unique(month_keys):
+        year, month = divmod(int(key), 100)
+        if (year, month) in months:
+            totals, present = months[(year, month)]
+            totals, present = totals.copy(), present.copy()
+        else:
+            totals = np.zeros((calendar.monthrange(year, month)[1], len(accounts)), dtype=np.int64)
+            present = np.zeros(len(accounts), dtype=bool)
+        rows = month_keys == key
+        np.add.at(totals, (days[rows] - 1, codes[rows]), amounts[rows])
+        present[codes[rows]] = True
+        months[(year, month)] = (totals, present)
+    return {'accounts': accounts, 'months': months}
+
+
+def daily_cube_slice(cube, year, month, accounts):
+    # Day x account frame for one month, limited to the selected accounts that have rows
+    start_date = pd.Timestamp(year=int(year), month=int(month), day=1)
+    all_days = pd.date_range(start=start_date, end=start_date + pd.offsets.MonthEnd(0))
+
+    entry = cube['months'].get((int(year), int(month)))
+    if entry is None:
+        return pd.DataFrame(index=all_days)
+
+    totals, present = entry
+    cols = cube['accounts'].get_indexer(accounts)
+    cols = np.unique(cols[cols >= 0])
+    cols = cols[present[cols]]
+    return pd.DataFrame(totals[:, cols], index=all_days, columns=cube['accounts'][cols])
+
+
+# === TRANSACTION EXPLORER DATA ===
+# Columns shown in the explorer, mapped to their source columns in df
+transaction_columns = {
+    'Date': 'Date',
+    'Category': 'Category',
+    'Account': 'Sub-Category (Account)',
+    'Transaction Detail': 'Description (Transaction Detail)',
+    'Amount': 'Amount',
+    'Memo': 'Note / Comment / Memo'
+}
+transaction_text_columns = ('Category', 'Account', 'Transaction Detail', 'Memo')
+
+
+def build_transactions_frame(df):
+    # Display-ready copy of every transaction for the explorer; the table only ever receives one page of it
+    frame = pd.DataFrame({
+        col: df[source].to_numpy() for col, source in transaction_columns.items()
+    })
+    for col in transaction_text_columns:
+        frame[col] = frame[col].fillna('').astype(str)
+    return frame
+
+
+def build_transactions_lowercase(ds):
+    # Lowercase copies of the explorer's text columns, so filters never lowercase the history per request
+    return {col: ds.transactions_frame[col].str.lower() for col in transaction_text_columns}
+
+
+def transactions_lowercase(ds):
+    return derived(ds, 'transactions_lowercase', build_transactions_lowercase)
+
+
+def build_transaction_tables(df, explorer=True):
+    # The table, its per-category frames and, for the in-memory explorer, its display and lowercase copies
+    tables = SimpleNamespace(df=df, **split_transactions(df))
+    if explorer:
+        tables.transactions_frame = build_transactions_frame(df)
+        tables.transactions_date_strings = tables.transactions_frame['Date'].dt.strftime('%Y-%m-%d')
+        tables.transactions_lowercase = build_transactions_lowercase(tables)
+    return tables
+
+
+def transaction_sort_keys(frame, lowercase, col):
+    # Text columns sort case-insensitively, on the snapshot's precomputed lowercase copies
+    return frame[col].to_numpy() if col in ('Date', 'Amount') else lowercase[col].to_numpy()
+
+
+def build_transaction_sort_orders(frame, lowercase):
+    # Ascending sort order for every explorer column (descending reads it backwards)
+    return {
+        col: np.argsort(transaction_sort_keys(frame, lowercase, col), kind='stable').astype(np.int32)
+        for col in transaction_columns
+    }
+
+
+def extend_transaction_sort_orders(sort_orders, frame, lowercase, new_start):
+    # Sort only the new rows and merge them in; equal keys go after existing rows, as a stable sort would place them
+    merged = {}
+    for col, order in sort_orders.items():
+        keys = transaction_sort_keys(frame, lowercase, col)
+        new_keys = keys[new_start:]
+        new_order = np.argsort(new_keys, kind='stable')
+        positions = np.searchsorted(keys[order], new_keys[new_order], side='right')
+        merged[col] = np.insert(order, positions, new_order + new_start).astype(np.int32)
+    return merged
+
+
+def sorted_account_groups(totals):
+    sorted_payments = accounts_by_total(totals['payments'])
+    sorted_utilities_insurance = accounts_by_total(totals['utilities_insurance'])
+    sorted_expenses = accounts_by_total(totals['expenses'])
+
+    return {
+        'account_totals': totals,
+        'income_type_sorted': accounts_by_total(totals['income']),
+        'sorted_payments': sorted_payments,
+        'sorted_utilities_insurance': sorted_utilities_insurance,
+        'sorted_expenses': sorted_expenses,
+        'expense_categories_sorted': accounts_by_total(totals['all_expenses']),
+        'grouped_expense_categories': {
+            'Debt Payments': sorted_payments,
+            'Utilities & Insurance': sorted_utilities_insurance,
+            'Categories': sorted_expenses
+        }
+    }
+
+
+def build_aggregates(ds):
+    # Every derived aggregate and index that is worth persisting between restarts. ds is the dataset
+    # being loaded, or with the SQLite store (which keeps no frames) the frames it was loaded from
+    top_by_year, top_by_month = build_top_transactions_index(ds.all_expense_data)
+
+    aggregates = {
+        **sorted_account_groups(group_account_totals(ds)),
+        'top_transactions_by_year': top_by_year,
+        'top_transactions_by_month': top_by_month,
+        'income_range_sums': build_range_sums(ds.income_data),
+        'expense_range_sums': build_range_sums(ds.all_expense_data),
+        'income_daily_cube': build_daily_cube(ds.income_data),
+        'expense_daily_cube': build_daily_cube(ds.all_expense_data)
+    }
+    if STORAGE_BACKEND != 'sqlite':
+        # The explorer walks these in memory; the store sorts in SQL instead
+        aggregates['transactions_sort_orders'] = build_transaction_sort_orders(ds.transactions_frame, transactions_lowercase(ds))
+    return aggregates
+
+
+def extend_aggregates(aggregates, ds, appended):
+    # Fold appended rows into the previous snapshot's aggregates; the work follows the new rows, not the history
+    new_totals = group_account_totals(appended)
+    totals = {
+        name: previous.add(new_totals[name], fill_value=0).astype(np.int64)
+        for name, previous in aggregates['account_totals'].items()
+    }
+    if ds.store is None:
+        expense_amounts = ds.all_expense_data['Amount'].to_numpy()
+    else:
+        # Only the rows already in the index and the new ones are ever compared, so only those are read back
+        expense_amounts = np.zeros(ds.frame_sizes['all_expense_data'], dtype=np.int64)
+        indexed = np.unique(np.concatenate([
+            np.empty(0, dtype=np.int32),
+            *aggregates['top_transactions_by_year'].values(),
+            *aggregates['top_transactions_by_month'].values()
+        ]))
+        expense_amounts[indexed] = query_expense_rows(ds, indexed)['Amount'].to_numpy()
+        expense_amounts[len(expense_amounts) - len(appended.all_expense_data):] = appended.all_expense_data['Amount'].to_numpy()
+    top_by_year, top_by_month = extend_top_transactions_index(
+        aggregates['top_transactions_by_year'],
+        aggregates['top_transactions_by_month'],
+        expense_amounts,
+        appended.all_expense_data
+    )
+
+    extended = {
+        **sorted_account_groups(totals),
+        'top_transactions_by_year': top_by_year,
+        'top_transactions_by_month': top_by_month,
+        'income_range_sums': extend_range_sums(aggregates['income_range_sums'], appended.income_data),
+        'expense_range_sums': extend_range_sums(aggregates['expense_range_sums'], appended.all_expense_data),
+        'income_daily_cube': extend_daily_cube(aggregates['income_daily_cube'], appended.income_data),
+        'expense_daily_cube': extend_daily_cube(aggregates['expense_daily_cube'], appended.all_expense_data)
+    }
+    if ds.store is None:
+        extended['transactions_sort_orders'] = extend_transaction_sort_orders(
+            aggregates['transactions_sort_orders'],
+            ds.transactions_frame,
+            transactions_lowercase(ds),
+            len(ds.transactions_frame) - len(appended.transactions_frame)
+        )
+    return extended
+
+
+# On-disk cache of the aggregates; set FINANCE_DASHBOARD_CACHE_DIR to an empty string to disable
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dashboard_cache')
+AGGREGATE_CACHE_DIR = os.environ.get('FINANCE_DASHBOARD_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def source_fingerprint(source_hash):
+    # Source data (hashed by the caller), this module's code and the settings that shape the aggregates
+    digest = source_hash.copy()
+    with open(os.path.abspath(__file__), 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    # pyarrow decides how pandas stores strings, so it changes what the cached aggregates unpickle to
+    arrow_version = pa.__version__ if pa is not None else 'none'
+    # The storage backend decides which indexes are built
+    digest.update(f"{TOP_TRANSACTIONS_K}|{STORAGE_BACKEND}|{pd.__version__}|{np.__version__}|{arrow_version}".encode())
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(path):
+    files = source_files(path)
+    source_hash = hashlib.sha256()
+    for file_path in files:
+        if files != [path]:
+            # Adding, removing or renaming an export changes the source too
+            source_hash.update(file_path.encode() + b'\0')
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                source_hash.update(chunk)
+    return source_fingerprint(source_hash)
+
+
+def remove_stale_files(keep_path):
+    # Files next to keep_path of the same kind but keyed by another fingerprint; processes
+    # that still have one open keep reading it
+    directory, keep = os.path.split(keep_path)
+    prefix = keep.split('-', 1)[0] + '-'
+    suffix = os.path.splitext(keep)[1]
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix) and name != keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def load_or_build_aggregates(ds, build=build_aggregates):
+    if not AGGREGATE_CACHE_DIR:
+        return build(ds)
+
+    cache_path = os.path.join(AGGREGATE_CACHE_DIR, f"aggregates-{ds.fingerprint[:24]}.pkl")
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # A truncated or incompatible cache file is rebuilt like a missing one
+        logger.warning("Ignoring unreadable aggregate cache %s", cache_path, exc_info=True)
+
+    aggregates = build(ds)
+
+    try:
+        os.makedirs(AGGREGATE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+
+        remove_stale_files(cache_path)
+    except OSError:
+        logger.warning("Could not write aggregate cache to %s", AGGREGATE_CACHE_DIR, exc_info=True)
+
+    return aggregates
+
+
+# === SQLITE STORE ===
+# 'sqlite' keeps the transactions in an indexed SQLite file shared by every worker, and answers the
+# callbacks' filter, group and explorer queries from it; a snapshot then holds only the aggregates
+# and indexes, not the rows. 'pandas' (the default) keeps the per-category frames in memory
+STORAGE_BACKEND = os.environ.get('FINANCE_DASHBOARD_STORAGE', 'pandas')
+SQLITE_DIR = os.environ.get('FINANCE_DASHBOARD_SQLITE_DIR', AGGREGATE_CACHE_DIR or DEFAULT_CACHE_DIR)
+
+store_columns = {
+    'Date': 'date',
+    'Category': 'category',
+    'Description (Transaction Detail)': 'description',
+    'Sub-Category (Account)': 'account',
+    'Amount': 'amount',
+    'Note / Comment / Memo': 'memo'
 }
 
+
+def insert_store_rows(conn, rows, start, expense_start):
+    # Rows keep their position in the table (row), their index label (label) and, for outflows, their
+    # position in all_expense_data (expense_row), which the top transactions index refers to
+    is_expense = rows['Category'].isin(CATEGORY_FRAMES['all_expense_data']).to_numpy()
+    expense_rows = np.where(is_expense, expense_start + np.cumsum(is_expense) - 1, -1)
+    conn.executemany(
+        "INSERT INTO transactions (row, label, expense_row, date, year, month, category, description, account, amount, memo) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(
+            range(start, start + len(rows)),
+            rows.index.tolist(),
+            [int(row) if row >= 0 else None for row in expense_rows],
+            rows['Date'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+            rows['Date'].dt.year.tolist(),
+            rows['Date'].dt.month.tolist(),
+            *(
+                rows[col].astype(object).where(rows[col].notna(), None).tolist()
+                for col in ('Category', 'Description (Transaction Detail)', 'Sub-Category (Account)', 'Amount', 'Note / Comment / Memo')
+            )
+        )
+    )
+    try:
+        conn.execute("INSERT INTO descriptions (rowid, description) SELECT row, description FROM transactions WHERE row >= ?", (start,))
+    except sqlite3.OperationalError:
+        pass  # Built without full-text search
+
+
+def build_transaction_store(path, rows, previous_path=None):
+    # Build next to the target and rename into place, so other workers never open a half-written file.
+    # rows is the whole table, or with previous_path only the rows appended since that store
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if previous_path is not None:
+        shutil.copyfile(previous_path, tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        start, expense_start = conn.execute("SELECT COUNT(*), COUNT(expense_row) FROM transactions").fetchone()
+    else:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        start = expense_start = 0
+        conn.execute(
+            "CREATE TABLE transactions (row INTEGER PRIMARY KEY, label INTEGER, expense_row INTEGER, date TEXT, "
+            "year INTEGER, month INTEGER, category TEXT, description TEXT, account TEXT, amount INTEGER, memo TEXT)"
+        )
+        conn.execute("CREATE INDEX transactions_category_period ON transactions (category, year, month)")
+        conn.execute("CREATE INDEX transactions_account_date ON transactions (account, date)")
+        conn.execute("CREATE UNIQUE INDEX transactions_expense_row ON transactions (expense_row)")
+        try:
+            # Trigram tokens let substring searches (LIKE '%term%') use the index
+            conn.execute(
+                "CREATE VIRTUAL TABLE descriptions USING fts5(description, content='transactions', "
+                "content_rowid='row', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            logger.warning("SQLite has no FTS5 trigram tokenizer; description search will scan the table")
+
+    with conn:
+        insert_store_rows(conn, rows, start, expense_start)
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+def open_transaction_store(ds, rows, previous=None):
+    path = os.path.join(SQLITE_DIR, f"transactions-{ds.fingerprint[:24]}.sqlite3")
+    if not os.path.exists(path):
+        os.makedirs(SQLITE_DIR, exist_ok=True)
+        previous_path = previous.store_path if previous is not None else None
+        build_transaction_store(path, rows, previous_path)
+        remove_stale_files(path)
+
+    # One read-only connection per snapshot, shared by request threads (sqlite serializes access)
+    conn = connect_transaction_store(path)
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'descriptions'").fetchone() is not None
+    return path, conn, has_fts
+
+
+def connect_transaction_store(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    # SQLite's lower() only folds ASCII; the explorer lowercases text the way pandas does
+    conn.create_function('py_lower', 1, lambda text: text.lower() if text is not None else None, deterministic=True)
+    return conn
+
+
+# Connections opened by forked processes (background jobs), which must not use their parent's
+forked_store_connections = {}
+
+
+def store_connection(ds):
+    if ds.store_pid == os.getpid():
+        return ds.store
+    key = (os.getpid(), ds.store_path)
+    if key not in forked_store_connections:
+        forked_store_connections.clear()
+        forked_store_connections[key] = connect_transaction_store(ds.store_path)
+    return forked_store_connections[key]
+
+
+# === ARROW SNAPSHOT ===
+# With FINANCE_DASHBOARD_ARROW=1 (and pyarrow installed) the normalized transaction table is
+# written once per data version as an Arrow IPC file that every worker memory-maps read-only.
+# The file stacks the table and each per-category frame (outflows already negated) as contiguous
+# row ranges, plus the explorer's text, lowercase and date string columns alongside the table's
+# rows, so a worker reads every one of them as a view over the mapped file rather than a copy
+ARROW_SNAPSHOTS = os.environ.get('FINANCE_DASHBOARD_ARROW', '0') == '1'
+ARROW_DIR = os.environ.get('FINANCE_DASHBOARD_ARROW_DIR', AGGREGATE_CACHE_DIR or DEFAULT_CACHE_DIR)
+
+if ARROW_SNAPSHOTS and pa is None:
+    logger.warning("FINANCE_DASHBOARD_ARROW is set but pyarrow is not installed; every worker will parse the CSV")
+
+
+def arrow_snapshot_path(fingerprint):
+    return os.path.join(ARROW_DIR, f"transactions-{fingerprint[:24]}.arrow")
+
+
+def read_arrow_snapshot(fingerprint):
+    # (tables, source_rows, source_dtypes) as built by build_transaction_tables, or None when no
+    # snapshot exists for this fingerprint
+    path = arrow_snapshot_path(fingerprint)
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        meta = json.loads(table.schema.metadata[b'finance_dashboard'])
+        segments = meta['segments']
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Ignoring unreadable Arrow snapshot %s", path, exc_info=True)
+        return None
+
+    # The file is a single record batch, so every slice of a column without nulls comes back as
+    # a view over the mapped file
+    frame_columns = [name for name in table.column_names if not name.startswith(('explorer ', 'lowercase '))]
+    tables = SimpleNamespace(**{
+        name: table.slice(start, length).select(frame_columns).to_pandas(split_blocks=True)
+        for name, (start, length) in segments.items()
+    })
+    if meta['explorer']:
+        def column(name):
+            return table.column(name).slice(0, len(tables.df)).to_pandas()
+
+        df = tables.df
+        tables.transactions_frame = pd.DataFrame({
+            col: (df[col] if col in ('Date', 'Amount') else column(f"explorer {col}")).array
+            for col in transaction_columns
+        }, copy=False)
+        tables.transactions_date_strings = column('explorer Date').rename('Date')
+        tables.transactions_lowercase = {col: column(f"lowercase {col}").rename(col) for col in transaction_text_columns}
+    source_dtypes = meta['source_dtypes']
+    if source_dtypes is not None:
+        source_dtypes = pd.Series({col: pd.api.types.pandas_dtype(dtype) for col, dtype in source_dtypes.items()})
+    return tables, meta['source_rows'], source_dtypes
+
+
+def write_arrow_snapshot(fingerprint, tables, source_rows, source_dtypes):
+    # Keeps the index labels, plus what an incremental reload needs to parse appended rows
+    names = ['df', *CATEGORY_FRAMES]
+    parts = [getattr(tables, name) for name in names]
+    table = pa.Table.from_pandas(pd.concat(parts), preserve_index=True)
+    segments = {}
+    start = 0
+    for name, part in zip(names, parts):
+        segments[name] = (start, len(part))
+        start += len(part)
+
+    explorer = hasattr(tables, 'transactions_frame')
+    if explorer:
+        # Only the table's rows have explorer values; the frames' rows leave them null
+        padding = pa.nulls(table.num_rows - len(tables.df), pa.large_string())
+        columns = {
+            'explorer Date': tables.transactions_date_strings,
+            **{f"explorer {col}": tables.transactions_frame[col] for col in transaction_text_columns},
+            **{f"lowercase {col}": tables.transactions_lowercase[col] for col in transaction_text_columns}
+        }
+        for name, values in columns.items():
+            table = table.append_column(name, pa.chunked_array([pa.array(values, pa.large_string()), padding]))
+    table = table.combine_chunks()
+
+    meta = {
+        'source_rows': source_rows,
+        'source_dtypes': None if source_dtypes is None else {col: str(dtype) for col, dtype in source_dtypes.items()},
+        'segments': segments,
+        'explorer': explorer
+    }
+    table = table.replace_schema_metadata({**table.schema.metadata, b'finance_dashboard': json.dumps(meta).encode()})
+
+    path = arrow_snapshot_path(fingerprint)
+    try:
+        os.makedirs(ARROW_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        remove_stale_files(path)
+    except OSError:
+        logger.warning("Could not write Arrow snapshot to %s", ARROW_DIR, exc_info=True)
+
+
+def read_appended_transactions(previous):
+    # Raw rows written after the end of the previous snapshot's file, or None when the file
+    # was rewritten rather than appended to
+    if previous.source_size is None:
+        return None
+
+    with open(previous.path, 'rb') as f:
+        source_hash = hashlib.sha256()
+        remaining = previous.source_size
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                return None
+            source_hash.update(chunk)
+            remaining -= len(chunk)
+        if source_hash.digest() != previous.source_hash.digest():
+            return None
+        appended = f.read()
+
+    source_hash.update(appended)
+    if appended.strip():
+        try:
+            # Parse with the full file's column types, as if these rows had been there all along
+            rows = pd.read_csv(
+                io.BytesIO(appended), header=None,
+                names=list(previous.source_dtypes.index), dtype=previous.source_dtypes.to_dict()
+            )
+        except ValueError:
+            return None
+    else:
+        rows = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in previous.source_dtypes.items()})
+
+    # Keep row labels continuing from the previous file, matching a full load
+    rows.index += previous.source_rows
+    return rows, len(appended), source_hash
+
+
+def freeze_arrays(value):
+    # Mark every numpy array in a (nested) aggregate read-only; pandas objects are protected by
+    # copy-on-write (enabled at import), so a write through them copies instead of touching the snapshot
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze_arrays(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze_arrays(item)
+    return value
+
+
+class Dataset:
+    # One snapshot of the transactions and everything derived from them. Callbacks take the
+    # current snapshot once per request; a reload builds a new one and swaps it in whole.
+    # Given the previous snapshot and a file that has only grown, only the new rows are parsed
+    # and folded into copies of the previous frames and aggregates.
+    # Once built, a snapshot is immutable (read-only arrays, no attribute rebinding), so any number
+    # of request threads can share it without locks.
+    def __init__(self, path, version, previous=None, appended=None):
+        self.path = path
+        self.version = version
+        self.loaded_at = pd.Timestamp.now()
+        # Memos of derived results, not part of the snapshot's data
+        self.year_set_aggregates = {}
+        self.derived = {}
+
+        if previous is not None and appended is None:
+            appended = read_appended_transactions(previous)
+        if appended is None:
+            self.load(path)
+        else:
+            self.extend(previous, *appended)
+
+        self.range_preset_options = [
+            {'label': 'Selected Years', 'value': 'years'},
+            {'label': 'Last 30 Days', 'value': 'trailing-30'},
+            {'label': 'Last 90 Days', 'value': 'trailing-90'},
+            {'label': 'Last 12 Months', 'value': 'trailing-365'},
+            {'label': 'Year to Date', 'value': 'ytd'},
+        ] + [
+            {'label': f"Q{q.quarter} {q.year}", 'value': f"quarter-{q}"}
+            for q in reversed(pd.period_range(self.first_transaction_date, self.latest_transaction_date, freq='Q'))
+        ] + [
+            {'label': 'Custom Range', 'value': 'custom'}
+        ]
+
+        freeze_arrays(vars(self))
+        self.frozen = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('frozen'):
+            raise AttributeError(f"Dataset version {self.version} is read-only")
+        super().__setattr__(name, value)
+
+    def load(self, path):
+        files = source_files(path)
+        if files == [path]:
+            with open(path, 'rb') as f:
+                source = f.read()
+            self.source_size = len(source)
+            self.source_hash = hashlib.sha256(source)
+            self.fingerprint = source_fingerprint(self.source_hash)
+        else:
+            # Several exports have no single byte stream to append to, so they are always read whole
+            self.source_size = None
+            self.fingerprint = dataset_fingerprint(path)
+
+        snapshot = read_arrow_snapshot(self.fingerprint) if ARROW_SNAPSHOTS and pa is not None else None
+        if snapshot is None:
+            if self.source_size is not None:
+                rows = pd.read_csv(io.BytesIO(source))
+                self.source_rows = len(rows)
+                self.source_dtypes = rows.dtypes
+                df = normalize_transactions(rows)
+            else:
+                self.source_rows = self.source_dtypes = None
+                df = read_transaction_files(files)
+            df = encode_accounts(df, build_account_dictionary(df['Sub-Category (Account)']))
+            # The explorer's copies are only needed when it runs in memory
+            tables = build_transaction_tables(df, explorer=STORAGE_BACKEND != 'sqlite')
+
+            if ARROW_SNAPSHOTS and pa is not None:
+                # Serve from the mapped file too, rather than keeping this worker's private copy
+                write_arrow_snapshot(self.fingerprint, tables, self.source_rows, self.source_dtypes)
+                snapshot = read_arrow_snapshot(self.fingerprint)
+        if snapshot is not None:
+            tables, self.source_rows, self.source_dtypes = snapshot
+        df = tables.df
+        self.accounts = df['Sub-Category (Account)'].cat.categories
+        self.row_count = len(df)
+        # Column types and row labels of the table, so rows read back from the store match the frames
+        self.row_dtypes = df.dtypes
+        self.label_dtype = df.index.dtype
+
+        # Income and expense data
+        frames = tables
+        self.frame_sizes = {name: len(getattr(frames, name)) for name in CATEGORY_FRAMES}
+
+        # Colors as arrays indexed by account code
+        n_accounts = len(self.accounts)
+        self.income_colors = assign_colors(frames.income_data['Sub-Category (Account)'].cat.codes.to_numpy(), n_accounts, income_colors_list)
+        self.debt_colors = assign_colors(frames.debt_data['Sub-Category (Account)'].cat.codes.to_numpy(), n_accounts, debt_colors_list)
+        self.cash_colors = assign_colors(frames.cash_data['Sub-Category (Account)'].cat.codes.to_numpy(), n_accounts, cash_colors_list)
+        self.expense_colors = assign_colors(frames.all_expense_data['Sub-Category (Account)'].cat.codes.to_numpy(), n_accounts, expense_colors_list)
+
+        # Get all unique years
+        self.available_years = sorted(df['Date'].dt.year.dropna().unique().astype(str))
+        self.latest_year = df['Date'].dt.year.max()
+        self.latest_month_by_year = df.groupby(df['Date'].dt.year)['Date'].max().dt.month.to_dict()
+
+        # Date-range presets are anchored on the latest transaction rather than today
+        self.first_transaction_date = df['Date'].min()
+        self.latest_transaction_date = df['Date'].max().normalize()
+
+        self.open_store(df)
+        if self.store is None:
+            self.set_tables(tables)
+            frames = self
+
+        # With the store, the frames are only used here and dropped once the aggregates are built
+        self.set_aggregates(load_or_build_aggregates(self, build=lambda ds: build_aggregates(frames)))
+
+    def extend(self, previous, rows, appended_size, source_hash):
+        self.source_size = previous.source_size + appended_size
+        self.source_hash = source_hash
+        self.fingerprint = source_fingerprint(source_hash)
+        self.source_rows = previous.source_rows + len(rows)
+        self.source_dtypes = previous.source_dtypes
+
+        new_df = normalize_transactions(rows)
+        self.accounts = previous.accounts.union(build_account_dictionary(new_df['Sub-Category (Account)']))
+        if self.accounts.equals(previous.accounts):
+            self.accounts = previous.accounts
+            carry = lambda frame: frame
+        else:
+            # A new account grows the sorted dictionary, so the previous rows are recoded once
+            carry = lambda frame: recode_accounts(frame, self.accounts)
+        new_df = encode_accounts(new_df, self.accounts)
+
+        appended = build_transaction_tables(new_df, explorer=STORAGE_BACKEND != 'sqlite')
+        self.row_count = previous.row_count + len(new_df)
+        self.row_dtypes = previous.row_dtypes.copy()
+        self.row_dtypes['Sub-Category (Account)'] = new_df['Sub-Category (Account)'].dtype
+        self.label_dtype = previous.label_dtype
+        self.frame_sizes = {name: size + len(getattr(appended, name)) for name, size in previous.frame_sizes.items()}
+
+        self.open_store(new_df, previous)
+        if self.store is None:
+            tables = SimpleNamespace(**{
+                name: pd.concat([carry(getattr(previous, name)), getattr(appended, name)])
+                for name in ['df', *CATEGORY_FRAMES]
+            })
+            tables.transactions_frame = pd.concat([previous.transactions_frame, appended.transactions_frame], ignore_index=True)
+            tables.transactions_date_strings = pd.concat(
+                [previous.transactions_date_strings, appended.transactions_date_strings], ignore_index=True
+            )
+            # The lowercase text columns carry over too, so only the new rows are lowercased
+            previous_lowercase = transactions_lowercase(previous)
+            tables.transactions_lowercase = {
+                col: pd.concat([previous_lowercase[col], appended.transactions_lowercase[col]], ignore_index=True)
+                for col in transaction_text_columns
+            }
+            if ARROW_SNAPSHOTS and pa is not None:
+                # Other workers and restarts map the extended tables instead of re-parsing, and so does this one
+                write_arrow_snapshot(self.fingerprint, tables, self.source_rows, self.source_dtypes)
+                snapshot = read_arrow_snapshot(self.fingerprint)
+                if snapshot is not None:
+                    tables = snapshot[0]
+            self.set_tables(tables)
+
+        self.income_colors = extend_colors(
+            previous.income_colors, previous.accounts, self.accounts,
+            appended.income_data['Sub-Category (Account)'].cat.codes.to_numpy(), income_colors_list
+        )
+        self.debt_colors = extend_colors(
+            previous.debt_colors, previous.accounts, self.accounts,
+            appended.debt_data['Sub-Category (Account)'].cat.codes.to_numpy(), debt_colors_list
+        )
+        self.cash_colors = extend_colors(
+            previous.cash_colors, previous.accounts, self.accounts,
+            appended.cash_data['Sub-Category (Account)'].cat.codes.to_numpy(), cash_colors_list
+        )
+        self.expense_colors = extend_colors(
+            previous.expense_colors, previous.accounts, self.accounts,
+            appended.all_expense_data['Sub-Category (Account)'].cat.codes.to_numpy(), expense_colors_list
+        )
+
+        new_dates = new_df['Date']
+        self.available_years = sorted(set(previous.available_years) | set(new_dates.dt.year.unique().astype(str)))
+        self.latest_year = max([previous.latest_year, *new_dates.dt.year.unique()])
+        self.latest_month_by_year = dict(previous.latest_month_by_year)
+        for year, month in new_dates.groupby(new_dates.dt.year).max().dt.month.items():
+            self.latest_month_by_year[year] = max(month, self.latest_month_by_year.get(year, 0))
+        self.first_transaction_date = min([previous.first_transaction_date, *new_dates.unique()])
+        self.latest_transaction_date = max([previous.latest_transaction_date, *new_dates.dt.normalize().unique()])
+
+        self.set_aggregates(load_or_build_aggregates(
+            self, build=lambda ds: extend_aggregates(previous.aggregates, ds, appended)
+        ))
+
+    def set_tables(self, tables):
+        # The in-memory table, per-category frames and explorer copies (without the SQLite store)
+        self.df = tables.df
+        for name in CATEGORY_FRAMES:
+            setattr(self, name, getattr(tables, name))
+        self.transactions_frame = tables.transactions_frame
+        self.transactions_date_strings = tables.transactions_date_strings
+        self.derived['transactions_lowercase'] = tables.transactions_lowercase
+
+    def open_store(self, rows, previous=None):
+        # rows: the whole table, or the rows appended to previous
+        self.store = self.store_path = self.store_pid = None
+        self.store_has_fts = False
+        if STORAGE_BACKEND == 'sqlite':
+            self.store_path, self.store, self.store_has_fts = open_transaction_store(self, rows, previous)
+            self.store_pid = os.getpid()
+
+    def set_aggregates(self, aggregates):
+        self.aggregates = aggregates
+
+        self.income_type_sorted = aggregates['income_type_sorted']
+
+        # Sorted lists of expense categories by group (payments, utilities & insurance, expenses) then by total amount
+        self.sorted_payments = aggregates['sorted_payments']
+        self.sorted_utilities_insurance = aggregates['sorted_utilities_insurance']
+        self.sorted_expenses = aggregates['sorted_expenses']
+
+        # Combine all sorted categories preserving the desired order
+
+        # expense_categories_sorted = pd.concat([
+        #     sorted_payments,
+        #     sorted_utilities_insurance,
+        #     sorted_expenses
+        # ]).index.tolist()
+
+        self.expense_categories_sorted = aggregates['expense_categories_sorted']
+
+        # Save for use in Dash stores
+        self.grouped_expense_categories = aggregates['grouped_expense_categories']
+
+        # Positional row ids (into all_expense_data) of the largest transactions per period
+        self.top_transactions_by_year = aggregates['top_transactions_by_year']
+        self.top_transactions_by_month = aggregates['top_transactions_by_month']
+
+        self.income_range_sums = aggregates['income_range_sums']
+        self.expense_range_sums = aggregates['expense_range_sums']
+
+        self.income_daily_cube = aggregates['income_daily_cube']
+        self.expense_daily_cube = aggregates['expense_daily_cube']
+
+        self.transactions_sort_orders = aggregates.get('transactions_sort_orders')
+
+
+def derived(ds, name, build):
+    # A result computed once per snapshot (forecasts, budgets, ...) and dropped with it on reload
+    # Checked by membership, so a build that found nothing to show (None) is remembered as well
+    if name not in ds.derived:
+        ds.derived.setdefault(name, freeze_arrays(build(ds)))
+    return ds.derived[name]
+
+
+def range_preset_dates(ds, preset):
+    latest_date = ds.latest_transaction_date
+    if preset == 'ytd':
+        return pd.Timestamp(year=latest_date.year, month=1, day=1), latest_date
+    if preset.startswith('trailing-'):
+        days = int(preset.split('-')[1])
+        return latest_date - pd.Timedelta(days=days - 1), latest_date
+    if preset.startswith('quarter-'):
+        quarter = pd.Period(preset.split('-', 1)[1], freq='Q')
+        return quarter.start_time.normalize(), quarter.end_time.normalize()
+    return None, None
+
+
+# === SCAN ACCOUNTING ===
+# Per callback request: rows scanned, full-frame filters and groupbys, and the temporary memory they
+# materialized. Counted where the callbacks filter and group, reported by the request hooks below
+# (logs and /admin/metrics); outside a request there is nothing to count into.
+scan_stats = contextvars.ContextVar('scan_stats', default=None)
+
+
+def shallow_nbytes(value):
+    if value is None:
+        return 0
+    usage = value.memory_usage(index=True, deep=False)
+    return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+
+
+def record_scan(kind, scanned, result=None):
+    # kind is 'filter' (a boolean mask over scanned, then the selected copy) or 'groupby'
+    stats = scan_stats.get()
+    if stats is None:
+        return
+    stats[kind + 's'] += 1
+    stats['rows_scanned'] += len(scanned)
+    stats['temp_bytes'] += (len(scanned) if kind == 'filter' else 0) + shallow_nbytes(result)
+
+
+# === QUERY LAYER ===
+# Filter and group operations used by the callbacks. frames names one or more of the
+# dataset's per-category frames (see CATEGORY_FRAMES); years may be one year or a list.
+def frame_query_mask(data, years, month, accounts, search):
+    mask = np.ones(len(data), dtype=bool)
+    if years is not None:
+        mask &= data['Date'].dt.year.isin(np.atleast_1d(years)).to_numpy()
+    if month:
+        mask &= (data['Date'].dt.month == month).to_numpy()
+    if accounts is not None:
+        mask &= data['Sub-Category (Account)'].isin(accounts).to_numpy()
+    if search:
+        # A literal, case-insensitive match, like the store's LIKE; only rows the cheaper filters kept are searched
+        descriptions = data['Description (Transaction Detail)'][mask]
+        mask[mask] = descriptions.str.lower().str.contains(search.lower(), regex=False).to_numpy()
+    return mask
+
+
+def store_query_where(ds, frames, years, month, accounts, search):
+    categories = [category for name in frames for category in CATEGORY_FRAMES[name]]
+    clauses = [f"category IN ({', '.join('?' * len(categories))})"]
+    params = list(categories)
+    if years is not None:
+        years = [int(year) for year in np.atleast_1d(years)]
+        clauses.append(f"year IN ({', '.join('?' * len(years))})")
+        params += years
+    if month:
+        clauses.append("month = ?")
+        params.append(int(month))
+    if accounts is not None:
+        clauses.append(f"account IN ({', '.join('?' * len(accounts))})")
+        params += list(accounts)
+    if search:
+        pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        if ds.store_has_fts:
+            clauses.append("row IN (SELECT rowid FROM descriptions WHERE description LIKE ? ESCAPE '\\')")
+        else:
+            clauses.append("description LIKE ? ESCAPE '\\'")
+        params.append(pattern)
+    return ' AND '.join(clauses), params
+
+
+def signed_amount_sql():
+    return f"CASE WHEN category IN ({', '.join(repr(c) for c in OUTFLOW_CATEGORIES)}) THEN -amount ELSE amount END"
+
+
+def store_rows(ds, where, params, order='row'):
+    # Rows of the store, shaped like the frames themselves (same columns, index labels and signs)
+    rows = pd.read_sql_query(
+        f"SELECT label, date, category, description, account, {signed_amount_sql()} AS amount, memo "
+        f"FROM transactions WHERE {where} ORDER BY {order}",
+        store_connection(ds), params=params, index_col='label'
+    )
+    rows.index = rows.index.astype(ds.label_dtype)
+    rows.index.name = None
+    rows = rows.rename(columns={sql: col for col, sql in store_columns.items()})[list(ds.row_dtypes.index)]
+    rows['Date'] = pd.to_datetime(rows['Date'])
+    rows = rows.astype(ds.row_dtypes.to_dict())
+    record_scan('filter', rows, rows)  # SQLite reads through its indexes; only the returned rows are counted
+    return rows
+
+
+def query_rows(ds, frames, years=None, month=None, accounts=None, search=None):
+    # Matching rows, shaped like the frames themselves (same columns, index labels and signs)
+    frames = [frames] if isinstance(frames, str) else frames
+    if ds.store is None:
+        parts = [getattr(ds, name) for name in frames]
+        data = parts[0] if len(parts) == 1 else pd.concat(parts)
+        mask = frame_query_mask(data, years, month, accounts, search)
+        rows = data if mask.all() else data[mask]
+        record_scan('filter', data, rows)
+        return rows
+
+    where, params = store_query_where(ds, frames, years, month, accounts, search)
+    return store_rows(ds, where, params)
+
+
+def query_expense_rows(ds, positions):
+    # Rows of all_expense_data at the given positions, in that order (the top transactions index)
+    positions = [int(position) for position in positions]
+    if ds.store is None:
+        return ds.all_expense_data.iloc[positions]
+    rows = store_rows(ds, f"expense_row IN ({', '.join('?' * len(positions))})", positions, order='expense_row')
+    order = np.argsort(np.argsort(positions, kind='stable'), kind='stable')
+    return rows.iloc[order]
+
+
+def query_account_totals(ds, frames, years=None, month=None):
+    # Amount per account over the matching rows, ordered by account like a groupby
+    frames = [frames] if isinstance(frames, str) else frames
+    if ds.store is None:
+        return account_totals(query_rows(ds, frames, years=years, month=month))
+
+    where, params = store_query_where(ds, frames, years, month, None, None)
+    totals = pd.read_sql_query(
+        f"SELECT account, SUM({signed_amount_sql()}) AS amount FROM transactions "
+        f"WHERE {where} AND account IS NOT NULL GROUP BY account ORDER BY account",
+        store_connection(ds), params=params, index_col='account'
+    )['amount']
+    totals.index.name = 'Sub-Category (Account)'
+    totals.name = 'Amount'
+    record_scan('groupby', totals, totals)
+    return totals
+
+
+# === DATASET RELOAD ===
+# Fold rows appended to the data file into the live snapshot instead of re-reading it all;
+# set FINANCE_DASHBOARD_INCREMENTAL=0 to always rebuild from scratch
+INCREMENTAL_RELOAD = os.environ.get('FINANCE_DASHBOARD_INCREMENTAL', '1') != '0'
+# Ingestion worker processes must not load a snapshot of their own
+is_worker_process = multiprocessing.current_process().name == INGEST_WORKER_NAME
+current_dataset = None if is_worker_process else Dataset(DATA_FILE, version=1)
+dataset_reload_lock = threading.Lock()
+
+
+def get_dataset():
+    # Callbacks read this once and use that snapshot for the whole request
+    return current_dataset
+
+
+def reload_dataset(force=False):
+    global current_dataset
+
+    # One rebuild at a time; the live snapshot keeps serving until the new one is complete
+    with dataset_reload_lock:
+        previous = current_dataset
+        incremental = INCREMENTAL_RELOAD and not force and previous.source_size is not None
+        if incremental:
+            # One pass over the file: the prefix digest proves it only grew and, with the new bytes,
+            # is the new fingerprint, so the file is never hashed twice
+            appended = read_appended_transactions(previous)
+            if appended is not None and appended[1] == 0:
+                return previous
+        elif not force and dataset_fingerprint(previous.path) == previous.fingerprint:
+            return previous
+
+        # Forced reloads always re-read the whole file; so does a file that was rewritten
+        if incremental and appended is not None:
+            dataset = Dataset(previous.path, previous.version + 1, previous=previous, appended=appended)
+        else:
+            dataset = Dataset(previous.path, previous.version + 1)
+        current_dataset = dataset  # Single reference swap; in-flight requests finish on the old snapshot
+        logger.info("Loaded dataset version %s from %s", dataset.version, dataset.path)
+        start_view_warmup()
+        return dataset
+
+
+def reload_dataset_in_background(force=False):
+    def run():
+        try:
+            reload_dataset(force)
+        except Exception:
+            logger.exception("Dataset reload failed; still serving version %s", current_dataset.version)
+
+    thread = threading.Thread(target=run, name='dataset-reload', daemon=True)
+    thread.start()
+    return thread
+
+
+# Seconds between checks of the data file for changes; 0 disables the watcher
+DATA_WATCH_INTERVAL = float(os.environ.get('FINANCE_DASHBOARD_WATCH_INTERVAL', 0))
+
+
+def watch_data_file(interval):
+    def file_state():
+        try:
+            states = []
+            for path in source_files(current_dataset.path):
+                stat = os.stat(path)
+                states.append((path, stat.st_mtime_ns, stat.st_size))
+            return states
+        except OSError:
+            return None
+
+    last_state = file_state()
+    while True:
+        time.sleep(interval)
+        state = file_state()
+        if state is not None and state != last_state:
+            last_state = state
+            try:
+                reload_dataset()
+            except Exception:
+                logger.exception("Dataset reload failed; still serving version %s", current_dataset.version)
+
+
+if DATA_WATCH_INTERVAL > 0 and not is_worker_process:
+    threading.Thread(target=watch_data_file, args=(DATA_WATCH_INTERVAL,), name='data-watcher', daemon=True).start()
+
+
+# === VIEW CACHE ===
+# Outputs of the pure view callbacks for recently requested inputs, keyed by dataset version so a
+# reload never serves an old figure; FINANCE_DASHBOARD_VIEW_CACHE_SIZE=0 disables it
+VIEW_CACHE_SIZE = int(os.environ.get('FINANCE_DASHBOARD_VIEW_CACHE_SIZE', 256))
+view_cache = OrderedDict()
+view_cache_lock = threading.Lock()
+# Computations under way, by the same key: identical concurrent requests (several people opening the
+# dashboard at once, a double click) wait for the first one instead of repeating its work
+view_in_flight = {}
+
+
+def view_cache_key_part(value):
+    # Checklist values arrive as lists; tuples make them usable in the key
+    if isinstance(value, list):
+        return tuple(view_cache_key_part(item) for item in value)
+    return value
+
+
+def memoized_view(func):
+    @functools.wraps(func)
+    def wrapper(*args):
+        # A profiled request should show the real work, not a cache hit
+        if flask.has_request_context() and 'profiler' in flask.g:
+            return func(*args)
+
+        ds = get_dataset()
+        key = (ds.version, func.__name__, tuple(view_cache_key_part(arg) for arg in args))
+        with view_cache_lock:
+            if key in view_cache:
+                view_cache.move_to_end(key)
+                return view_cache[key]
+            pending = view_in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = view_in_flight[key] = Future()
+
+        if not leader:
+            return pending.result()  # Re-raises whatever the first request raised, PreventUpdate included
+
+        try:
+            result = func(*args)
+        except BaseException as error:
+            with view_cache_lock:
+                del view_in_flight[key]
+            pending.set_exception(error)
+            raise
+
+        with view_cache_lock:
+            del view_in_flight[key]
+            # Only keep the result if no reload swapped the snapshot while it was computed
+            if VIEW_CACHE_SIZE > 0 and get_dataset() is ds:
+                view_cache[key] = result
+                while len(view_cache) > VIEW_CACHE_SIZE:
+                    view_cache.popitem(last=False)
+        pending.set_result(result)
+        return result
+
+    return wrapper
+
+
+# Heavy analyses run as Dash background callbacks: a separate process per job, with progress and a
+# cancel button, so they never hold up a web worker. Needs the optional diskcache package (with Dash's
+# multiprocess and psutil); without it those callbacks run inline like any other
+BACKGROUND_DIR = os.environ.get('FINANCE_DASHBOARD_BACKGROUND_DIR', os.path.join(DEFAULT_CACHE_DIR, 'background'))
+
+
+def create_background_callback_manager():
+    if diskcache is None or is_worker_process:
+        return None
+    try:
+        # Results are cached per version of the data (by content, so every worker shares them)
+        return dash.DiskcacheManager(diskcache.Cache(BACKGROUND_DIR), cache_by=[lambda: get_dataset().fingerprint])
+    except ImportError:
+        logger.warning("Background callbacks need multiprocess and psutil; running heavy callbacks inline")
+        return None
+
+
+background_callback_manager = create_background_callback_manager()
+
 # Create the Dash app
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, background_callback_manager=background_callback_manager)
 app.config.suppress_callback_exceptions = True  # This suppresses warnings for pages that aren't loaded yet
 
+
+def heavy_callback(*dependencies, progress=None, running=None, cancel=None, **kwargs):
+    # Register a callback taking set_progress first, as a background job when a manager is available
+    def decorator(func):
+        if background_callback_manager is not None:
+            app.callback(
+                *dependencies, background=True, progress=progress, running=running, cancel=cancel, **kwargs
+            )(func)
+            return func
+
+        @functools.wraps(func)
+        def run_inline(*args):
+            return func(lambda *_: None, *args)
+
+        app.callback(*dependencies, running=running, **kwargs)(run_inline)
+        return func
+
+    return decorator
+
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
     html.Div(id='page-content')
@@ -177,272 +1596,310 @@ def create_empty_figure(title="Empty Chart", message="No data to display"):
     return fig
 
 
-# Get all unique years
-available_years = sorted(df['Date'].dt.year.dropna().unique().astype(str))
-
 # Layout of the Dash app
-income_vs_expenses_layout = (html.Div([
-    # Display Options and Year Filter side-by-side, both centered in their columns
-    html.Div([
-
-        # Navigation links
+def income_vs_expenses_layout():
+    ds = get_dataset()
+    return (html.Div([
+        # Display Options and Year Filter side-by-side, both centered in their columns
         html.Div([
-            dcc.Link('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
-            dcc.Link('Yearly Summary', href='/yearly-summary')
+
+            # Navigation links
+            html.Div([
+                dcc.Link('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
+                dcc.Link('Yearly Summary', href='/yearly-summary', style={'marginRight': '20px'}),
+                dcc.Link('Transactions', href='/transactions', style={'marginRight': '20px'}),
+                dcc.Link('Correlations', href='/correlations')
+            ], style={
+                'textAlign': 'center',
+                'marginBottom': '10px'
+            }),
+            html.Div([
+                html.H1("Income vs Expenses", style={'textAlign': 'center', 'marginBottom': '2px'}),
+            ]),
+
+            html.Div([
+                # Left column (Display Options)
+                html.Div([
+                    html.Label("Display Options", style={
+                        'fontWeight': 'bold',
+                        'fontSize': '16px',
+                        'marginBottom': '6px',
+                        'textAlign': 'center',
+                        'display': 'block'
+                    }),
+                    # Checklist for Income and Expenses
+                    dcc.Checklist(
+                        id='show-options',
+                        options=[
+                            {'label': 'Income', 'value': 'income'},
+                            {'label': 'Expenses', 'value': 'expense'},
+                        ],
+                        value=['income', 'expense'],
+                        style={
+                            'display': 'flex',
+                            'justifyContent': 'center',
+                            'flexWrap': 'wrap',
+                            'gap': '15px'
+                        }
+                    ),
+                    # Radio buttons for line display type
+                    html.Div([
+                        dcc.RadioItems(
+                            id='line-options',
+                            options=[
+                                {'label': 'Trend Lines', 'value': 'regression'},
+                                {'label': 'Average Lines', 'value': 'average'}
+                            ],
+                            value='regression',
+                            labelStyle={'display': 'inline-block', 'marginRight': '15px'},
+                            style={'textAlign': 'center'}
+                        )
+                    ], style={'marginTop': '2px'})
+                    ,
+                    dcc.RadioItems(
+                        id='view-mode',
+                        options=[
+                            {'label': 'By Month', 'value': 'month'},
+                            {'label': 'By Year', 'value': 'year'}
+                        ],
+                        value='month',
+                        labelStyle={'display': 'inline-block', 'marginRight': '12px'},
+                        style={'textAlign': 'center', 'marginTop': '2px'}
+                    )
+                ], style={'flex': '1'}),
+
+                # Right column (Select Timeframe)
+                html.Div([
+                    html.Label("Select Timeframe", style={
+                        'fontWeight': 'bold',
+                        'fontSize': '16px',
+                        'marginBottom': '6px',
+                        'textAlign': 'center',
+                        'display': 'block'
+                    }),
+                    dcc.Checklist(
+                        id='year-filter',
+                        options=[{'label': year, 'value': year} for year in ds.available_years],
+                        value=ds.available_years,
+                        style={
+                            'display': 'flex',
+                            'justifyContent': 'center',
+                            'flexWrap': 'wrap',
+                            'gap': '10px'
+                        }
+                    ),
+                    html.Div([
+                        html.Button("Select All", id="select-all-years", n_clicks=0),
+                        html.Button("Clear All", id="clear-all-years", n_clicks=0),
+                        dcc.Store(id="all-year-options", data=ds.available_years)
+                    ], style={'display': 'flex', 'justifyContent': 'center', 'gap': '10px', 'marginTop': '5px'}),
+                    html.Div([
+                        dcc.Dropdown(
+                            id='range-preset',
+                            options=ds.range_preset_options,
+                            value='years',
+                            clearable=False,
+                            style={'width': '170px', 'textAlign': 'left'}
+                        ),
+                        dcc.DatePickerRange(
+                            id='date-range',
+                            min_date_allowed=ds.first_transaction_date.date(),
+                            max_date_allowed=ds.latest_transaction_date.date(),
+                            initial_visible_month=ds.latest_transaction_date.date(),
+                            display_format='MMM D, YYYY',
+                            clearable=True
+                        )
+                    ], style={'display': 'flex', 'justifyContent': 'center', 'alignItems': 'center', 'gap': '10px', 'marginTop': '8px'})
+                ], style={'flex': '1'})
+            ], style={
+                'display': 'flex',
+                'gap': '0px',
+                'justifyContent': 'space-between',
+                'alignItems': 'center'
+            })
+
         ], style={
-            'textAlign': 'center',
-            'marginBottom': '10px'
+            'position': 'sticky',
+            'top': '0',
+            'zIndex': '1000',
+            'backgroundColor': 'white',
+            'padding': '15px 20px',
+            'borderBottom': '1px solid #ccc'
         }),
+
+        # Totals for the selected date range (hidden in whole-year mode)
         html.Div([
-            html.H1("Income vs Expenses", style={'textAlign': 'center', 'marginBottom': '2px'}),
-        ]),
+            html.Div([
+                html.P("Income", style={'fontWeight': 'bold', 'marginBottom': '4px'}),
+                html.Label(id='range-income-display', style={'fontSize': '24px'})
+            ], style={'textAlign': 'center', 'flex': '1'}),
+            html.Div([
+                html.P("Expenses", style={'fontWeight': 'bold', 'marginBottom': '4px'}),
+                html.Label(id='range-expense-display', style={'fontSize': '24px'})
+            ], style={'textAlign': 'center', 'flex': '1'}),
+            html.Div([
+                html.P("Net", style={'fontWeight': 'bold', 'marginBottom': '4px'}),
+                html.Label(id='range-net-display', style={'fontSize': '24px'})
+            ], style={'textAlign': 'center', 'flex': '1'}),
+            html.Div([
+                html.P("Income-to-Expense Ratio", style={'fontWeight': 'bold', 'marginBottom': '4px'}),
+                html.Label(id='range-ratio-display', style={'fontSize': '24px'})
+            ], style={'textAlign': 'center', 'flex': '1'})
+        ], id='range-kpi-container', style={'display': 'none'}),
 
+        dcc.Graph(id='income-expense-graph'),
+
+        # Container for the Income Account and Expense Sub-Category Filters
+        # Side-by-side Income and Expense Filters
         html.Div([
-            # Left column (Display Options)
+            html.Div(style={'width': '60px'}),
+            # Income filter
             html.Div([
-                html.Label("Display Options", style={
+                html.Label("Income Source", id='account-filter-title', style={
                     'fontWeight': 'bold',
                     'fontSize': '16px',
                     'marginBottom': '6px',
-                    'textAlign': 'center',
-                    'display': 'block'
+                    'display': 'block',
+                    'textAlign': 'center'
                 }),
-                # Checklist for Income and Expenses
                 dcc.Checklist(
-                    id='show-options',
-                    options=[
-                        {'label': 'Income', 'value': 'income'},
-                        {'label': 'Expenses', 'value': 'expense'},
-                    ],
-                    value=['income', 'expense'],
+                    id='account-filter',
+                    options=[{'label': cat, 'value': cat} for cat in ds.income_type_sorted],
+                    value=ds.income_type_sorted,
                     style={
                         'display': 'flex',
-                        'justifyContent': 'center',
                         'flexWrap': 'wrap',
-                        'gap': '15px'
+                        'gap': '10px',
+                        'marginTop': '10px',
+                        'justifyContent': 'left',
+                        'minWidth': '200px'
                     }
                 ),
-                # Radio buttons for line display type
                 html.Div([
-                    dcc.RadioItems(
-                        id='line-options',
-                        options=[
-                            {'label': 'Trend Lines', 'value': 'regression'},
-                            {'label': 'Average Lines', 'value': 'average'}
-                        ],
-                        value='regression',
-                        labelStyle={'display': 'inline-block', 'marginRight': '15px'},
-                        style={'textAlign': 'center'}
-                    )
-                ], style={'marginTop': '2px'})
-                ,
-                dcc.RadioItems(
-                    id='view-mode',
-                    options=[
-                        {'label': 'By Month', 'value': 'month'},
-                        {'label': 'By Year', 'value': 'year'}
-                    ],
-                    value='month',
-                    labelStyle={'display': 'inline-block', 'marginRight': '12px'},
-                    style={'textAlign': 'center', 'marginTop': '2px'}
-                )
-            ], style={'flex': '1'}),
+                        html.Button("Select All", id="select-all-income-filter", n_clicks=0),
+                        html.Button("Clear All", id="clear-all-income-filter", n_clicks=0),
+                        dcc.Store(id='account-filter-options-store')
+                    ], style={'display': 'flex', 'gap': '10px', 'marginTop': '10px', 'justifyContent': 'left'})
+            ], id='account-filter-container', style={'flex': '1'}
+            ),
+            html.Div(style={'width': '50px'}),
 
-            # Right column (Select Timeframe)
+            # Expense Filter Section
             html.Div([
-                html.Label("Select Timeframe", style={
+                html.Label("Expense Source", id='expense-filter-title', style={
                     'fontWeight': 'bold',
                     'fontSize': '16px',
-                    'marginBottom': '6px',
+                    'marginBottom': '0px',
+                    'display': 'block',
                     'textAlign': 'center',
-                    'display': 'block'
+
                 }),
-                dcc.Checklist(
-                    id='year-filter',
-                    options=[{'label': year, 'value': year} for year in available_years],
-                    value=available_years,
-                    style={
-                        'display': 'flex',
-                        'justifyContent': 'center',
-                        'flexWrap': 'wrap',
-                        'gap': '10px'
-                    }
-                ),
+
                 html.Div([
-                    html.Button("Select All", id="select-all-years", n_clicks=0),
-                    html.Button("Clear All", id="clear-all-years", n_clicks=0),
-                    dcc.Store(id="all-year-options", data=available_years)
-                ], style={'display': 'flex', 'justifyContent': 'center', 'gap': '10px', 'marginTop': '5px'})
-            ], style={'flex': '1'})
-        ], style={
-            'display': 'flex',
-            'gap': '0px',
-            'justifyContent': 'space-between',
-            'alignItems': 'center'
-        })
+                    html.P("Debt Payments", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                    dcc.Checklist(
+                        id='payments-filter',
+                        options=[{'label': cat, 'value': cat} for cat in ds.sorted_payments],
+                        value=ds.sorted_payments,
+                        inline=True,
+                        style={
+                            'display': 'flex',
+                            'flexWrap': 'wrap',
+                            'gap': '10px',
+                            'justifyContent': 'left',
+                            'maxWidth': '900px',
+                            'marginTop': '0px'
+                        }
+                    ),
+                    html.Div([
+                        html.Button("Select All", id="select-all-payments", n_clicks=0),
+                        html.Button("Clear All", id="clear-all-payments", n_clicks=0),
+                        dcc.Store(id='payments-filter-options-store', data=ds.sorted_payments)
+                    ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                ], style={'marginBottom': '15px', 'maxWidth': '900px'}),
 
-    ], style={
-        'position': 'sticky',
-        'top': '0',
-        'zIndex': '1000',
-        'backgroundColor': 'white',
-        'padding': '15px 20px',
-        'borderBottom': '1px solid #ccc'
-    }),
 
-    dcc.Graph(id='income-expense-graph'),
+                html.Div([
+                    html.P("General Categories", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                    dcc.Checklist(
+                        id='expense-category-filter',
+                        options=[{'label': cat, 'value': cat} for cat in ds.sorted_expenses],
+                        value=ds.sorted_expenses,
+                        inline=True,
+                        style={
+                            'display': 'flex',
+                            'flexWrap': 'wrap',
+                            'gap': '10px',
+                            'justifyContent': 'left',
+                            'maxWidth': '800px'
+                        }
+                    ),
+                    html.Div([
+                            html.Button("Select All", id="select-all-categories", n_clicks=0),
+                            html.Button("Clear All", id="clear-all-categories", n_clicks=0),
+                            dcc.Store(id='expense-category-filter-options-store', data=ds.sorted_expenses)
+                        ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                ], style={'marginBottom': '15px', 'maxWidth': '800px'}),
 
-    # Container for the Income Account and Expense Sub-Category Filters
-    # Side-by-side Income and Expense Filters
-    html.Div([
-        html.Div(style={'width': '60px'}),
-        # Income filter
-        html.Div([
-            html.Label("Income Source", id='account-filter-title', style={
-                'fontWeight': 'bold',
-                'fontSize': '16px',
-                'marginBottom': '6px',
-                'display': 'block',
-                'textAlign': 'center'
-            }),
-            dcc.Checklist(
-                id='account-filter',
-                options=[{'label': cat, 'value': cat} for cat in income_type_sorted],
-                value=income_type_sorted,
-                style={
+                html.Div([
+                    html.P("Utilities & Insurance", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                    dcc.Checklist(
+                        id='utilities-insurance-filter',
+                        options=[{'label': cat, 'value': cat} for cat in ds.sorted_utilities_insurance],
+                        value=ds.sorted_utilities_insurance,
+                        inline=True,
+                        style={
+                            'display': 'flex',
+                            'flexWrap': 'wrap',
+                            'gap': '10px',
+                            'justifyContent': 'left',
+                            'maxWidth': '800px'
+                        }
+                    ),
+                    html.Div([
+                        html.Button("Select All", id="select-all-utilities", n_clicks=0),
+                        html.Button("Clear All", id="clear-all-utilities", n_clicks=0),
+                        dcc.Store(id='utilities-insurance-filter-options-store', data=ds.sorted_utilities_insurance)
+                    ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                ], style={'marginBottom': '15px', 'maxWidth': '800px'}),
+
+                html.Div([
+                    html.Button("Select All (All Categories)", id="select-all-expenses-master", n_clicks=0),
+                    html.Button("Clear All (All Categories)", id="clear-all-expenses-master", n_clicks=0)
+                ], style={
                     'display': 'flex',
-                    'flexWrap': 'wrap',
                     'gap': '10px',
-                    'marginTop': '10px',
                     'justifyContent': 'left',
-                    'minWidth': '200px'
-                }
-            ),
-            html.Div([
-                    html.Button("Select All", id="select-all-income-filter", n_clicks=0),
-                    html.Button("Clear All", id="clear-all-income-filter", n_clicks=0),
-                    dcc.Store(id='account-filter-options-store')
-                ], style={'display': 'flex', 'gap': '10px', 'marginTop': '10px', 'justifyContent': 'left'})
-        ], id='account-filter-container', style={'flex': '1'}
-        ),
-        html.Div(style={'width': '50px'}),
+                    'marginTop': '10px'
+                })
 
-        # Expense Filter Section
-        html.Div([
-            html.Label("Expense Source", id='expense-filter-title', style={
-                'fontWeight': 'bold',
-                'fontSize': '16px',
-                'marginBottom': '0px',
-                'display': 'block',
-                'textAlign': 'center',
+            ], id='expense-filter-container', style={
+                'flex': '1',
+                'minWidth': '300px',
+                'maxWidth': '300px',
+                'marginLeft': '40px'
+            })
 
-            }),
+        ], style={'display': 'flex', 'gap': '40px', 'alignItems': 'flex-start', 'padding': '20px'}),
+        html.Br(),
+        html.Br(),
+        html.Br(),
+        html.Br()
+    ], style={'padding': '20px','marginTop': '0px'}))
 
-            html.Div([
-                html.P("Debt Payments", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                dcc.Checklist(
-                    id='payments-filter',
-                    options=[{'label': cat, 'value': cat} for cat in sorted_payments],
-                    value=sorted_payments,
-                    inline=True,
-                    style={
-                        'display': 'flex',
-                        'flexWrap': 'wrap',
-                        'gap': '10px',
-                        'justifyContent': 'left',
-                        'maxWidth': '900px',
-                        'marginTop': '0px'
-                    }
-                ),
-                html.Div([
-                    html.Button("Select All", id="select-all-payments", n_clicks=0),
-                    html.Button("Clear All", id="clear-all-payments", n_clicks=0),
-                    dcc.Store(id='payments-filter-options-store', data=sorted_payments)
-                ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-            ], style={'marginBottom': '15px', 'maxWidth': '900px'}),
+@app.callback(
+    Output('year-filter', 'value', allow_duplicate=True),
+    [Input('select-all-years', 'n_clicks'),
+     Input('clear-all-years', 'n_clicks')],
+    State('all-year-options', 'data'),
+    prevent_initial_call=True
+)
+def toggle_year_selection(n_select, n_clear, all_years):
+    ctx = dash.callback_context
+    if not ctx.triggered or all_years is None:
+        return dash.no_update
 
-
-            html.Div([
-                html.P("General Categories", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                dcc.Checklist(
-                    id='expense-category-filter',
-                    options=[{'label': cat, 'value': cat} for cat in sorted_expenses],
-                    value=sorted_expenses,
-                    inline=True,
-                    style={
-                        'display': 'flex',
-                        'flexWrap': 'wrap',
-                        'gap': '10px',
-                        'justifyContent': 'left',
-                        'maxWidth': '800px'
-                    }
-                ),
-                html.Div([
-                        html.Button("Select All", id="select-all-categories", n_clicks=0),
-                        html.Button("Clear All", id="clear-all-categories", n_clicks=0),
-                        dcc.Store(id='expense-category-filter-options-store', data=sorted_expenses)
-                    ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-            ], style={'marginBottom': '15px', 'maxWidth': '800px'}),
-
-            html.Div([
-                html.P("Utilities & Insurance", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                dcc.Checklist(
-                    id='utilities-insurance-filter',
-                    options=[{'label': cat, 'value': cat} for cat in sorted_utilities_insurance],
-                    value=sorted_utilities_insurance,
-                    inline=True,
-                    style={
-                        'display': 'flex',
-                        'flexWrap': 'wrap',
-                        'gap': '10px',
-                        'justifyContent': 'left',
-                        'maxWidth': '800px'
-                    }
-                ),
-                html.Div([
-                    html.Button("Select All", id="select-all-utilities", n_clicks=0),
-                    html.Button("Clear All", id="clear-all-utilities", n_clicks=0),
-                    dcc.Store(id='utilities-insurance-filter-options-store', data=sorted_utilities_insurance)
-                ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-            ], style={'marginBottom': '15px', 'maxWidth': '800px'}),
-
-            html.Div([
-                html.Button("Select All (All Categories)", id="select-all-expenses-master", n_clicks=0),
-                html.Button("Clear All (All Categories)", id="clear-all-expenses-master", n_clicks=0)
-            ], style={
-                'display': 'flex',
-                'gap': '10px',
-                'justifyContent': 'left',
-                'marginTop': '10px'
-            })
-
-        ], id='expense-filter-container', style={
-            'flex': '1',
-            'minWidth': '300px',
-            'maxWidth': '300px',
-            'marginLeft': '40px'
-        })
-
-    ], style={'display': 'flex', 'gap': '40px', 'alignItems': 'flex-start', 'padding': '20px'}),
-    html.Br(),
-    html.Br(),
-    html.Br(),
-    html.Br()
-], style={'padding': '20px','marginTop': '0px'}))
-
-@app.callback(
-    Output('year-filter', 'value', allow_duplicate=True),
-    [Input('select-all-years', 'n_clicks'),
-     Input('clear-all-years', 'n_clicks')],
-    State('all-year-options', 'data'),
-    prevent_initial_call=True
-)
-def toggle_year_selection(n_select, n_clear, all_years):
-    ctx = dash.callback_context
-    if not ctx.triggered or all_years is None:
-        return dash.no_update
-
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
     if button_id == 'select-all-years':
         return all_years
@@ -450,83 +1907,73 @@ def toggle_year_selection(n_select, n_clear, all_years):
         return []
     return dash.no_update
 
-@app.callback(
-    [Output('payments-filter', 'options'),
-     Output('payments-filter', 'value'),
-     Output('payments-filter-options-store', 'data'),
-     Output('utilities-insurance-filter', 'options'),
-     Output('utilities-insurance-filter', 'value'),
-     Output('utilities-insurance-filter-options-store', 'data'),
-     Output('expense-category-filter', 'options'),
-     Output('expense-category-filter', 'value'),
-     Output('expense-category-filter-options-store', 'data')],
-    Input('year-filter', 'value')
-)
-def update_expense_filters_from_year_filter(selected_years):
-    if not selected_years:
-        return ([], [], [], [], [], [], [], [], [])
+# Per-(year, month, account) totals over one year-filter selection, the single aggregate behind both
+# the filter options and the figure on the Income vs Expenses page
+YEAR_SET_CACHE_SIZE = 16
 
-    selected_years_int = [int(y) for y in selected_years]
 
-    # Payments
-    filtered_payments = payment_data[payment_data['Date'].dt.year.isin(selected_years_int)]
-    payments_sorted = (
-        filtered_payments.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
-    )
-    payments_options = [{'label': cat, 'value': cat} for cat in payments_sorted]
-
-    # Utilities & Insurance
-    filtered_ui = pd.concat([utilities_data, insurance_data])
-    filtered_ui = filtered_ui[filtered_ui['Date'].dt.year.isin(selected_years_int)]
-    ui_sorted = (
-        filtered_ui.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
-    )
-    ui_options = [{'label': cat, 'value': cat} for cat in ui_sorted]
+def year_set_aggregate(ds, selected_years):
+    key = frozenset(selected_years)
+    aggregate = ds.year_set_aggregates.get(key)
+    if aggregate is not None:
+        return aggregate
 
-    # General Expenses
-    filtered_expenses = expenses_data[expenses_data['Date'].dt.year.isin(selected_years_int)]
-    expenses_sorted = (
-        filtered_expenses.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
-    )
-    expense_options = [{'label': cat, 'value': cat} for cat in expenses_sorted]
+    years = None if 'All' in selected_years else [int(year) for year in selected_years]
 
-    return (
-        payments_options, payments_sorted, payments_sorted,
-        ui_options, ui_sorted, ui_sorted,
-        expense_options, expenses_sorted, expenses_sorted
-    )
+    def monthly_totals(data):
+        monthly = data.groupby([
+            data['Category'],
+            data['Sub-Category (Account)'],
+            data['Date'].dt.year.rename('Year'),
+            data['Date'].dt.month.rename('Month')
+        ], observed=True)['Amount'].sum()
+        record_scan('groupby', data, monthly)
+        return monthly
 
+    aggregate = {
+        'income': monthly_totals(query_rows(ds, 'income_data', years=years)),
+        'expenses': monthly_totals(query_rows(ds, 'all_expense_data', years=years))
+    }
+    if len(ds.year_set_aggregates) >= YEAR_SET_CACHE_SIZE:
+        ds.year_set_aggregates.clear()
+    ds.year_set_aggregates[key] = aggregate
+    return aggregate
 
-@app.callback(
-    [Output('account-filter', 'options'),
-     Output('account-filter', 'value'),
-     Output('account-filter-options-store', 'data')],
-    Input('year-filter', 'value')
-)
-def update_income_accounts_from_year_filter(selected_years):
-    if not selected_years:
-        return [], [], []
 
-    selected_years_int = [int(y) for y in selected_years]
-    filtered_income = income_data[income_data['Date'].dt.year.isin(selected_years_int)]
+def year_set_account_totals(monthly, categories=None):
+    # Amount per account like account_totals, optionally restricted to some categories
+    if categories is not None:
+        monthly = monthly[monthly.index.get_level_values('Category').isin(categories)]
+    totals = monthly.groupby(level='Sub-Category (Account)', observed=True).sum()
+    totals.index = totals.index.astype(str)
+    return totals
 
-    if filtered_income.empty:
-        return [], [], []
 
-    totals = (
-        filtered_income
-        .groupby('Sub-Category (Account)')['Amount']
-        .sum()
-        .sort_values(ascending=False)
-    )
+def year_set_period_totals(monthly, accounts, view_mode):
+    selected = monthly[monthly.index.get_level_values('Sub-Category (Account)').isin(accounts)]
+    return selected.groupby(level=['Year'] if view_mode == 'year' else ['Year', 'Month']).sum()
+
+
+def income_expense_filter_options(aggregate, selected_years):
+    # Options, selected values and option stores for the income and three expense checklists
+    if not selected_years:
+        return ([], [], []) * 4
 
-    options = [{'label': acc, 'value': acc} for acc in totals.index]
-    values = list(totals.index)
+    income_sorted = accounts_by_total(year_set_account_totals(aggregate['income']))
+    payments_sorted = accounts_by_total(
+        year_set_account_totals(aggregate['expenses'], CATEGORY_FRAMES['payment_data'])
+    )
+    ui_sorted = accounts_by_total(year_set_account_totals(
+        aggregate['expenses'], CATEGORY_FRAMES['utilities_data'] + CATEGORY_FRAMES['insurance_data']
+    ))
+    expenses_sorted = accounts_by_total(
+        year_set_account_totals(aggregate['expenses'], CATEGORY_FRAMES['expenses_data'])
+    )
 
-    return options, values, values
+    outputs = ()
+    for accounts in (income_sorted, payments_sorted, ui_sorted, expenses_sorted):
+        outputs += ([{'label': acc, 'value': acc} for acc in accounts], accounts, accounts)
+    return outputs
 
 
 @app.callback(
@@ -636,55 +2083,159 @@ def toggle_income_filter(select_all_clicks, clear_all_clicks, all_options):
 
 
 @app.callback(
-    Output('income-expense-graph', 'figure'),
-    [Input('account-filter', 'value'),
+    [Output('range-preset', 'value'),
+     Output('date-range', 'start_date'),
+     Output('date-range', 'end_date')],
+    [Input('range-preset', 'value'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')],
+    prevent_initial_call=True
+)
+def sync_date_range(preset, start_date, end_date):
+    ctx = dash.callback_context
+    if not ctx.triggered:
+        raise dash.exceptions.PreventUpdate
+
+    if ctx.triggered_id == 'range-preset':
+        if preset == 'custom':
+            return dash.no_update, dash.no_update, dash.no_update
+        start, end = range_preset_dates(get_dataset(), preset)
+        if start is None:
+            return dash.no_update, None, None
+        return dash.no_update, start.date().isoformat(), end.date().isoformat()
+
+    # Picking dates by hand switches to a custom range; clearing them returns to whole years
+    if not start_date and not end_date:
+        return 'years', dash.no_update, dash.no_update
+    return 'custom', dash.no_update, dash.no_update
+
+
+@app.callback(
+    [Output('range-kpi-container', 'style'),
+     Output('range-income-display', 'children'),
+     Output('range-expense-display', 'children'),
+     Output('range-net-display', 'children'),
+     Output('range-ratio-display', 'children')],
+    [Input('date-range', 'start_date'),
+     Input('date-range', 'end_date'),
+     Input('account-filter', 'value'),
+     Input('payments-filter', 'value'),
+     Input('utilities-insurance-filter', 'value'),
+     Input('expense-category-filter', 'value')]
+)
+def update_range_kpis(start_date, end_date, selected_accounts, payments, utilities, categories):
+    ds = get_dataset()
+
+    if not start_date or not end_date:
+        return {'display': 'none'}, "", "", "", ""
+
+    selected_expenses = (payments or []) + (utilities or []) + (categories or [])
+    income_total = range_total(ds.income_range_sums, selected_accounts or [], start_date, end_date)
+    expense_total = range_total(ds.expense_range_sums, selected_expenses, start_date, end_date)
+    net = income_total - expense_total
+
+    if expense_total == 0:
+        ratio = html.Span("N/A", style={'color': '#777'})
+    else:
+        ratio_value = income_total / expense_total
+        ratio = html.Span(f"{ratio_value:.2f}", style={'color': 'green' if ratio_value >= 1 else 'red'})
+
+    style = {
+        'display': 'flex',
+        'justifyContent': 'space-between',
+        'gap': '5px',
+        'padding': '15px 20px',
+        'borderBottom': '1px solid #ccc'
+    }
+    return (
+        style,
+        f"${to_dollars(income_total):,.0f}",
+        f"${to_dollars(expense_total):,.0f}",
+        html.Span(f"${to_dollars(net):+,.0f}", style={'color': 'green' if net >= 0 else 'red'}),
+        ratio
+    )
+
+
+# One pass per interaction: a year change recomputes the filter options and draws the figure with
+# the new selections, instead of cascading through the filters into a second callback
+@app.callback(
+    [Output('account-filter', 'options'),
+     Output('account-filter', 'value'),
+     Output('account-filter-options-store', 'data'),
+     Output('payments-filter', 'options'),
+     Output('payments-filter', 'value'),
+     Output('payments-filter-options-store', 'data'),
+     Output('utilities-insurance-filter', 'options'),
+     Output('utilities-insurance-filter', 'value'),
+     Output('utilities-insurance-filter-options-store', 'data'),
+     Output('expense-category-filter', 'options'),
+     Output('expense-category-filter', 'value'),
+     Output('expense-category-filter-options-store', 'data'),
+     Output('income-expense-graph', 'figure')],
+    [Input('year-filter', 'value'),
+     Input('account-filter', 'value'),
      Input('payments-filter', 'value'),
      Input('utilities-insurance-filter', 'value'),
      Input('expense-category-filter', 'value'),
-     Input('year-filter', 'value'),
      Input('show-options', 'value'),
      Input('line-options', 'value'),
-     Input('view-mode', 'value')]
+     Input('view-mode', 'value'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
 )
-def update_graph(selected_accounts, payments, utilities, categories, selected_years, show_options, line_option, view_mode):
-    selected_expenses = payments + utilities + categories
+def update_income_expense_page(selected_years, selected_accounts, payments, utilities, categories, show_options,
+                               line_option, view_mode, start_date, end_date):
+    ds = get_dataset()
+
+    # The initial call and year changes reset every filter to the accounts active in those years
+    if dash.callback_context.triggered_id in (None, 'year-filter'):
+        filter_outputs = income_expense_filter_options(year_set_aggregate(ds, selected_years or []), selected_years)
+        selected_accounts, payments, utilities, categories = filter_outputs[1::3]
+    else:
+        filter_outputs = (dash.no_update,) * 12
+
+    figure = build_income_expense_figure(
+        selected_accounts, payments, utilities, categories, selected_years, show_options,
+        line_option, view_mode, start_date, end_date
+    )
+    return (*filter_outputs, figure)
 
-    # Filter income data based on selected accounts
-    filtered_income_data = income_data[income_data['Sub-Category (Account)'].isin(selected_accounts)]
 
-    if not selected_years or not selected_accounts or not selected_expenses or not show_options:
+@memoized_view
+def build_income_expense_figure(selected_accounts, payments, utilities, categories, selected_years, show_options,
+                                line_option, view_mode, start_date=None, end_date=None):
+    ds = get_dataset()
+    aggregate = year_set_aggregate(ds, selected_years or [])
+
+    selected_expenses = payments + utilities + categories
+    range_mode = bool(start_date and end_date)
+
+    if (not selected_years and not range_mode) or not selected_accounts or not selected_expenses or not show_options:
         return create_empty_figure(title='Income vs Expenses', message="Please select at least one filter option.")
 
-    # Filter expense data based on combined selections
-    filtered_expense_data = all_expense_data[all_expense_data['Sub-Category (Account)'].isin(selected_expenses)]
-
-    # Filter by selected years
-    if 'All' not in selected_years:
-        selected_years_int = [int(year) for year in selected_years]
-        filtered_income_data = filtered_income_data[filtered_income_data['Date'].dt.year.isin(selected_years_int)]
-        filtered_expense_data = filtered_expense_data[
-            filtered_expense_data['Date'].dt.year.isin(selected_years_int)]
-
-    if view_mode == 'year':
-        # Group by year
-        income_by_period = filtered_income_data.groupby(filtered_income_data['Date'].dt.year)['Amount'].sum()
-        expense_by_period = filtered_expense_data.groupby(filtered_expense_data['Date'].dt.year)['Amount'].sum()
-        period_labels = income_by_period.index.astype(str)
+    if range_mode:
+        # Date range: period totals straight from the prefix sums
+        freq = 'Y' if view_mode == 'year' else 'M'
+        income_by_period = range_period_totals(ds.income_range_sums, selected_accounts, start_date, end_date, freq)
+        expense_by_period = range_period_totals(ds.expense_range_sums, selected_expenses, start_date, end_date, freq)
+        if view_mode == 'year':
+            period_labels = income_by_period.index.astype(str)
+        else:
+            period_labels = pd.to_datetime(income_by_period.index.map(lambda x: f"{x[0]}-{x[1]:02d}"))
     else:
-        # Group by year and month
-        income_by_period = \
-        filtered_income_data.groupby([filtered_income_data['Date'].dt.year, filtered_income_data['Date'].dt.month])[
-            'Amount'].sum()
-        expense_by_period = \
-        filtered_expense_data.groupby([filtered_expense_data['Date'].dt.year, filtered_expense_data['Date'].dt.month])[
-            'Amount'].sum()
-        period_labels = pd.to_datetime(income_by_period.index.map(lambda x: f"{x[0]}-{x[1]:02d}"))
+        # Selected years: period totals from the year-set aggregate, filtered to the selected accounts
+        income_by_period = year_set_period_totals(aggregate['income'], selected_accounts, view_mode)
+        expense_by_period = year_set_period_totals(aggregate['expenses'], selected_expenses, view_mode)
+        if view_mode == 'year':
+            period_labels = income_by_period.index.astype(str)
+        else:
+            period_labels = pd.to_datetime(income_by_period.index.map(lambda x: f"{x[0]}-{x[1]:02d}"))
 
     # Combine income and expenses
-    combined_df = pd.DataFrame({
+    combined_df = to_dollars(pd.DataFrame({
         'Income': income_by_period,
         'Expenses': expense_by_period
-    }).fillna(0)
+    }).fillna(0))
 
     income_avg = combined_df['Income'].mean()
     expense_avg = combined_df['Expenses'].mean()
@@ -696,28 +2247,6 @@ def update_graph(selected_accounts, payments, utilities, categories, selected_ye
     income_trend = slope_income * x + intercept_income
     expense_trend = slope_expense * x + intercept_expense
 
-
-    # Group by year and month
-    income_by_month = filtered_income_data.groupby([filtered_income_data['Date'].dt.year, filtered_income_data['Date'].dt.month])['Amount'].sum()
-    expense_by_month = filtered_expense_data.groupby([filtered_expense_data['Date'].dt.year, filtered_expense_data['Date'].dt.month])['Amount'].sum()
-
-    # Combine into a single dataframe
-    income_vs_expense_by_month = pd.DataFrame({
-        'Income': income_by_month,
-        'Expenses': expense_by_month
-    }).fillna(0)
-
-    # Create datetime index
-    income_vs_expense_by_month['Year-Month'] = pd.to_datetime(income_vs_expense_by_month.index.map(lambda x: f"{x[0]}-{x[1]:02d}"))
-
-    # Prepare regression lines for filtered data
-    x = np.arange(len(income_vs_expense_by_month))
-    slope_income, intercept_income, _, _, _ = linregress(x, income_vs_expense_by_month['Income'])
-    slope_expenses, intercept_expenses, _, _, _ = linregress(x, income_vs_expense_by_month['Expenses'])
-
-    income_regression_line = slope_income * x + intercept_income
-    expenses_regression_line = slope_expenses * x + intercept_expenses
-
     # Create the interactive plot with Plotly
     fig = go.Figure()
 
@@ -830,665 +2359,711 @@ def toggle_filters(show_options):
 
 
 # Layout for the Yearly Summary page
-yearly_summary_layout = html.Div([
-    html.Div([
-        # Navigation links
-        html.Div([
-            html.A('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
-            html.A('Yearly Summary', href='/yearly-summary')
-        ], style={
-            'textAlign': 'center',
-            'marginBottom': '10px'
-        }),
-
-        html.Div(id='yearly-summary-title'),
-        html.Div(
-            id='year-month-radio-container',
-            style={'display': 'none'},  # <-- hides it!
-            children=[
-                html.Div([
-                    html.Label('Select Year', style= {'fontWeight': 'bold'}),
-                    dcc.RadioItems(
-                        id='year-radio',
-                        options=[{'label': str(year), 'value': year} for year in sorted(df['Date'].dt.year.unique())],
-                        value=df['Date'].dt.year.max(),
-                        inline=True,
-                        style={'justifyContent': 'center'}
-                    )
-                ], style={
-                    'textAlign': 'center',
-                    'marginTop': '10px',
-                    'marginBottom': '5px'
-                }),
-                html.Div([
-                    html.Label('Select Month', style= {'fontWeight': 'bold'}),
-                    dcc.RadioItems(
-                        id='month-radio',
-                        options=[{'label': m, 'value': i} for i, m in enumerate(
-                            ['Full Year', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                             'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                        )],
-                        value=0,  # Default to "Full Year"
-                        inline=True,
-                        style={'justifyContent': 'center'}
-                    )
-                ], style={
-                    'textAlign': 'center',
-                    'marginTop': '0px',
-                    'marginBottom': '0px'
-                })
-            ]
-        ),
+def yearly_summary_layout():
+    ds = get_dataset()
+    return html.Div([
         html.Div([
-             html.Div([
-                dcc.Dropdown(
-                    id='selected-month-dropdown',
-                    options=[
-                        {'label': 'Full Year', 'value': 0},
-                        {'label': 'January', 'value': 1},
-                        {'label': 'February', 'value': 2},
-                        {'label': 'March', 'value': 3},
-                        {'label': 'April', 'value': 4},
-                        {'label': 'May', 'value': 5},
-                        {'label': 'June', 'value': 6},
-                        {'label': 'July', 'value': 7},
-                        {'label': 'August', 'value': 8},
-                        {'label': 'September', 'value': 9},
-                        {'label': 'October', 'value': 10},
-                        {'label': 'November', 'value': 11},
-                        {'label': 'December', 'value': 12},
-                    ],
-                    clearable=False,
-                    style={
-                        'width': '100px',
-                        'padding': '1px 1px',
-                        'border': '1px solid #ccc',
-                        'textAlign': 'left',
-                        'whiteSpace': 'nowrap',
-                        'fontFamily': 'arial',
-                        'display': 'flex',
-                        'alignItems': 'center',
-                        'justifyContent': 'right'
-                    }
-                )
-            ]),
-
-            html.Div('-', style={
-                'width': '30px',
+            # Navigation links
+            html.Div([
+                html.A('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
+                html.A('Yearly Summary', href='/yearly-summary', style={'marginRight': '20px'}),
+                html.A('Transactions', href='/transactions', style={'marginRight': '20px'}),
+                html.A('Correlations', href='/correlations')
+            ], style={
                 'textAlign': 'center',
-                'fontFamily': 'arial',
-                'fontWeight': 'bold',
-                'color': '#555',
-                'display': 'flex',
-                'alignItems': 'center',
-                'justifyContent': 'center'
+                'marginBottom': '10px'
             }),
 
+            html.Div(id='yearly-summary-title'),
             html.Div(
-                dcc.Dropdown(
-                    id='selected-year-dropdown',
-                    options=[],  # dynamically populated
-                    value=None,  # will be set based on current selected year
-                    clearable=False,
-                     style={
-                        'width': '80px',
-                        'padding': '1px 1px',
-                        'border': '1px solid #ccc',
-                        'textAlign': 'left',
-                        'whiteSpace': 'nowrap',
-                        'fontFamily': 'arial',
-                        'display': 'flex',
-                        'alignItems': 'center',
-                        'justifyContent': 'right'
-                     })
-            )
-        ], style={
-            'display': 'flex',
-            'alignItems': 'center',
-            'justifyContent': 'center',
-            'gap': '0px',
-            'marginBottom': '2px',
-        })
-        ,
-        html.Div([
-            dcc.Store(id='month-change-store'),
-            dcc.Store(id='year-change-store'),
+                id='year-month-radio-container',
+                style={'display': 'none'},  # <-- hides it!
+                children=[
+                    html.Div([
+                        html.Label('Select Year', style= {'fontWeight': 'bold'}),
+                        dcc.RadioItems(
+                            id='year-radio',
+                            options=[{'label': year, 'value': int(year)} for year in ds.available_years],
+                            value=int(ds.latest_year),
+                            inline=True,
+                            style={'justifyContent': 'center'}
+                        )
+                    ], style={
+                        'textAlign': 'center',
+                        'marginTop': '10px',
+                        'marginBottom': '5px'
+                    }),
+                    html.Div([
+                        html.Label('Select Month', style= {'fontWeight': 'bold'}),
+                        dcc.RadioItems(
+                            id='month-radio',
+                            options=[{'label': m, 'value': i} for i, m in enumerate(
+                                ['Full Year', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                                 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+                            )],
+                            value=0,  # Default to "Full Year"
+                            inline=True,
+                            style={'justifyContent': 'center'}
+                        )
+                    ], style={
+                        'textAlign': 'center',
+                        'marginTop': '0px',
+                        'marginBottom': '0px'
+                    })
+                ]
+            ),
             html.Div([
-                html.Button('First', id='first-button', n_clicks=0, title='Go to the first year of data', style={
-                    'margin': '0 4px',
-                    'padding': '6px 12px',
-                    'fontSize': '14px'
+                 html.Div([
+                    dcc.Dropdown(
+                        id='selected-month-dropdown',
+                        options=[
+                            {'label': 'Full Year', 'value': 0},
+                            {'label': 'January', 'value': 1},
+                            {'label': 'February', 'value': 2},
+                            {'label': 'March', 'value': 3},
+                            {'label': 'April', 'value': 4},
+                            {'label': 'May', 'value': 5},
+                            {'label': 'June', 'value': 6},
+                            {'label': 'July', 'value': 7},
+                            {'label': 'August', 'value': 8},
+                            {'label': 'September', 'value': 9},
+                            {'label': 'October', 'value': 10},
+                            {'label': 'November', 'value': 11},
+                            {'label': 'December', 'value': 12},
+                        ],
+                        clearable=False,
+                        style={
+                            'width': '100px',
+                            'padding': '1px 1px',
+                            'border': '1px solid #ccc',
+                            'textAlign': 'left',
+                            'whiteSpace': 'nowrap',
+                            'fontFamily': 'arial',
+                            'display': 'flex',
+                            'alignItems': 'center',
+                            'justifyContent': 'right'
+                        }
+                    )
+                ]),
+
+                html.Div('-', style={
+                    'width': '30px',
+                    'textAlign': 'center',
+                    'fontFamily': 'arial',
+                    'fontWeight': 'bold',
+                    'color': '#555',
+                    'display': 'flex',
+                    'alignItems': 'center',
+                    'justifyContent': 'center'
                 }),
-                html.Button('<<', id='prev-year-button', n_clicks=0, title='Go to the previous year of data', disabled=False),
-                html.Button("<", id="prev-month-button", n_clicks=0, title='Go to the previous month of data', disabled=False),
-                html.Button(">", id="next-month-button", n_clicks=0, title='Go to the next month of data'),
-                html.Button(">>", id="next-year-button", n_clicks=0, title='Go to the next year of data'),
-                html.Button("Latest", id="latest-button", n_clicks=0, title='Go to most recent year of data')
+
+                html.Div(
+                    dcc.Dropdown(
+                        id='selected-year-dropdown',
+                        options=[],  # dynamically populated
+                        value=None,  # will be set based on current selected year
+                        clearable=False,
+                         style={
+                            'width': '80px',
+                            'padding': '1px 1px',
+                            'border': '1px solid #ccc',
+                            'textAlign': 'left',
+                            'whiteSpace': 'nowrap',
+                            'fontFamily': 'arial',
+                            'display': 'flex',
+                            'alignItems': 'center',
+                            'justifyContent': 'right'
+                         })
+                )
             ], style={
                 'display': 'flex',
+                'alignItems': 'center',
                 'justifyContent': 'center',
-                'gap': '10px',
-                'marginTop': '8px',
-                'marginBottom': '0px'
+                'gap': '0px',
+                'marginBottom': '2px',
             })
-        ])
-        ,
-
+            ,
+            html.Div([
+                dcc.Store(id='month-change-store'),
+                dcc.Store(id='year-change-store'),
+                html.Div([
+                    html.Button('First', id='first-button', n_clicks=0, title='Go to the first year of data', style={
+                        'margin': '0 4px',
+                        'padding': '6px 12px',
+                        'fontSize': '14px'
+                    }),
+                    html.Button('<<', id='prev-year-button', n_clicks=0, title='Go to the previous year of data', disabled=False),
+                    html.Button("<", id="prev-month-button", n_clicks=0, title='Go to the previous month of data', disabled=False),
+                    html.Button(">", id="next-month-button", n_clicks=0, title='Go to the next month of data'),
+                    html.Button(">>", id="next-year-button", n_clicks=0, title='Go to the next year of data'),
+                    html.Button("Latest", id="latest-button", n_clicks=0, title='Go to most recent year of data')
+                ], style={
+                    'display': 'flex',
+                    'justifyContent': 'center',
+                    'gap': '10px',
+                    'marginTop': '8px',
+                    'marginBottom': '0px'
+                })
+            ])
+            ,
 
 
-    ], style={
-        'textAlign': 'center',
-        'position': 'sticky',
-        'top': '0',
-        'backgroundColor': 'white',
-        'zIndex': '1000',
-        'padding': '15px 0',
-        'borderBottom': '1px solid #ccc'
-    }),
 
-    # FINANCIAL OVERVIEW SECTION
-    html.Div([
-        html.H2("Financial Overview", style={'textAlign': 'center', 'marginBottom': '20px'}),
+        ], style={
+            'textAlign': 'center',
+            'position': 'sticky',
+            'top': '0',
+            'backgroundColor': 'white',
+            'zIndex': '1000',
+            'padding': '15px 0',
+            'borderBottom': '1px solid #ccc'
+        }),
 
+        # FINANCIAL OVERVIEW SECTION
         html.Div([
-            # === Ratio Gauges ===
+            html.H2("Financial Overview", style={'textAlign': 'center', 'marginBottom': '20px'}),
+
             html.Div([
+                # === Ratio Gauges ===
                 html.Div([
-                    dcc.Graph(id='income-to-expense-gauge', config={'displayModeBar': False})
-                ], style={'flex': '1', 'padding': '0px'}),
-                html.Div([
-                    dcc.Graph(id='debt-to-income-gauge', config={'displayModeBar': False})
-                ], style={'flex': '1', 'padding': '0px'}),
-                html.Div([
-                    dcc.Graph(id='cash-to-debt-gauge', config={'displayModeBar': False})
-                ], style={'flex': '1', 'padding': '0px'})
+                    html.Div([
+                        dcc.Graph(id='income-to-expense-gauge', config={'displayModeBar': False})
+                    ], style={'flex': '1', 'padding': '0px'}),
+                    html.Div([
+                        dcc.Graph(id='debt-to-income-gauge', config={'displayModeBar': False})
+                    ], style={'flex': '1', 'padding': '0px'}),
+                    html.Div([
+                        dcc.Graph(id='cash-to-debt-gauge', config={'displayModeBar': False})
+                    ], style={'flex': '1', 'padding': '0px'})
 
-            ], style={'display': 'flex', 'justifyContent': 'center', 'gap': '0px', 'marginBottom': '0px'})
-        ]),
+                ], style={'display': 'flex', 'justifyContent': 'center', 'gap': '0px', 'marginBottom': '0px'})
+            ]),
 
-        # === Financial Snapshot Row ===
-        html.Div([
-            # === Income Section ===
+            # === Rolling Ratios ===
             html.Div([
-                # First row: Total Income (larger font)
-                html.Div([
-                    html.P("Total Income", style={
-                        'fontWeight': 'bold',
-                        'fontSize': '22px',
-                        'marginBottom': '4px'
-                    }),
-                    html.Label(id='income-total-display', style={
-                        'fontSize': '42px'
-                    })
-                ], style={'textAlign': 'center', 'marginBottom': '0px'}),
+                dcc.RadioItems(
+                    id='rolling-window-radio',
+                    options=[{'label': f'{window} Months', 'value': window} for window in ROLLING_RATIO_WINDOWS],
+                    value=12,
+                    inline=True,
+                    style={'justifyContent': 'center'}
+                ),
+                dcc.Graph(id='rolling-ratios-chart', config={'displayModeBar': False})
+            ], style={'textAlign': 'center', 'marginBottom': '20px'}),
 
-                # Second row: Monthly Avg and % Change
+            # === Financial Snapshot Row ===
+            html.Div([
+                # === Income Section ===
                 html.Div([
-                    # Monthly Average
+                    # First row: Total Income (larger font)
                     html.Div([
-                        html.P("Monthly Average", style={'fontWeight': 'bold', 'minWidth': '120px', 'marginBottom': '4px'}),
-                        html.Label(id='income-avg-display', style={'fontSize': '20px'})
-                    ], id='income-avg-container', style={'textAlign': 'center'}),
+                        html.P("Total Income", style={
+                            'fontWeight': 'bold',
+                            'fontSize': '22px',
+                            'marginBottom': '4px'
+                        }),
+                        html.Label(id='income-total-display', style={
+                            'fontSize': '42px'
+                        })
+                    ], style={'textAlign': 'center', 'marginBottom': '0px'}),
 
-                    # % Change
+                    # Second row: Monthly Avg and % Change
                     html.Div([
-                        html.P(id='income-change-title', children="% Income Change (YTD):",
-                               style={'fontWeight': 'bold', 'minWidth': '180px', 'textAlign': 'left', 'marginBottom': '4px'}),
+                        # Monthly Average
                         html.Div([
-                            html.Label(id='income-change-display', style={'fontSize': '18px', 'minWidth': '100px'}),
-                            html.Label(id='income-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
-                        ])
-                    ], style={'textAlign': 'center', 'marginLeft': '20px', 'minWidth':'100px'})
+                            html.P("Monthly Average", style={'fontWeight': 'bold', 'minWidth': '120px', 'marginBottom': '4px'}),
+                            html.Label(id='income-avg-display', style={'fontSize': '20px'})
+                        ], id='income-avg-container', style={'textAlign': 'center'}),
+
+                        # % Change
+                        html.Div([
+                            html.P(id='income-change-title', children="% Income Change (YTD):",
+                                   style={'fontWeight': 'bold', 'minWidth': '180px', 'textAlign': 'left', 'marginBottom': '4px'}),
+                            html.Div([
+                                html.Label(id='income-change-display', style={'fontSize': '18px', 'minWidth': '100px'}),
+                                html.Label(id='income-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
+                            ])
+                        ], style={'textAlign': 'center', 'marginLeft': '20px', 'minWidth':'100px'})
+                    ], style={
+                        'display': 'flex',
+                        'justifyContent': 'center',
+                        'gap': '0px'
+                    })
                 ], style={
-                    'display': 'flex',
-                    'justifyContent': 'center',
-                    'gap': '0px'
-                })
-            ], style={
-                'flex': '1',
-                'padding': '30px 0',
-                'minWidth': '300px',
-                'flexGrow': 1
-            }),
+                    'flex': '1',
+                    'padding': '30px 0',
+                    'minWidth': '300px',
+                    'flexGrow': 1
+                }),
 
-            # === Expense Section ===
-            html.Div([
-                # First row: Total Expenses (larger font)
+                # === Expense Section ===
                 html.Div([
-                    html.P("Total Expenses", style={
-                        'fontWeight': 'bold',
-                        'fontSize': '22px',
-                        'marginBottom': '4px'
-                    }),
-                    html.Label(id='expense-total-display', style={
-                        'fontSize': '42px'
+                    # First row: Total Expenses (larger font)
+                    html.Div([
+                        html.P("Total Expenses", style={
+                            'fontWeight': 'bold',
+                            'fontSize': '22px',
+                            'marginBottom': '4px'
+                        }),
+                        html.Label(id='expense-total-display', style={
+                            'fontSize': '42px'
+                        })
+                    ], style={'textAlign': 'center', 'marginBottom': '0px'}),
+
+                    # Second row: Monthly Avg and % Change
+                    html.Div([
+                        # Monthly Average
+                        html.Div([
+                            html.P("Monthly Average", style={'fontWeight': 'bold', 'minWidth': '120px', 'marginBottom': '4px'}),
+                            html.Label(id='expense-avg-display', style={'fontSize': '20px'})
+                        ], id='expense-avg-container', style={'textAlign': 'center'}),
+
+                        # % Change
+                        html.Div([
+                            html.P(id='expense-change-title', children="% Expense Change (YTD):",
+                                   style={'fontWeight': 'bold', 'minWidth': '180px', 'textAlign': 'left', 'marginBottom': '4px'}),
+                            html.Div([
+                                html.Label(id='expense-change-display', style={'fontSize': '18px', 'minWidth': '100px'}),
+                                html.Label(id='expense-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
+                            ])
+                        ], style={'textAlign': 'center', 'marginLeft': '20px', 'minWidth':'100px'})
+                    ], style={
+                        'display': 'flex',
+                        'justifyContent': 'center',
+                        'gap': '0px'
                     })
-                ], style={'textAlign': 'center', 'marginBottom': '0px'}),
+                ], style={
+                    'flex': '1',
+                    'padding': '30px 0',
+                    'minWidth': '300px',
+                    'flexGrow': 1}
+                ),
 
-                # Second row: Monthly Avg and % Change
+                # === Cash Section ===
                 html.Div([
-                    # Monthly Average
+                    # First row: Total Cash (larger font)
                     html.Div([
-                        html.P("Monthly Average", style={'fontWeight': 'bold', 'minWidth': '120px', 'marginBottom': '4px'}),
-                        html.Label(id='expense-avg-display', style={'fontSize': '20px'})
-                    ], id='expense-avg-container', style={'textAlign': 'center'}),
+                        html.P("Total Cash on Hand", style={
+                            'fontWeight': 'bold',
+                            'fontSize': '22px',
+                            'marginBottom': '4px'
+                        }),
+                        html.Label(id='total-cash-display', style={
+                            'fontSize': '42px'
+                        })
+                    ], style={'textAlign': 'center', 'marginBottom': '0px'}),
 
-                    # % Change
+                    # Second row: % Change
                     html.Div([
-                        html.P(id='expense-change-title', children="% Expense Change (YTD):",
-                               style={'fontWeight': 'bold', 'minWidth': '180px', 'textAlign': 'left', 'marginBottom': '4px'}),
                         html.Div([
-                            html.Label(id='expense-change-display', style={'fontSize': '18px', 'minWidth': '100px'}),
-                            html.Label(id='expense-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
-                        ])
-                    ], style={'textAlign': 'center', 'marginLeft': '20px', 'minWidth':'100px'})
+                            html.P(id='cash-change-title', children="% Cash Change (YTD):", style={
+                                'fontWeight': 'bold', 'marginBottom': '4px'}),
+                            html.Div([
+                                html.Label(id='cash-change-display', style={'fontSize': '18px'}),
+                                html.Label(id='cash-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
+                            ])
+                        ], style={'textAlign': 'center', 'minWidth': '100px'})
+                    ]),
                 ], style={
-                    'display': 'flex',
-                    'justifyContent': 'center',
-                    'gap': '0px'
-                })
-            ], style={
-                'flex': '1',
-                'padding': '30px 0',
-                'minWidth': '300px',
-                'flexGrow': 1}
-            ),
+                    'flex': '1',
+                    'padding': '30px 0',
+                    'minWidth': '300px',
+                    'flexGrow': 1
+                }),
 
-            # === Cash Section ===
-            html.Div([
-                # First row: Total Cash (larger font)
+                # === Debt Section ===
                 html.Div([
-                    html.P("Total Cash on Hand", style={
-                        'fontWeight': 'bold',
-                        'fontSize': '22px',
-                        'marginBottom': '4px'
-                    }),
-                    html.Label(id='total-cash-display', style={
-                        'fontSize': '42px'
-                    })
-                ], style={'textAlign': 'center', 'marginBottom': '0px'}),
+                    # First row: Total Remaining Debt (larger font)
+                    html.Div([
+                        html.P("Total Remaining Debt", style={
+                            'fontWeight': 'bold',
+                            'fontSize': '22px',
+                            'marginBottom': '4px'
+                        }),
+                        html.Label(id='total-debt-display', style={
+                            'fontSize': '42px'
+                        })
+                    ], style={'textAlign': 'center', 'marginBottom': '0px'}),
 
-                # Second row: % Change
-                html.Div([
+                    # Second row: % Change
                     html.Div([
-                        html.P(id='cash-change-title', children="% Cash Change (YTD):", style={
-                            'fontWeight': 'bold', 'marginBottom': '4px'}),
                         html.Div([
-                            html.Label(id='cash-change-display', style={'fontSize': '18px'}),
-                            html.Label(id='cash-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
-                        ])
-                    ], style={'textAlign': 'center', 'minWidth': '100px'})
-                ]),
+                            html.P(id='debt-change-title', children="% Debt Change (YTD):", style={
+                                'fontWeight': 'bold', 'marginBottom': '4px'}),
+                            html.Div([
+                                html.Label(id='debt-change-display', style={'fontSize': '18px'}),
+                                html.Label(id='debt-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
+                            ])
+                        ], style={'textAlign': 'center', 'minWidth': '100px'})
+                    ])
+                ], style={
+                    'flex': '1',
+                    'padding': '30px 0',
+                    'minWidth': '300px',
+                    'flexGrow': 1
+                })
             ], style={
-                'flex': '1',
-                'padding': '30px 0',
-                'minWidth': '300px',
-                'flexGrow': 1
-            }),
+                'display': 'flex',
+                'justifyContent': 'space-between',
+                'alignItems': 'flex-start',
+                'gap': '5px',
+                'marginTop': '0px',
+                'marginBottom': '40px'
+            }
+        ),
 
-            # === Debt Section ===
+            # === Pie Charts (Cash on Hand & Remaining Debt) ===
             html.Div([
-                # First row: Total Remaining Debt (larger font)
+                html.Div(style={'width': '20px'}),
                 html.Div([
-                    html.P("Total Remaining Debt", style={
-                        'fontWeight': 'bold',
-                        'fontSize': '22px',
-                        'marginBottom': '4px'
-                    }),
-                    html.Label(id='total-debt-display', style={
-                        'fontSize': '42px'
-                    })
-                ], style={'textAlign': 'center', 'marginBottom': '0px'}),
-
-                # Second row: % Change
+                    html.P("Cash Accounts",
+                           style={
+                                'fontWeight': 'bold',
+                                'fontSize': '20px',
+                                }),
+                    dcc.Graph(id='cash-pie-chart', config={'displayModeBar': False}, style={'height': '360px', 'minWidth': '650px'})
+                ], style={'flex': '1', 'textAlign': 'center'}),
+                html.Div(style={'width': '10px'}),
                 html.Div([
-                    html.Div([
-                        html.P(id='debt-change-title', children="% Debt Change (YTD):", style={
-                            'fontWeight': 'bold', 'marginBottom': '4px'}),
-                        html.Div([
-                            html.Label(id='debt-change-display', style={'fontSize': '18px'}),
-                            html.Label(id='debt-change-amount', style={'fontSize': '14px', 'color': '#777', 'marginLeft': '10px'})
-                        ])
-                    ], style={'textAlign': 'center', 'minWidth': '100px'})
-                ])
+                    html.P("Debt Accounts",
+                           style={
+                                'fontWeight': 'bold',
+                                'fontSize': '20px',
+                                }),
+                    dcc.Graph(id='debt-pie-chart', config={'displayModeBar': False}, style={'height': '360px', 'minWidth': '650px'})
+                ], style={'flex': '1', 'textAlign': 'center'})
             ], style={
-                'flex': '1',
+                'display': 'flex',
+                'justifyContent': 'center',
+                'gap': '0px',
                 'padding': '30px 0',
-                'minWidth': '300px',
-                'flexGrow': 1
-            })
-        ], style={
-            'display': 'flex',
-            'justifyContent': 'space-between',
-            'alignItems': 'flex-start',
-            'gap': '5px',
-            'marginTop': '0px',
-            'marginBottom': '40px'
-        }
-    ),
+                'borderTop': '1px solid #ccc'
+            }),
 
-        # === Pie Charts (Cash on Hand & Remaining Debt) ===
-        html.Div([
-            html.Div(style={'width': '20px'}),
-            html.Div([
-                html.P("Cash Accounts",
-                       style={
-                            'fontWeight': 'bold',
-                            'fontSize': '20px',
-                            }),
-                dcc.Graph(id='cash-pie-chart', config={'displayModeBar': False}, style={'height': '360px', 'minWidth': '650px'})
-            ], style={'flex': '1', 'textAlign': 'center'}),
-            html.Div(style={'width': '10px'}),
+            # === Net Worth History ===
             html.Div([
-                html.P("Debt Accounts",
-                       style={
-                            'fontWeight': 'bold',
-                            'fontSize': '20px',
-                            }),
-                dcc.Graph(id='debt-pie-chart', config={'displayModeBar': False}, style={'height': '360px', 'minWidth': '650px'})
-            ], style={'flex': '1', 'textAlign': 'center'})
-        ], style={
-            'display': 'flex',
-            'justifyContent': 'center',
-            'gap': '0px',
-            'padding': '30px 0',
-            'borderTop': '1px solid #ccc'
-        })
+                dcc.RadioItems(
+                    id='net-worth-view',
+                    options=[{'label': 'Total', 'value': 'total'}, {'label': 'By Account', 'value': 'accounts'}],
+                    value='total',
+                    inline=True,
+                    style={'justifyContent': 'center'}
+                ),
+                dcc.Graph(id='net-worth-chart', config={'displayModeBar': False})
+            ], style={'textAlign': 'center', 'padding': '20px 0', 'borderTop': '1px solid #ccc'}),
 
-    ]),
-    html.Hr(style={
-        'border': 'none',
-        'borderTop': '2px solid #ccc',
-        'margin': '20px 0'
-    }),
+            # === Year-End Forecast (latest, incomplete year only) ===
+            html.Progress(id='forecast-progress', value='0', max='4', style={'display': 'none'}),
+            html.Div(id='forecast-section', style={'display': 'none'})
 
-    # MONTHLY BREAKDOWN SECTION
-    html.Div([
-        html.H2("Monthly Details", style={'textAlign': 'center', 'marginBottom': '20px'}),
+        ]),
+        html.Hr(style={
+            'border': 'none',
+            'borderTop': '2px solid #ccc',
+            'margin': '20px 0'
+        }),
 
+        # MONTHLY BREAKDOWN SECTION
         html.Div([
-            # INCOME CHART + FILTER
+            html.H2("Monthly Details", style={'textAlign': 'center', 'marginBottom': '20px'}),
+
             html.Div([
-                dcc.Graph(id='monthly-income-bar-chart', style={'marginBottom': '0px', 'minWidth': '600px'}),
+                # INCOME CHART + FILTER
                 html.Div([
-                    html.Label("Income Source", style={
-                        'fontFamily': 'Open Sans',
-                        'fontSize': '16px',
-                        'fontWeight': 'bold',
-                        'marginBottom': '4px',
-                        'marginTop': '10px',
-                        'display': 'block',
-                        'textAlign': 'center'
-                    }),
-
-                    # Center the checklist using a wrapper div
+                    dcc.Graph(id='monthly-income-bar-chart', style={'marginBottom': '0px', 'minWidth': '600px'}),
                     html.Div([
-                        dcc.Checklist(
-                            id='income-type-checklist',
-                            options=[],  # dynamically filled
-                            value=[],
-                            inline=True,
-                            style={
-                                'display': 'flex',
-                                'flexWrap': 'wrap',
-                                'gap': '15px',
-                                'fontFamily': 'Open Sans',
-                                'fontSize': '16px',
-                                'textAlign': 'left',
-                                'marginLeft': '30px'
-                            }
-                        ),
-                    ], style={
-                        'display': 'flex',
-                        'justifyContent': 'left',
-                        'marginBottom': '10px',
-                        'marginTop': '10px'
-                    }),
+                        html.Label("Income Source", style={
+                            'fontFamily': 'Open Sans',
+                            'fontSize': '16px',
+                            'fontWeight': 'bold',
+                            'marginBottom': '4px',
+                            'marginTop': '10px',
+                            'display': 'block',
+                            'textAlign': 'center'
+                        }),
 
-                    html.Div([
-                        html.Button("Select All", id="select-all-income-types", n_clicks=0),
-                        html.Button("Clear All", id="clear-all-income-types", n_clicks=0),
-                        dcc.Store(id='all-income-options'),
-                    ], style={'display': 'flex', 'gap': '10px', 'marginBottom': '10px', 'marginLeft': '30px', 'justifyContent': 'left'})
+                        # Center the checklist using a wrapper div
+                        html.Div([
+                            dcc.Checklist(
+                                id='income-type-checklist',
+                                options=[],  # dynamically filled
+                                value=[],
+                                inline=True,
+                                style={
+                                    'display': 'flex',
+                                    'flexWrap': 'wrap',
+                                    'gap': '15px',
+                                    'fontFamily': 'Open Sans',
+                                    'fontSize': '16px',
+                                    'textAlign': 'left',
+                                    'marginLeft': '30px'
+                                }
+                            ),
+                        ], style={
+                            'display': 'flex',
+                            'justifyContent': 'left',
+                            'marginBottom': '10px',
+                            'marginTop': '10px'
+                        }),
 
-                ], style={'flex': '1.5', 'marginRight': '80px', 'marginLeft': '0px'}),
+                        html.Div([
+                            html.Button("Select All", id="select-all-income-types", n_clicks=0),
+                            html.Button("Clear All", id="clear-all-income-types", n_clicks=0),
+                            dcc.Store(id='all-income-options'),
+                        ], style={'display': 'flex', 'gap': '10px', 'marginBottom': '10px', 'marginLeft': '30px', 'justifyContent': 'left'})
 
-            ], style={'flex': '1.5', 'marginRight': '0px', 'marginLeft': '0px'}),
+                    ], style={'flex': '1.5', 'marginRight': '80px', 'marginLeft': '0px'}),
 
-            # TOP 5 TRANSACTIONS TABLE
-            html.Div([
+                ], style={'flex': '1.5', 'marginRight': '0px', 'marginLeft': '0px'}),
+
+                # TOP 5 TRANSACTIONS TABLE
                 html.Div([
-                    html.Label("Top Transactions", style={
-                                        'font-family': 'Inter',
-                                        'font-weight': '300',
-                                        'letter-spacing': '0.5px',
-                                        'fontSize': '18px',
-                                        'marginBottom': '40px',
-                                        'marginTop': '30px',
-                                        'display': 'block',
-                                        'textAlign': 'left'
-                                    }),
                     html.Div([
-                        dcc.RadioItems(
-                            id='top5-toggle-mode',
-                            options=[
-                                {'label': 'By Amount', 'value': 'amount'},
-                                {'label': 'By Frequency', 'value': 'frequency'}
-                            ],
-                            value='amount',  # Default selection
-                            labelStyle={'display': 'inline-block', 'marginRight': '20px'},
-                            style={'marginBottom': '40px', 'marginLeft': '40px', 'gap': '55px 0', 'marginTop': '30px'}
-                        )
-                    ])
+                        html.Label("Top Transactions", style={
+                                            'font-family': 'Inter',
+                                            'font-weight': '300',
+                                            'letter-spacing': '0.5px',
+                                            'fontSize': '18px',
+                                            'marginBottom': '40px',
+                                            'marginTop': '30px',
+                                            'display': 'block',
+                                            'textAlign': 'left'
+                                        }),
+                        html.Div([
+                            dcc.RadioItems(
+                                id='top5-toggle-mode',
+                                options=[
+                                    {'label': 'By Amount', 'value': 'amount'},
+                                    {'label': 'By Frequency', 'value': 'frequency'}
+                                ],
+                                value='amount',  # Default selection
+                                labelStyle={'display': 'inline-block', 'marginRight': '20px'},
+                                style={'marginBottom': '40px', 'marginLeft': '40px', 'gap': '55px 0', 'marginTop': '30px'}
+                            )
+                        ]),
+                        html.Div([
+                            dcc.Dropdown(
+                                id='top-n-select',
+                                options=[{'label': f"Top {n}", 'value': n} for n in top_n_options],
+                                value=top_n_options[0],
+                                clearable=False,
+                                style={'width': '100px'}
+                            )
+                        ], style={'marginTop': '24px'})
+                    ], style={
+                        'display': 'flex',
+                        'flexWrap': 'nowrap',  # prevent vertical stacking
+                        'gap': '20px',
+                        'alignItems': 'flex-start',
+                        'paddingTop': '0px',
+                        'marginTop': '0px'
+                    }),
+
+                    html.Div(id='top5-purchases-table')
                 ], style={
-                    'display': 'flex',
-                    'flexWrap': 'nowrap',  # prevent vertical stacking
-                    'gap': '20px',
-                    'alignItems': 'flex-start',
-                    'paddingTop': '0px',
-                    'marginTop': '0px'
-                }),
+                        'flex': '1',
+                        'marginRight': '0px',
+                        'minWidth': '500px',
+                        'flexWrap': 'nowrap',
+                        'marginTop': '10px'
+                })  # <-- optional margin tweak
 
-                html.Div(id='top5-purchases-table')
             ], style={
-                    'flex': '1',
-                    'marginRight': '0px',
-                    'minWidth': '500px',
-                    'flexWrap': 'nowrap',
-                    'marginTop': '10px'
-            })  # <-- optional margin tweak
-
-        ], style={
-            'display': 'flex',
-            'flexWrap': 'nowrap',  # prevent vertical stacking
-            'gap': '20px',
-            'alignItems': 'flex-start',
-            'paddingTop': '0px',
-            'marginTop': '0px'
-        }),
+                'display': 'flex',
+                'flexWrap': 'nowrap',  # prevent vertical stacking
+                'gap': '20px',
+                'alignItems': 'flex-start',
+                'paddingTop': '0px',
+                'marginTop': '0px'
+            }),
 
-        html.Hr(style={
-            'border': 'none',
-            'borderTop': '1px solid #ccc',
-            'margin': '20px 0'
-        }),
-        html.Div([
+            html.Hr(style={
+                'border': 'none',
+                'borderTop': '1px solid #ccc',
+                'margin': '20px 0'
+            }),
             html.Div([
-                dcc.Graph(id='monthly-expense-bar-chart', style={'marginBottom': '0px'}),
                 html.Div([
+                    dcc.Graph(id='monthly-expense-bar-chart', style={'marginBottom': '0px'}),
                     html.Div([
-                        dcc.Input(
-                            id='merchant-search',
-                            type='text',
-                            placeholder='Filter by merchant or transaction detail...',
-                            autoComplete='off',
-                            style={
-                                'width': '100%',
-                                'padding': '6px',
-                                'fontSize': '14px',
-                                'marginRight': '10px',
-                                'flex': '3'
-                            }
-                        ),
-                        html.Button('Search', id='search-button', n_clicks=0, style={
-                            'padding': '4px 10px',
-                            'fontSize': '13px',
-                            'height': '30px',
-                            'minWidth': '70px'
-                        }),
-                        html.Button('Clear', id='clear-button', n_clicks=0, style={
-                            'padding': '4px 10px',
-                            'fontSize': '13px',
-                            'height': '30px',
-                            'minWidth': '70px',
-                            'marginLeft': '6px'
+                        html.Div([
+                            dcc.Input(
+                                id='merchant-search',
+                                type='text',
+                                placeholder='Filter by merchant or transaction detail...',
+                                autoComplete='off',
+                                style={
+                                    'width': '100%',
+                                    'padding': '6px',
+                                    'fontSize': '14px',
+                                    'marginRight': '10px',
+                                    'flex': '3'
+                                }
+                            ),
+                            html.Button('Search', id='search-button', n_clicks=0, style={
+                                'padding': '4px 10px',
+                                'fontSize': '13px',
+                                'height': '30px',
+                                'minWidth': '70px'
+                            }),
+                            html.Button('Clear', id='clear-button', n_clicks=0, style={
+                                'padding': '4px 10px',
+                                'fontSize': '13px',
+                                'height': '30px',
+                                'minWidth': '70px',
+                                'marginLeft': '6px'
+                            })
+                        ], style={
+                            'display': 'flex',
+                            'justifyContent': 'center',
+                            'gap': '6px',
+                            'marginBottom': '20px',
+                            'marginLeft': '60px',  # Add space on the left
+                            'marginRight': '60px'  # Add space on the right
                         })
-                    ], style={
-                        'display': 'flex',
-                        'justifyContent': 'center',
-                        'gap': '6px',
-                        'marginBottom': '20px',
-                        'marginLeft': '60px',  # Add space on the left
-                        'marginRight': '60px'  # Add space on the right
-                    })
-
-                ], style={'maxWidth': '800px', 'margin': '0 auto'}),
-                dcc.Store(id='merchant-search-store'),
 
-                # EXPENSE FILTERS
-                html.Div([
+                    ], style={'maxWidth': '800px', 'margin': '0 auto'}),
+                    dcc.Store(id='merchant-search-store'),
 
-                    html.Label("Expense Source", style={
-                        'fontFamily': 'Open Sans',
-                        'fontSize': '16px',
-                        'fontWeight': 'bold',
-                        'marginBottom': '0px',
-                        'display': 'block',
-                        'textAlign': 'center',
-                        'marginRight': '150px',
-                        'marginTop': '10px'
-                    }),
-                    html.Div("(Defaults to Top 5)",
-                             style={
-                                'fontFamily': 'Open Sans',
-                                'fontSize': '14px',
-                                'marginBottom': '0px',
-                                'display': 'block',
-                                'textAlign': 'center',
-                                'marginRight': '150px',
-                                'marginTop': '2px',
-                                'fontStyle': 'italic',
-                                'color': '#777'
-                                }),
-                    # === Debt Payments ===
+                    # EXPENSE FILTERS
                     html.Div([
-                        html.P("Debt Payments", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                        dcc.Checklist(
-                            id='breakdown-payments-filter',
-                            options=[],
-                            value=[],
-                            inline=True,
-                            style={
-                                'display': 'flex',
-                                'flexWrap': 'wrap',
-                                'gap': '10px',
-                                'justifyContent': 'left'
-                            }
-                        ),
-                        html.Div([
-                            html.Button("Select All", id="select-all-breakdown-payments", n_clicks=0),
-                            html.Button("Clear All", id="clear-all-breakdown-payments", n_clicks=0),
-                            dcc.Store(id='breakdown-payments-filter-options-store', data=sorted_payments)
-                        ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-                    ], style={'marginBottom': '15px'}),
 
-                    # === General Categories ===
-                    html.Div([
-                        html.P("General Categories", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                        dcc.Checklist(
-                            id='breakdown-expense-category-filter',
-                            options=[],
-                            value=[],
-                            inline=True,
-                            style={
-                                'display': 'flex',
-                                'flexWrap': 'wrap',
-                                'gap': '10px',
-                                'justifyContent': 'left'
-                            }
-                        ),
+                        html.Label("Expense Source", style={
+                            'fontFamily': 'Open Sans',
+                            'fontSize': '16px',
+                            'fontWeight': 'bold',
+                            'marginBottom': '0px',
+                            'display': 'block',
+                            'textAlign': 'center',
+                            'marginRight': '150px',
+                            'marginTop': '10px'
+                        }),
+                        html.Div("(Defaults to Top 5)",
+                                 style={
+                                    'fontFamily': 'Open Sans',
+                                    'fontSize': '14px',
+                                    'marginBottom': '0px',
+                                    'display': 'block',
+                                    'textAlign': 'center',
+                                    'marginRight': '150px',
+                                    'marginTop': '2px',
+                                    'fontStyle': 'italic',
+                                    'color': '#777'
+                                    }),
+                        # === Debt Payments ===
                         html.Div([
-                            html.Button("Select All", id="select-all-breakdown-categories", n_clicks=0),
-                            html.Button("Clear All", id="clear-all-breakdown-categories", n_clicks=0),
-                            dcc.Store(id='breakdown-expense-category-filter-options-store', data=sorted_expenses)
-                        ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-                    ], style={'marginBottom': '15px'}),
-
-                    # === Utilities & Insurance ===
-                    html.Div([
-                        html.P("Utilities & Insurance", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
-                        dcc.Checklist(
-                            id='breakdown-utilities-insurance-filter',
-                            options=[],
-                            value=[],
-                            inline=True,
-                            style={
-                                'display': 'flex',
-                                'flexWrap': 'wrap',
-                                'gap': '10px',
-                                'justifyContent': 'left'
-                            }
-                        ),
+                            html.P("Debt Payments", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                            dcc.Checklist(
+                                id='breakdown-payments-filter',
+                                options=[],
+                                value=[],
+                                inline=True,
+                                style={
+                                    'display': 'flex',
+                                    'flexWrap': 'wrap',
+                                    'gap': '10px',
+                                    'justifyContent': 'left'
+                                }
+                            ),
+                            html.Div([
+                                html.Button("Select All", id="select-all-breakdown-payments", n_clicks=0),
+                                html.Button("Clear All", id="clear-all-breakdown-payments", n_clicks=0),
+                                dcc.Store(id='breakdown-payments-filter-options-store', data=ds.sorted_payments)
+                            ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                        ], style={'marginBottom': '15px'}),
+
+                        # === General Categories ===
                         html.Div([
-                            html.Button("Select All", id="select-all-breakdown-utilities", n_clicks=0),
-                            html.Button("Clear All", id="clear-all-breakdown-utilities", n_clicks=0),
-                            dcc.Store(id='breakdown-utilities-insurance-filter-options-store',
-                                      data=sorted_utilities_insurance)
-                        ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
-                    ], style={'marginBottom': '15px'}),
+                            html.P("General Categories", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                            dcc.Checklist(
+                                id='breakdown-expense-category-filter',
+                                options=[],
+                                value=[],
+                                inline=True,
+                                style={
+                                    'display': 'flex',
+                                    'flexWrap': 'wrap',
+                                    'gap': '10px',
+                                    'justifyContent': 'left'
+                                }
+                            ),
+                            html.Div([
+                                html.Button("Select All", id="select-all-breakdown-categories", n_clicks=0),
+                                html.Button("Clear All", id="clear-all-breakdown-categories", n_clicks=0),
+                                dcc.Store(id='breakdown-expense-category-filter-options-store', data=ds.sorted_expenses)
+                            ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                        ], style={'marginBottom': '15px'}),
+
+                        # === Utilities & Insurance ===
+                        html.Div([
+                            html.P("Utilities & Insurance", style={'fontWeight': 'bold', 'marginBottom': '6px'}),
+                            dcc.Checklist(
+                                id='breakdown-utilities-insurance-filter',
+                                options=[],
+                                value=[],
+                                inline=True,
+                                style={
+                                    'display': 'flex',
+                                    'flexWrap': 'wrap',
+                                    'gap': '10px',
+                                    'justifyContent': 'left'
+                                }
+                            ),
+                            html.Div([
+                                html.Button("Select All", id="select-all-breakdown-utilities", n_clicks=0),
+                                html.Button("Clear All", id="clear-all-breakdown-utilities", n_clicks=0),
+                                dcc.Store(id='breakdown-utilities-insurance-filter-options-store',
+                                          data=ds.sorted_utilities_insurance)
+                            ], style={'display': 'flex', 'gap': '10px', 'marginTop': '6px'})
+                        ], style={'marginBottom': '15px'}),
+
+                        # === Master Select All/Clear All ===
+                        html.Div([
+                            html.Button("Select All (All Categories)", id="select-all-expenses-breakdown-master", n_clicks=0),
+                            html.Button("Select Top 5", id="select-top5-expenses-breakdown-master", n_clicks=0),
+                            html.Button("Clear All (All Categories)", id="clear-all-expenses-breakdown-master", n_clicks=0),
+                        ], style={'display': 'flex', 'gap': '10px', 'marginTop': '10px'})
 
-                    # === Master Select All/Clear All ===
-                    html.Div([
-                        html.Button("Select All (All Categories)", id="select-all-expenses-breakdown-master", n_clicks=0),
-                        html.Button("Select Top 5", id="select-top5-expenses-breakdown-master", n_clicks=0),
-                        html.Button("Clear All (All Categories)", id="clear-all-expenses-breakdown-master", n_clicks=0),
-                    ], style={'display': 'flex', 'gap': '10px', 'marginTop': '10px'})
+                    ], style={
+                        'flex': '1',
+                        'marginRight': '0px',
+                        'minWidth': '600px',
+                        'marginTop': '0px',
+                        'marginBottom': '50px',
+                        'marginLeft': '20px'
+                    })
+
+                ]),
 
-                ], style={
-                    'flex': '1',
-                    'marginRight': '0px',
-                    'minWidth': '600px',
-                    'marginTop': '0px',
-                    'marginBottom': '50px',
-                    'marginLeft': '20px'
-                })
+                html.Div([
+                    dcc.Graph(id='top5-expenses-pie-chart', style={
+                        'flex': '1',
+                        'marginRight': '0px',
+                        'minWidth': '400px',
+                        'marginTop': '0px',
+                    }),
+                ])
 
-            ]),
+            ], style={'display': 'flex', 'gap': '10px'}),
 
             html.Div([
-                dcc.Graph(id='top5-expenses-pie-chart', style={
-                    'flex': '1',
-                    'marginRight': '0px',
-                    'minWidth': '400px',
-                    'marginTop': '0px',
-                }),
-            ])
-
-        ], style={'display': 'flex', 'gap': '10px'}),
+                html.H3("Budgets", style={'textAlign': 'center'}),
+                html.Div(id='budget-section')
+            ], style={'padding': '20px 0', 'borderTop': '1px solid #ccc'}),
 
 
 
-    ], style={'marginRight': '0px'}),
-    html.Br(),
-    html.Br(),
-    html.Br(),
-    html.Br()
+        ], style={'marginRight': '0px'}),
+        html.Br(),
+        html.Br(),
+        html.Br(),
+        html.Br()
 
-], style={
-    'padding': '20px 40px 20px 40px',  # Top, Right, Bottom, Left
-    'maxWidth': '1200px',
-    'margin': '0 auto'
-})
+    ], style={
+        'padding': '20px 40px 20px 40px',  # Top, Right, Bottom, Left
+        'maxWidth': '1200px',
+        'margin': '0 auto'
+    })
 
 
 @app.callback(
@@ -1822,21 +3397,16 @@ def toggle_prev_month_button(current_month, current_year, year_options):
     prevent_initial_call='initial_duplicate'
 )
 def toggle_next_month_button(current_year, current_month, year_options):
+    ds = get_dataset()
+
     if not current_year or current_month is None:
         return True
 
     sorted_years = sorted([int(opt['value']) for opt in year_options])
     latest_year = sorted_years[-1]
 
-    latest_month_by_year = (
-        df.groupby(df['Date'].dt.year)['Date']
-        .max()
-        .dt.month
-        .to_dict()
-    )
-
     if int(current_year) == latest_year:
-        latest_month = latest_month_by_year.get(str(latest_year), 12)
+        latest_month = ds.latest_month_by_year.get(str(latest_year), 12)
         return current_month >= latest_month
 
     return False
@@ -1874,11 +3444,14 @@ def toggle_latest_year_button(current_year, year_options):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_income_to_expense_gauge(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
-    income = income_data[income_data['Date'].dt.year == selected_year]
-    expense = all_expense_data[all_expense_data['Date'].dt.year == selected_year]
+    income = query_rows(ds, 'income_data', years=selected_year)
+    expense = query_rows(ds, 'all_expense_data', years=selected_year)
 
     if income.empty or expense.empty:
         return go.Figure()
@@ -1973,12 +3546,15 @@ def update_income_to_expense_gauge(selected_year, selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_cash_to_debt_gauge(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     # Filter cash and debt data for selected year
-    cash = df[(df['Category'] == 'CASH_ON_HAND') & (df['Date'].dt.year == selected_year)]
-    debt = debt_data[debt_data['Date'].dt.year == selected_year]
+    cash = query_rows(ds, 'cash_data', years=selected_year)
+    debt = query_rows(ds, 'debt_data', years=selected_year)
 
     if cash.empty or debt.empty:
         return go.Figure()
@@ -2064,11 +3640,14 @@ def update_cash_to_debt_gauge(selected_year, selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_debt_to_income_gauge(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
-    income = income_data[income_data['Date'].dt.year == selected_year]
-    payments = payment_data[payment_data['Date'].dt.year == selected_year]
+    income = query_rows(ds, 'income_data', years=selected_year)
+    payments = query_rows(ds, 'payment_data', years=selected_year)
 
     if selected_month != 0:
         income = income[income['Date'].dt.month == selected_month]
@@ -2154,11 +3733,14 @@ def update_debt_to_income_gauge(selected_year, selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_change_titles(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     if selected_month == 0:  # Full Year
-        latest_year = df['Date'].dt.year.max()
+        latest_year = ds.latest_year
         if selected_year == latest_year:
             title_suffix = "(YTD)"
         else:
@@ -2194,28 +3776,31 @@ def toggle_income_avg_visibility(selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_income_overview(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     if selected_month == 0:
         # Full Year (YTD) logic
-        income_current = income_data[income_data['Date'].dt.year == selected_year]
+        income_current = query_rows(ds, 'income_data', years=selected_year)
         if income_current.empty:
             return "No data", "", "N/A", html.Span("", style={'color': '#777'})
 
         latest_month = income_current['Date'].dt.month.max()
-        months_available = latest_month if selected_year == df['Date'].dt.year.max() else 12
+        months_available = latest_month if selected_year == ds.latest_year else 12
 
         ytd_income_total = income_current[income_current['Date'].dt.month <= latest_month]['Amount'].sum()
         monthly_avg = ytd_income_total / months_available
 
         # Compare to previous year
-        income_prev = income_data[income_data['Date'].dt.year == selected_year - 1]
+        income_prev = query_rows(ds, 'income_data', years=selected_year - 1)
         if not income_prev.empty:
             prev_income_total = income_prev[income_prev['Date'].dt.month <= latest_month]['Amount'].sum()
             change_amount = ytd_income_total - prev_income_total
             change_percent = f"{(change_amount / prev_income_total) * 100:+.2f}%"
-            change_dollars = f"${change_amount:+,.0f}"
+            change_dollars = f"${to_dollars(change_amount):+,.0f}"
             change_color = 'green' if change_amount > 0 else 'red'
         else:
             change_percent = "N/A"
@@ -2223,31 +3808,22 @@ def update_income_overview(selected_year, selected_month):
             change_color = '#777'
 
         return (
-            f"${ytd_income_total:,.0f}",
-            f"${monthly_avg:,.0f}",
+            f"${to_dollars(ytd_income_total):,.0f}",
+            f"${to_dollars(monthly_avg):,.0f}",
             change_percent,
             html.Span(change_dollars, style={'color': change_color})
         )
 
     else:
         # Single month logic
-        income_current = income_data[
-            (income_data['Date'].dt.year == selected_year) &
-            (income_data['Date'].dt.month == selected_month)
-        ]
+        income_current = query_rows(ds, 'income_data', years=selected_year, month=selected_month)
 
         if selected_month == 1:
             # Compare January to December of previous year
-            income_prev = income_data[
-                (income_data['Date'].dt.year == selected_year - 1) &
-                (income_data['Date'].dt.month == 12)
-            ]
+            income_prev = query_rows(ds, 'income_data', years=selected_year - 1, month=12)
         else:
             # Compare to previous month of same year
-            income_prev = income_data[
-                (income_data['Date'].dt.year == selected_year) &
-                (income_data['Date'].dt.month == selected_month - 1)
-            ]
+            income_prev = query_rows(ds, 'income_data', years=selected_year, month=selected_month - 1)
 
         ytd_income_total = income_current['Amount'].sum()
         prev_total = income_prev['Amount'].sum()
@@ -2256,7 +3832,7 @@ def update_income_overview(selected_year, selected_month):
         if prev_total > 0:
             change_amount = ytd_income_total - prev_total
             change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
-            change_dollars = f"${change_amount:+,.0f}"
+            change_dollars = f"${to_dollars(change_amount):+,.0f}"
             change_color = 'green' if change_amount > 0 else 'red'
         else:
             change_percent = "N/A"
@@ -2264,8 +3840,8 @@ def update_income_overview(selected_year, selected_month):
             change_color = '#777'
 
         return (
-            f"${ytd_income_total:,.0f}",
-            f"${monthly_avg:,.0f}",
+            f"${to_dollars(ytd_income_total):,.0f}",
+            f"${to_dollars(monthly_avg):,.0f}",
             change_percent,
             html.Span(change_dollars, style={'color': change_color})
         )
@@ -2279,29 +3855,32 @@ def update_income_overview(selected_year, selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_expense_overview(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
 
     if selected_month == 0:
         # Full Year (YTD) logic
-        expense_current = all_expense_data[all_expense_data['Date'].dt.year == selected_year]
+        expense_current = query_rows(ds, 'all_expense_data', years=selected_year)
         if expense_current.empty:
             return "No data", "", "N/A", html.Span("", style={'color': '#777'})
 
         latest_month = expense_current['Date'].dt.month.max()
-        months_available = latest_month if selected_year == df['Date'].dt.year.max() else 12
+        months_available = latest_month if selected_year == ds.latest_year else 12
 
         ytd_expense_total = expense_current[expense_current['Date'].dt.month <= latest_month]['Amount'].sum()
         monthly_avg = ytd_expense_total / months_available
 
         # Compare to previous year
-        expense_prev = all_expense_data[all_expense_data['Date'].dt.year == selected_year - 1]
+        expense_prev = query_rows(ds, 'all_expense_data', years=selected_year - 1)
         if not expense_prev.empty:
             prev_expense_total = expense_prev[expense_prev['Date'].dt.month <= latest_month]['Amount'].sum()
             change_amount = ytd_expense_total - prev_expense_total
             change_percent = f"{(change_amount / prev_expense_total) * 100:+.2f}%"
-            change_dollars = f"${change_amount:+,.0f}"
+            change_dollars = f"${to_dollars(change_amount):+,.0f}"
             change_color = 'green' if change_amount < 0 else 'red'
         else:
             change_percent = "N/A"
@@ -2309,31 +3888,22 @@ def update_expense_overview(selected_year, selected_month):
             change_color = '#777'
 
         return (
-            f"${abs(ytd_expense_total):,.0f}",
-            f"${abs(monthly_avg):,.0f}",
+            f"${to_dollars(abs(ytd_expense_total)):,.0f}",
+            f"${to_dollars(abs(monthly_avg)):,.0f}",
             change_percent,
             html.Span(change_dollars, style={'color': change_color})
         )
 
     else:
         # Single month logic
-        expense_current = all_expense_data[
-            (all_expense_data['Date'].dt.year == selected_year) &
-            (all_expense_data['Date'].dt.month == selected_month)
-            ]
+        expense_current = query_rows(ds, 'all_expense_data', years=selected_year, month=selected_month)
 
         if selected_month == 1:
             # Compare January to December of previous year
-            expense_prev = all_expense_data[
-                (all_expense_data['Date'].dt.year == selected_year - 1) &
-                (all_expense_data['Date'].dt.month == 12)
-                ]
+            expense_prev = query_rows(ds, 'all_expense_data', years=selected_year - 1, month=12)
         else:
             # Compare to previous month of same year
-            expense_prev = all_expense_data[
-                (all_expense_data['Date'].dt.year == selected_year) &
-                (all_expense_data['Date'].dt.month == selected_month - 1)
-                ]
+            expense_prev = query_rows(ds, 'all_expense_data', years=selected_year, month=selected_month - 1)
 
         ytd_expense_total = expense_current['Amount'].sum()
         prev_total = expense_prev['Amount'].sum()
@@ -2342,7 +3912,7 @@ def update_expense_overview(selected_year, selected_month):
         if prev_total > 0:
             change_amount = ytd_expense_total - prev_total
             change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
-            change_dollars = f"${change_amount:+,.0f}"
+            change_dollars = f"${to_dollars(change_amount):+,.0f}"
             change_color = 'green' if change_amount < 0 else 'red'
         else:
             change_percent = "N/A"
@@ -2350,8 +3920,8 @@ def update_expense_overview(selected_year, selected_month):
             change_color = '#777'
 
         return (
-            f"${abs(ytd_expense_total):,.0f}",
-            f"${abs(monthly_avg):,.0f}",
+            f"${to_dollars(abs(ytd_expense_total)):,.0f}",
+            f"${to_dollars(abs(monthly_avg)):,.0f}",
             change_percent,
             html.Span(change_dollars, style={'color': change_color})
         )
@@ -2361,11 +3931,14 @@ def update_expense_overview(selected_year, selected_month):
     Output('income-expense-ratio', 'children'),
     Input('year-radio', 'value')
 )
+@memoized_view
 def update_income_expense_ratio(selected_year):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
-    income = income_data[income_data['Date'].dt.year == selected_year]
-    expense = all_expense_data[all_expense_data['Date'].dt.year == selected_year]
+    income = query_rows(ds, 'income_data', years=selected_year)
+    expense = query_rows(ds, 'all_expense_data', years=selected_year)
 
     if income.empty or expense.empty:
         return html.Span("N/A", style={'color': '#777'})
@@ -2387,17 +3960,15 @@ def update_income_expense_ratio(selected_year):
     Output('cash-to-debt-ratio', 'children'),
     Input('year-radio', 'value')
 )
+@memoized_view
 def update_cash_to_debt_ratio(selected_year):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     # Get cash and debt snapshots for the selected year
-    cash_snapshot = df[
-        (df['Category'] == 'CASH_ON_HAND') &
-        (df['Date'].dt.year == selected_year)
-    ]
-    debt_snapshot = debt_data[
-        debt_data['Date'].dt.year == selected_year
-    ]
+    cash_snapshot = query_rows(ds, 'cash_data', years=selected_year)
+    debt_snapshot = query_rows(ds, 'debt_data', years=selected_year)
 
     if cash_snapshot.empty or debt_snapshot.empty:
         return html.Span("N/A", style={'color': '#777'})
@@ -2424,12 +3995,15 @@ def update_cash_to_debt_ratio(selected_year):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_debt_overview(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     if selected_month == 0:
         # Full Year (YTD) logic
-        current_year_debt = debt_data[debt_data['Date'].dt.year == selected_year]
+        current_year_debt = query_rows(ds, 'debt_data', years=selected_year)
         if current_year_debt.empty:
             return "No data", "N/A", "", go.Figure()
 
@@ -2437,35 +4011,23 @@ def update_debt_overview(selected_year, selected_month):
         current_snapshot = current_year_debt[current_year_debt['Date'].dt.month == latest_month]
         total_debt = current_snapshot['Amount'].sum()
 
-        prev_year_debt = debt_data[
-            (debt_data['Date'].dt.year == selected_year - 1) &
-            (debt_data['Date'].dt.month == latest_month)
-        ]
+        prev_year_debt = query_rows(ds, 'debt_data', years=selected_year - 1, month=latest_month)
 
     else:
         # Single month logic
-        current_snapshot = debt_data[
-            (debt_data['Date'].dt.year == selected_year) &
-            (debt_data['Date'].dt.month == selected_month)
-        ]
+        current_snapshot = query_rows(ds, 'debt_data', years=selected_year, month=selected_month)
         total_debt = current_snapshot['Amount'].sum()
 
         if selected_month == 1:
-            prev_year_debt = debt_data[
-                (debt_data['Date'].dt.year == selected_year - 1) &
-                (debt_data['Date'].dt.month == 12)
-            ]
+            prev_year_debt = query_rows(ds, 'debt_data', years=selected_year - 1, month=12)
         else:
-            prev_year_debt = debt_data[
-                (debt_data['Date'].dt.year == selected_year) &
-                (debt_data['Date'].dt.month == selected_month - 1)
-            ]
+            prev_year_debt = query_rows(ds, 'debt_data', years=selected_year, month=selected_month - 1)
 
     if not prev_year_debt.empty:
         prev_total = prev_year_debt['Amount'].sum()
         change_amount = total_debt - prev_total
         change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
-        change_dollars = f"${change_amount:+,.0f}"
+        change_dollars = f"${to_dollars(change_amount):+,.0f}"
         change_color = 'green' if change_amount < 0 else 'red'
     else:
         change_percent = "N/A"
@@ -2473,8 +4035,8 @@ def update_debt_overview(selected_year, selected_month):
         change_color = '#777'
 
     labels = current_snapshot[current_snapshot['Amount'] > 0]['Sub-Category (Account)']
-    values = current_snapshot[current_snapshot['Amount'] > 0]['Amount']
-    colors = [debt_colors.get(label, '#888') for label in labels]
+    values = to_dollars(current_snapshot[current_snapshot['Amount'] > 0]['Amount'])
+    colors = account_colors(ds, ds.debt_colors, labels)
 
     pie_fig = go.Figure(data=[
         go.Pie(
@@ -2489,7 +4051,7 @@ def update_debt_overview(selected_year, selected_month):
     pie_fig.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0))
 
     return (
-        f"${abs(total_debt):,.0f}",
+        f"${to_dollars(abs(total_debt)):,.0f}",
         change_percent,
         html.Span(f"{change_dollars}", style={'color': change_color}),
         pie_fig
@@ -2504,15 +4066,15 @@ def update_debt_overview(selected_year, selected_month):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_cash_overview(selected_year, selected_month):
+    ds = get_dataset()
+
     selected_year = int(selected_year)
 
     if selected_month == 0:
         # YTD logic
-        current_cash = df[
-            (df['Category'] == 'CASH_ON_HAND') &
-            (df['Date'].dt.year == selected_year)
-        ]
+        current_cash = query_rows(ds, 'cash_data', years=selected_year)
         if current_cash.empty:
             return "No data", "N/A", "", go.Figure()
 
@@ -2520,10 +4082,7 @@ def update_cash_overview(selected_year, selected_month):
         current_snapshot = current_cash[current_cash['Date'].dt.month == latest_month]
         total_cash = current_snapshot['Amount'].sum()
 
-        prev_cash = df[
-            (df['Category'] == 'CASH_ON_HAND') &
-            (df['Date'].dt.year == selected_year - 1)
-        ]
+        prev_cash = query_rows(ds, 'cash_data', years=selected_year - 1)
         if not prev_cash.empty:
             latest_prev_month = prev_cash['Date'].dt.month.max()
             prev_snapshot = prev_cash[prev_cash['Date'].dt.month == latest_prev_month]
@@ -2531,80 +4090,1200 @@ def update_cash_overview(selected_year, selected_month):
 
             change_amount = total_cash - prev_total
             change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
-            change_dollars = f"{change_amount:+,.0f}"
+            change_dollars = f"{to_dollars(change_amount):+,.0f}"
+            change_color = 'green' if change_amount > 0 else 'red'
+        else:
+            change_percent = "N/A"
+            change_dollars = ""
+            change_color = '#777'
+
+    else:
+        # Single month logic
+        current_snapshot = query_rows(ds, 'cash_data', years=selected_year, month=selected_month)
+        total_cash = current_snapshot['Amount'].sum()
+
+        if selected_month == 1:
+            prev_snapshot = query_rows(ds, 'cash_data', years=selected_year - 1, month=12)
+        else:
+            prev_snapshot = query_rows(ds, 'cash_data', years=selected_year, month=selected_month - 1)
+
+        prev_total = prev_snapshot['Amount'].sum()
+
+        if prev_total > 0:
+            change_amount = total_cash - prev_total
+            change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
+            change_dollars = f"{to_dollars(change_amount):+,.0f}"
             change_color = 'green' if change_amount > 0 else 'red'
         else:
             change_percent = "N/A"
             change_dollars = ""
             change_color = '#777'
 
+    # Pie chart for current snapshot
+    labels = current_snapshot[current_snapshot['Amount'] > 0]['Sub-Category (Account)']
+    values = to_dollars(current_snapshot[current_snapshot['Amount'] > 0]['Amount'])
+    colors = account_colors(ds, ds.cash_colors, labels)
+
+    pie_fig = go.Figure(data=[
+        go.Pie(
+            labels=labels,
+            values=values,
+            textinfo='label+percent',
+            hovertemplate='%{label}<br>$%{value:,.2f}<extra></extra>',
+            marker=dict(colors=colors)
+        )
+    ])
+    pie_fig.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0))
+
+    return (
+        f"${to_dollars(total_cash):,.0f}",
+        change_percent,
+        html.Span(f"${change_dollars}", style={'color': change_color}),
+        pie_fig
+    )
+
+
+
+# === FORECASTING ===
+# Year-end projections for the latest, incomplete year, for every account at once. Income and
+# expenses follow a seasonal baseline (the mean of each calendar month over up to
+# FORECAST_HISTORY_YEARS earlier years, from the monthly totals of the daily cubes), scaled by how
+# the year to date runs against that baseline. The year to date counts complete months only, as a
+# month the data ends partway through would read as a slump. Cash and debt balances move from the
+# year's latest snapshot by their average change over the same remaining months in earlier years.
+FORECAST_HISTORY_YEARS = 3
+FORECAST_MAX_LEVEL = 3.0  # Cap on the year-to-date vs baseline scaling, so one odd month cannot explode a projection
+
+
+def last_complete_month(ds):
+    # (year, month) of the latest month the data covers in full: the latest transaction's month
+    # when it falls on the month's last day, otherwise the month before
+    latest = ds.latest_transaction_date
+    month = latest.to_period('M')
+    if latest.day != latest.days_in_month:
+        month -= 1
+    return month.year, month.month
+
+
+def cube_monthly_totals(cube, years):
+    # (year, month, account) totals summed from a daily cube; months without rows are zero
+    totals = np.zeros((len(years), 12, len(cube['accounts'])), dtype=np.int64)
+    positions = {year: i for i, year in enumerate(years)}
+    for (year, month), (day_totals, _) in cube['months'].items():
+        if year in positions:
+            totals[positions[year], month - 1] = day_totals.sum(axis=0)
+    return totals
+
+
+def cube_months_present(cube, years):
+    # (year, month) flags for the months a daily cube has any rows in
+    present = np.zeros((len(years), 12), dtype=bool)
+    positions = {year: i for i, year in enumerate(years)}
+    for year, month in cube['months']:
+        if year in positions:
+            present[positions[year], month - 1] = True
+    return present
+
+
+def cube_month_history(cube, first, latest):
+    # (months, accounts) totals for every month from `first` through `latest`, both (year, month)
+    years = list(range(first[0], latest[0] + 1))
+    totals = cube_monthly_totals(cube, years).reshape(len(years) * 12, len(cube['accounts']))
+    start, stop = first[1] - 1, (len(years) - 1) * 12 + latest[1]
+    months = pd.period_range(f"{first[0]}-{first[1]:02d}", periods=stop - start, freq='M')
+    return months, totals[start:stop]
+
+
+def snapshot_monthly_balances(data, accounts, years):
+    # (year, month, account) balance snapshots, and which (year, month) had a snapshot at all
+    years_index = pd.Index(years)
+    year_pos = years_index.get_indexer(data['Date'].dt.year)
+    keep = year_pos >= 0
+    codes = accounts.get_indexer(data['Sub-Category (Account)'].astype(object))
+    months = data['Date'].dt.month.to_numpy() - 1
+
+    balances = np.zeros((len(years), 12, len(accounts)), dtype=np.int64)
+    present = np.zeros((len(years), 12), dtype=bool)
+    np.add.at(balances, (year_pos[keep], months[keep], codes[keep]), data['Amount'].to_numpy()[keep])
+    present[year_pos[keep], months[keep]] = True
+    return balances, present
+
+
+def seasonal_flow_forecast(monthly, present, through_month):
+    # monthly: (history years + forecast year, 12, accounts), present: which of those (year, month) have
+    # any data; returns year-to-date and projected totals
+    history, current = monthly[:-1], monthly[-1]
+    ytd = current[:through_month].sum(axis=0)
+    if not len(history):
+        # No earlier year to learn a season from: carry the monthly average forward
+        return ytd, np.rint(ytd * 12 / through_month).astype(np.int64)
+
+    # Each calendar month averages only the earlier years with data for it (a partial first year
+    # would otherwise count as zero spending), and the level is fitted over those months alone
+    counts = present[:-1].sum(axis=0)
+    seen = counts > 0
+    baseline = history.sum(axis=0) / np.maximum(counts, 1)[:, None]
+    baseline_ytd = baseline[:through_month][seen[:through_month]].sum(axis=0)
+    ytd_seen = current[:through_month][seen[:through_month]].sum(axis=0)
+    level = np.divide(ytd_seen, baseline_ytd, out=np.ones(len(ytd)), where=baseline_ytd != 0)
+    level = np.clip(level, 0, FORECAST_MAX_LEVEL)
+    rest = baseline[through_month:][seen[through_month:]].sum(axis=0) * level
+    # Months no earlier year has data for carry the monthly average forward
+    rest += ytd / through_month * (~seen[through_month:]).sum()
+    return ytd, ytd + np.rint(rest).astype(np.int64)
+
+
+def balance_forecast(balances, present):
+    # Latest snapshot of the year plus the mean change from that month to December in earlier years
+    if not present[-1].any():
+        latest = np.zeros(balances.shape[2], dtype=np.int64)
+        return latest, latest
+    month = np.flatnonzero(present[-1])[-1]
+    latest = balances[-1, month]
+    usable = present[:-1, month] & present[:-1, 11]
+    if not usable.any():
+        return latest, latest.copy()
+    changes = balances[:-1][usable, 11] - balances[:-1][usable, month]
+    return latest, latest + np.rint(changes.mean(axis=0)).astype(np.int64)
+
+
+def build_year_end_forecast(ds, set_progress=None):
+    year = ds.latest_transaction_date.year
+    complete_year, complete_month = last_complete_month(ds)
+    # Nothing to project before the year's first complete month, or once December is complete
+    through_month = complete_month if complete_year == year else 0
+    if through_month in (0, 12):
+        return None
+
+    # Earlier years that have any data, oldest first, then the forecast year itself
+    data_years = {int(y) for y in ds.available_years}
+    history_years = [y for y in range(year - FORECAST_HISTORY_YEARS, year) if y in data_years]
+    years = history_years + [year]
+
+    accounts = ds.accounts
+    groups = {}
+    for group, cube in (('Income', ds.income_daily_cube), ('Expenses', ds.expense_daily_cube)):
+        current, projected = seasonal_flow_forecast(
+            cube_monthly_totals(cube, years), cube_months_present(cube, years), through_month
+        )
+        groups[group] = (cube['accounts'], current, projected)
+        if set_progress:
+            set_progress((str(len(groups)), '4'))
+    for group, frame in (('Cash', 'cash_data'), ('Debt', 'debt_data')):
+        current, projected = balance_forecast(*snapshot_monthly_balances(query_rows(ds, frame), accounts, years))
+        groups[group] = (accounts, current, projected)
+        if set_progress:
+            set_progress((str(len(groups)), '4'))
+
+    rows = []
+    for group, (group_accounts, current, projected) in groups.items():
+        active = (current != 0) | (projected != 0)
+        rows.append(pd.DataFrame({
+            'Group': group,
+            'Account': group_accounts[active].astype(str),
+            'Current': current[active],
+            'Projected': projected[active]
+        }))
+    accounts_frame = pd.concat(rows, ignore_index=True)
+
+    return {
+        'year': year,
+        'through_month': through_month,
+        'history_years': history_years,
+        'accounts': accounts_frame,
+        'totals': accounts_frame.groupby('Group', sort=False)[['Current', 'Projected']].sum()
+    }
+
+
+def year_end_forecast(ds, set_progress=None):
+    return derived(ds, 'year_end_forecast', lambda ds: build_year_end_forecast(ds, set_progress))
+
+
+@heavy_callback(
+    [Output('forecast-section', 'style'),
+     Output('forecast-section', 'children')],
+    Input('year-radio', 'value'),
+    progress=[Output('forecast-progress', 'value'), Output('forecast-progress', 'max')],
+    running=[(Output('forecast-progress', 'style'), {'display': 'block', 'margin': '10px auto'}, {'display': 'none'})]
+)
+def update_year_end_forecast(set_progress, selected_year):
+    ds = get_dataset()
+
+    forecast = year_end_forecast(ds, set_progress)
+    if forecast is None or int(selected_year) != forecast['year']:
+        return {'display': 'none'}, []
+
+    totals = forecast['totals'].reindex(['Income', 'Expenses', 'Cash', 'Debt'], fill_value=0)
+    projected_net = totals.loc['Income', 'Projected'] - totals.loc['Expenses', 'Projected']
+    basis = (
+        f"Seasonal baseline from {', '.join(str(y) for y in forecast['history_years'])}"
+        if forecast['history_years'] else "No earlier years; monthly average carried forward"
+    )
+
+    def kpi(label, cents, color=None):
+        return html.Div([
+            html.P(label, style={'fontWeight': 'bold', 'marginBottom': '4px'}),
+            html.Label(f"${to_dollars(cents):,.0f}", style={'fontSize': '22px', 'color': color})
+        ], style={'textAlign': 'center', 'flex': '1'})
+
+    table = forecast['accounts'].sort_values(['Group', 'Projected'], ascending=[True, False], kind='stable')
+    records = [
+        {
+            'Group': row.Group,
+            'Account': row.Account,
+            'Now': f"${to_dollars(row.Current):,.0f}",
+            'Projected Year-End': f"${to_dollars(row.Projected):,.0f}"
+        }
+        for row in table.itertuples()
+    ]
+
+    children = [
+        html.H3(
+            f"{forecast['year']} Year-End Forecast (actuals through {calendar.month_name[forecast['through_month']]})",
+            style={'textAlign': 'center', 'marginBottom': '4px'}
+        ),
+        html.P(basis, style={'textAlign': 'center', 'color': '#777', 'marginTop': '0px'}),
+        html.Div([
+            kpi("Projected Income", totals.loc['Income', 'Projected']),
+            kpi("Projected Expenses", totals.loc['Expenses', 'Projected']),
+            kpi("Projected Net", projected_net, 'green' if projected_net >= 0 else 'red'),
+            kpi("Projected Cash", totals.loc['Cash', 'Projected']),
+            kpi("Projected Debt", abs(totals.loc['Debt', 'Projected']))
+        ], style={'display': 'flex', 'justifyContent': 'space-between', 'gap': '5px', 'padding': '10px 20px'}),
+        dash_table.DataTable(
+            data=records,
+            columns=[
+                {'name': 'Group', 'id': 'Group'},
+                {'name': 'Account', 'id': 'Account'},
+                {'name': 'Year to Date / Balance', 'id': 'Now'},
+                {'name': 'Projected Year-End', 'id': 'Projected Year-End'}
+            ],
+            page_size=15,
+            style_table={'width': '100%'},
+            style_cell={'textAlign': 'left', 'padding': '6px', 'fontFamily': 'Open Sans', 'fontSize': '14px'},
+            style_header={'fontWeight': 'bold', 'backgroundColor': '#f9f9f9', 'borderBottom': '1px solid #ccc'}
+        )
+    ]
+    return {'padding': '20px 0', 'borderTop': '1px solid #ccc'}, children
+
+
+# === BUDGETS ===
+# Monthly spending limits per expense account, kept in a small CSV the user edits by hand
+# (columns "Account" and "Monthly Limit", in dollars). Actual spending comes from the monthly
+# totals of the expense cube, which reloads already extend month by month, so checking every
+# budget costs O(accounts x months) and never touches the transaction rows. Limits are pro-rated
+# by day for the month the data ends in.
+BUDGET_FILE = os.environ.get(
+    'FINANCE_DASHBOARD_BUDGETS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.csv')
+)
+BUDGET_WARNING_RATIO = 0.8  # Share of a limit at which an account is flagged before it goes over
+
+
+def budget_file_state(path=BUDGET_FILE):
+    # (path, mtime, size) of the budget file, or None when there is none
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def read_budgets(path):
+    # Limits in cents indexed by account
+    try:
+        table = pd.read_csv(path, skipinitialspace=True)
+        limits = pd.to_numeric(
+            table['Monthly Limit'].astype(str).str.replace(r'[$,\s]', '', regex=True), errors='coerce'
+        )
+        limits = pd.Series((limits * 100).round().to_numpy(), index=table['Account'].astype(str).str.strip())
+        limits = limits.dropna()
+        limits = limits[limits > 0].astype(np.int64)
+        limits = limits[~limits.index.duplicated(keep='last')]
+    except (KeyError, ValueError, pd.errors.ParserError):
+        logger.warning("Ignoring unreadable budget file %s", path, exc_info=True)
+        limits = pd.Series(dtype=np.int64)
+    return limits
+
+
+def load_budgets(ds, state):
+    # Read once per snapshot and version of the file (state from budget_file_state)
+    if state is None:
+        return pd.Series(dtype=np.int64)
+    return derived(ds, f"budgets {state}", lambda ds: read_budgets(state[0]))
+
+
+def budget_months(ds, year, month):
+    # Months of the year the limits apply to (the chosen month, or every month up to the latest data)
+    # with the share of each month's limit that applies. Months through the last complete one count
+    # in full; the month the data ends in only counts the days before its latest one (which may still
+    # be filling in), so a month with just its 1st day has not started and spending a few days into
+    # a month is not held against a full month's limit
+    latest = ds.latest_transaction_date
+    last_month = latest.month if year == latest.year else 12
+    months = [month] if month else list(range(1, last_month + 1))
+
+    def share(m):
+        if (year, m) <= last_complete_month(ds):
+            return 1.0
+        if (year, m) == (latest.year, latest.month):
+            return (latest.day - 1) / latest.days_in_month
+        return 0.0
+
+    return months, sum(share(m) for m in months)
+
+
+def evaluate_budgets(ds, limits, year, month):
+    cube = ds.expense_daily_cube
+    months, share = budget_months(ds, year, month)
+    spent = np.zeros(len(cube['accounts']), dtype=np.int64)
+    for m in months:
+        entry = cube['months'].get((year, m))
+        if entry is not None:
+            spent += entry[0].sum(axis=0)
+
+    codes = cube['accounts'].get_indexer(limits.index)
+    actual = np.where(codes >= 0, spent[codes], 0)
+    limit = np.rint(limits.to_numpy() * share).astype(np.int64)
+    # A limit of zero (a month that has not started) is over as soon as anything is spent
+    used = np.divide(actual, limit, out=np.where(actual > 0, np.inf, 0.0), where=limit > 0)
+    status = np.select([used > 1, used >= BUDGET_WARNING_RATIO], ['Over', 'Warning'], 'OK')
+
+    return pd.DataFrame({
+        'Account': limits.index,
+        'Limit': limit,
+        'Actual': actual,
+        'Remaining': limit - actual,
+        'Used': used,
+        'Status': status
+    }).sort_values('Used', ascending=False, kind='stable')
+
+
+@app.callback(
+    Output('budget-section', 'children'),
+    [Input('year-radio', 'value'),
+     Input('month-radio', 'value')]
+)
+def update_budget_status(selected_year, selected_month):
+    # The budget file can change without the data changing, so its state is part of the cache key
+    return budget_status_view(selected_year, selected_month, budget_file_state())
+
+
+@memoized_view
+def budget_status_view(selected_year, selected_month, budget_state):
+    ds = get_dataset()
+    limits = load_budgets(ds, budget_state)
+    if limits.empty:
+        return html.P(
+            f"No budgets set. Add monthly limits per expense account to {BUDGET_FILE} "
+            "(columns: Account, Monthly Limit) to track spending against them here.",
+            style={'textAlign': 'center', 'color': '#777'}
+        )
+
+    year = int(selected_year)
+    month = int(selected_month or 0)
+    budgets = evaluate_budgets(ds, limits, year, month)
+    period = f"{calendar.month_name[month]} {year}" if month else f"{year} to Date"
+    status_colors = {'OK': 'green', 'Warning': 'orange', 'Over': 'red'}
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=budgets['Account'],
+        x=to_dollars(budgets['Actual']),
+        orientation='h',
+        name='Actual',
+        marker_color=[status_colors[s] for s in budgets['Status']],
+        hovertemplate='%{y}: $%{x:,.2f}<extra>Actual</extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        y=budgets['Account'],
+        x=to_dollars(budgets['Limit']),
+        mode='markers',
+        name='Limit',
+        marker=dict(symbol='line-ns-open', size=18, color='black', line=dict(width=3)),
+        hovertemplate='%{y}: $%{x:,.2f}<extra>Limit</extra>'
+    ))
+    fig.update_layout(
+        title=f"Budget vs Actual: {period}",
+        title_x=0.5,
+        xaxis_title="Dollars",
+        yaxis=dict(autorange='reversed'),
+        height=max(300, 40 * len(budgets) + 120),
+        showlegend=False
+    )
+
+    records = [
+        {
+            'Account': row.Account,
+            'Limit': f"${to_dollars(row.Limit):,.2f}",
+            'Actual': f"${to_dollars(row.Actual):,.2f}",
+            'Remaining': f"{'-' if row.Remaining < 0 else ''}${to_dollars(abs(row.Remaining)):,.2f}",
+            'Used': f"{row.Used:.0%}" if np.isfinite(row.Used) else '-',
+            'Status': row.Status
+        }
+        for row in budgets.itertuples()
+    ]
+
+    return [
+        dcc.Graph(figure=fig),
+        dash_table.DataTable(
+            data=records,
+            columns=[{'name': name, 'id': name} for name in ['Account', 'Limit', 'Actual', 'Remaining', 'Used', 'Status']],
+            style_table={'width': '100%'},
+            style_cell={'textAlign': 'left', 'padding': '6px', 'fontFamily': 'Open Sans', 'fontSize': '14px'},
+            style_header={'fontWeight': 'bold', 'backgroundColor': '#f9f9f9', 'borderBottom': '1px solid #ccc'},
+            style_data_conditional=[
+                {'if': {'filter_query': f'{{Status}} = "{status}"', 'column_id': 'Status'},
+                 'color': color, 'fontWeight': 'bold'}
+                for status, color in status_colors.items()
+            ]
+        )
+    ]
+
+
+# === ROLLING RATIOS ===
+# Trailing 3/6/12-month versions of the gauge ratios across the whole history. Monthly income,
+# outflow and debt-payment totals come from the daily cubes; each window sum is then the
+# difference of two cumulative sums, so the full series costs O(months) per window. The series
+# ends at the last complete month, as a month the data ends partway through would read as a slump.
+ROLLING_RATIO_WINDOWS = [3, 6, 12]
+ROLLING_RATIO_LINES = {
+    # Ratio: (line color, the gauge's target)
+    'Income-to-Expense': ('green', 1.2),
+    'Debt-Payments-to-Income': ('firebrick', 0.36),
+    'Savings Rate': ('steelblue', None)
+}
+
+
+def rolling_sums(values, window):
+    # Trailing `window`-month sums; NaN until a full window is available
+    cumulative = np.concatenate([[0], np.cumsum(values)])
+    sums = np.full(len(values), np.nan)
+    sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def build_rolling_ratios(ds):
+    income_cube, expense_cube = ds.income_daily_cube, ds.expense_daily_cube
+    if not income_cube['months'] or not expense_cube['months']:
+        return None
+    first = min(min(income_cube['months']), min(expense_cube['months']))
+    last = last_complete_month(ds)
+    if last < first:
+        return None
+    months, income = cube_month_history(income_cube, first, last)
+    _, outflows = cube_month_history(expense_cube, first, last)
+
+    payment_columns = expense_cube['accounts'].get_indexer(pd.Index(ds.sorted_payments))
+    payments = outflows[:, payment_columns[payment_columns >= 0]].sum(axis=1)
+    income, outflows = income.sum(axis=1), outflows.sum(axis=1)
+
+    ratios = {}
+    for window in ROLLING_RATIO_WINDOWS:
+        income_sum = rolling_sums(income, window)
+        expense_sum = rolling_sums(outflows, window)
+        payment_sum = rolling_sums(payments, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios[window] = pd.DataFrame({
+                'Income-to-Expense': np.where(expense_sum != 0, income_sum / expense_sum, np.nan),
+                'Debt-Payments-to-Income': np.where(income_sum != 0, payment_sum / income_sum, np.nan),
+                'Savings Rate': np.where(income_sum != 0, (income_sum - expense_sum) / income_sum, np.nan)
+            }, index=months.to_timestamp())
+    return ratios
+
+
+def rolling_ratios(ds):
+    return derived(ds, 'rolling_ratios', build_rolling_ratios)
+
+
+@app.callback(
+    Output('rolling-ratios-chart', 'figure'),
+    [Input('rolling-window-radio', 'value'),
+     Input('year-radio', 'value')]
+)
+@memoized_view
+def update_rolling_ratios(window, selected_year):
+    ds = get_dataset()
+    window = int(window)
+    history = rolling_ratios(ds)
+    if history is None:
+        return create_empty_figure(title=f"Rolling {window}-Month Ratios", message="No complete month of income and expenses yet.")
+    ratios = history[window]
+
+    fig = go.Figure()
+    for name, (color, target) in ROLLING_RATIO_LINES.items():
+        fig.add_trace(go.Scatter(
+            x=ratios.index,
+            y=ratios[name],
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=2),
+            hovertemplate='%{y:.2f}'
+        ))
+        if target is not None:
+            fig.add_hline(y=target, line=dict(color=color, width=1, dash='dot'))
+
+    # Shade the year picked above so the gauges can be read against their trend
+    year = int(selected_year)
+    fig.add_vrect(x0=f"{year}-01-01", x1=f"{year}-12-31", fillcolor='lightgray', opacity=0.3, line_width=0)
+
+    fig.update_layout(
+        title=f"Rolling {window}-Month Ratios",
+        title_x=0.5,
+        yaxis_title="Ratio",
+        hovermode='x unified',
+        legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.15),
+        margin=dict(t=50, b=40),
+        height=380
+    )
+    return fig
+
+
+# === NET WORTH ===
+# Cash minus debt for every month of the history, per account and in total. Balances come from
+# the monthly CASH_ON_HAND and DEBT snapshots. A month with no snapshot in the whole group is a gap
+# in the export, so every account carries its last balance over it; an account left out of a month
+# in which the rest of its group was snapshotted is taken as closed or paid off, and reads zero
+# from then until it shows up again (one vectorized pass over the month x account grid).
+def snapshot_balance_history(data, first, months):
+    # (months, accounts used) balances in cents, carried over gaps, and the account codes of the columns
+    rows = data['Date'].dt.year.to_numpy() * 12 + data['Date'].dt.month.to_numpy() - 1 - first
+    used, columns = np.unique(data['Sub-Category (Account)'].cat.codes.to_numpy(), return_inverse=True)
+
+    balances = np.zeros((months, len(used)), dtype=np.int64)
+    present = np.zeros((months, len(used)), dtype=bool)
+    np.add.at(balances, (rows, columns), data['Amount'].to_numpy())
+    present[rows, columns] = True
+
+    # For every cell, the latest month at or before it with a snapshot of that account (-1: none yet),
+    # and for every month the latest one with a snapshot of any account in the group
+    month_numbers = np.arange(months)
+    last_seen = np.maximum.accumulate(np.where(present, month_numbers[:, None], -1), axis=0)
+    last_group = np.maximum.accumulate(np.where(present.any(axis=1), month_numbers, -1))
+    filled = np.take_along_axis(balances, np.maximum(last_seen, 0), axis=0)
+    # A balance only carries forward if the account was in the group's latest snapshot
+    return np.where((last_seen >= 0) & (last_seen == last_group[:, None]), filled, 0), used
+
+
+def build_net_worth_history(ds):
+    frames = {'Cash': query_rows(ds, 'cash_data'), 'Debt': query_rows(ds, 'debt_data')}
+    snapshot_months = [
+        data['Date'].dt.year.to_numpy() * 12 + data['Date'].dt.month.to_numpy() - 1
+        for data in frames.values() if len(data)
+    ]
+    if not snapshot_months:
+        return None
+    first = min(months.min() for months in snapshot_months)
+    last = max(months.max() for months in snapshot_months)
+    index = pd.period_range(f"{first // 12}-{first % 12 + 1:02d}", periods=last - first + 1, freq='M').to_timestamp()
+
+    accounts = {}
+    for group, data in frames.items():
+        balances, codes = snapshot_balance_history(data, first, len(index))
+        accounts[group] = pd.DataFrame(balances, index=index, columns=ds.accounts[codes].astype(str))
+
+    totals = pd.DataFrame({group: balances.sum(axis=1) for group, balances in accounts.items()}, index=index)
+    totals['Net Worth'] = totals['Cash'] - totals['Debt']
+    return {'accounts': accounts, 'totals': totals}
+
+
+def net_worth_history(ds):
+    return derived(ds, 'net_worth_history', build_net_worth_history)
+
+
+@app.callback(
+    Output('net-worth-chart', 'figure'),
+    [Input('net-worth-view', 'value'),
+     Input('year-radio', 'value')]
+)
+@memoized_view
+def update_net_worth_history(view, selected_year):
+    ds = get_dataset()
+    history = net_worth_history(ds)
+    if history is None:
+        return go.Figure()
+    totals = history['totals']
+
+    fig = go.Figure()
+    if view == 'accounts':
+        # Cash accounts stack above zero, debts below, with the net worth line across them
+        for group, colors, sign in (('Cash', ds.cash_colors, 1), ('Debt', ds.debt_colors, -1)):
+            balances = history['accounts'][group]
+            for account, color in zip(balances.columns, account_colors(ds, colors, balances.columns)):
+                fig.add_trace(go.Bar(
+                    x=balances.index,
+                    y=to_dollars(balances[account] * sign),
+                    name=account,
+                    marker_color=color,
+                    hovertemplate=f'{account}: $%{{y:,.0f}}<extra></extra>'
+                ))
+        fig.update_layout(barmode='relative', bargap=0.1)
+        lines = [('Net Worth', 'black')]
+    else:
+        lines = [('Cash', 'green'), ('Debt', 'firebrick'), ('Net Worth', 'black')]
+
+    for name, color in lines:
+        fig.add_trace(go.Scatter(
+            x=totals.index,
+            y=to_dollars(totals[name]),
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=3 if name == 'Net Worth' else 2),
+            hovertemplate=f'{name}: $%{{y:,.0f}}<extra></extra>'
+        ))
+
+    year = int(selected_year)
+    fig.add_vrect(x0=f"{year}-01-01", x1=f"{year}-12-31", fillcolor='lightgray', opacity=0.3, line_width=0)
+
+    latest = totals.iloc[-1]
+    fig.update_layout(
+        title=f"Net Worth History (${to_dollars(latest['Net Worth']):,.0f} as of {totals.index[-1]:%b %Y})",
+        title_x=0.5,
+        yaxis_title="Dollars",
+        hovermode='x unified',
+        legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.15),
+        margin=dict(t=50, b=40),
+        height=450
+    )
+    return fig
+
+
+@app.callback(
+    Output('yearly-summary-title', 'children'),
+    Input('year-radio', 'value')
+)
+@memoized_view
+def update_summary_title(selected_year):
+    return html.Div([
+        html.H1("Yearly Summary", style={'marginBottom': '6px'}),
+    ])
+
+
+# === TRANSACTION EXPLORER ===
+TRANSACTIONS_PAGE_SIZE = 25
+
+filter_operators = [
+    ['ge ', '>='],
+    ['le ', '<='],
+    ['lt ', '<'],
+    ['gt ', '>'],
+    ['ne ', '!='],
+    ['eq ', '='],
+    ['contains '],
+    ['datestartswith ']
+]
+
+
+def split_filter_part(filter_part):
+    # Split one "{column} op value" clause of a DataTable filter_query
+    for operator_type in filter_operators:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+
+                value_part = value_part.strip()
+                v0 = value_part[0] if value_part else ''
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', '`'):
+                    value = value_part[1: -1].replace('\\' + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                return name, operator_type[0].strip(), value
+
+    return None, None, None
+
+
+def transaction_filter_clauses(filter_query):
+    # The usable "{column} op value" clauses of a filter_query as (column, operator, value), with the value
+    # already in the form it is compared in: a date string prefix, a Timestamp, cents or lowercase text
+    clauses = []
+    for filter_part in (filter_query or '').split(' && '):
+        col_name, operator, filter_value = split_filter_part(filter_part)
+        if col_name not in transaction_columns:
+            continue
+
+        if col_name == 'Date':
+            if operator in ('contains', 'datestartswith'):
+                clauses.append((col_name, 'startswith', str(filter_value)))
+                continue
+            filter_value = pd.to_datetime(str(filter_value), errors='coerce')
+            if pd.isna(filter_value):
+                continue
+        elif col_name == 'Amount':
+            if operator in ('contains', 'datestartswith'):
+                operator = 'eq'
+            try:
+                filter_value = round(float(filter_value) * 100)  # Typed in dollars, compared in cents
+            except ValueError:
+                continue
+        else:
+            if operator in ('contains', 'datestartswith'):
+                clauses.append((col_name, 'contains', str(filter_value).lower()))
+                continue
+            filter_value = str(filter_value).lower()
+        clauses.append((col_name, operator, filter_value))
+    return clauses
+
+
+def transaction_filter_mask(ds, filter_query):
+    mask = np.ones(len(ds.transactions_frame), dtype=bool)
+    for col_name, operator, filter_value in transaction_filter_clauses(filter_query):
+        if operator == 'startswith':
+            mask &= ds.transactions_date_strings.str.startswith(filter_value).to_numpy()
+            continue
+        if col_name in ('Date', 'Amount'):
+            column = ds.transactions_frame[col_name]
+        else:
+            column = transactions_lowercase(ds)[col_name]
+
+        if operator == 'contains':
+            mask &= column.str.contains(filter_value, regex=False).to_numpy()
+        elif operator == 'eq':
+            mask &= (column == filter_value).to_numpy()
+        elif operator == 'ne':
+            mask &= (column != filter_value).to_numpy()
+        elif operator == 'lt':
+            mask &= (column < filter_value).to_numpy()
+        elif operator == 'le':
+            mask &= (column <= filter_value).to_numpy()
+        elif operator == 'gt':
+            mask &= (column > filter_value).to_numpy()
+        elif operator == 'ge':
+            mask &= (column >= filter_value).to_numpy()
+
+    return mask
+
+
+def transaction_sort_sql(col_name):
+    # The store expression an explorer column filters and sorts on, matching transactions_frame and its lowercase copies
+    if col_name in ('Date', 'Amount'):
+        return store_columns[col_name]
+    return f"py_lower(coalesce({store_columns[transaction_columns[col_name]]}, ''))"
+
+
+def store_transactions_page(ds, filter_query, sort_by, page_current, page_size):
+    # One page of the explorer read from the SQLite store, in the same order and format as the in-memory path
+    sql_operators = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+    clauses, params = ['1'], []
+    for col_name, operator, filter_value in transaction_filter_clauses(filter_query):
+        if operator == 'startswith':
+            clauses.append("instr(substr(date, 1, 10), ?) = 1")
+        elif operator == 'contains':
+            clauses.append(f"instr({transaction_sort_sql(col_name)}, ?) > 0")
+        else:
+            clauses.append(f"{transaction_sort_sql(col_name)} {sql_operators[operator]} ?")
+        params.append(filter_value.strftime('%Y-%m-%d %H:%M:%S') if col_name == 'Date' and operator != 'startswith' else filter_value)
+    where = ' AND '.join(clauses)
+
+    # Descending reads the ascending order backwards, ties included
+    if sort_by:
+        direction = 'DESC' if sort_by[0]['direction'] == 'desc' else 'ASC'
+        order = f"{transaction_sort_sql(sort_by[0]['column_id'])} {direction}, row {direction}"
+    else:
+        order = 'row'
+
+    conn = store_connection(ds)
+    count = conn.execute(f"SELECT COUNT(*) FROM transactions WHERE {where}", params).fetchone()[0]
+    page = pd.read_sql_query(
+        f"SELECT substr(date, 1, 10) AS date, category, account, description, amount, memo FROM transactions "
+        f"WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+        conn, params=params + [page_size, page_current * page_size]
+    )
+    page.columns = list(transaction_columns)
+    for col in transaction_text_columns:
+        page[col] = page[col].fillna('').astype(str)
+    page['Amount'] = to_dollars(page['Amount'])
+    return page, count
+
+
+def transactions_layout():
+    return html.Div([
+        html.Div([
+            # Navigation links
+            html.Div([
+                dcc.Link('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
+                dcc.Link('Yearly Summary', href='/yearly-summary', style={'marginRight': '20px'}),
+                dcc.Link('Transactions', href='/transactions', style={'marginRight': '20px'}),
+                dcc.Link('Correlations', href='/correlations')
+            ], style={
+                'textAlign': 'center',
+                'marginBottom': '10px'
+            }),
+            html.H1("Transactions", style={'textAlign': 'center', 'marginBottom': '2px'}),
+            html.Div(id='transactions-count', style={'textAlign': 'center', 'color': '#777', 'marginTop': '6px'})
+        ], style={
+            'position': 'sticky',
+            'top': '0',
+            'zIndex': '1000',
+            'backgroundColor': 'white',
+            'padding': '15px 20px',
+            'borderBottom': '1px solid #ccc'
+        }),
+
+        # Full-history merchant search (runs as a background job)
+        html.Div([
+            dcc.Input(
+                id='history-search',
+                type='text',
+                placeholder='Search every year by merchant or transaction detail...',
+                autoComplete='off',
+                style={'width': '320px', 'padding': '4px 8px', 'fontSize': '14px', 'height': '30px'}
+            ),
+            html.Button('Search History', id='history-search-button', n_clicks=0, style={'height': '30px'}),
+            html.Button('Cancel', id='history-search-cancel', n_clicks=0, disabled=True, style={'height': '30px'}),
+            html.Progress(id='history-search-progress', value='0', max='1', style={'visibility': 'hidden'})
+        ], style={
+            'display': 'flex',
+            'justifyContent': 'center',
+            'alignItems': 'center',
+            'gap': '10px',
+            'marginTop': '15px'
+        }),
+        html.Div(id='history-search-results'),
+
+        dash_table.DataTable(
+            id='transactions-table',
+            columns=[
+                {'name': 'Date', 'id': 'Date', 'type': 'datetime'},
+                {'name': 'Category', 'id': 'Category'},
+                {'name': 'Account', 'id': 'Account'},
+                {'name': 'Transaction Detail', 'id': 'Transaction Detail'},
+                {'name': 'Amount', 'id': 'Amount', 'type': 'numeric'},
+                {'name': 'Memo', 'id': 'Memo'}
+            ],
+            page_current=0,
+            page_size=TRANSACTIONS_PAGE_SIZE,
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=[{'column_id': 'Date', 'direction': 'desc'}],
+            filter_action='custom',
+            filter_query='',
+            style_table={'width': '100%', 'marginTop': '20px'},
+            style_cell={
+                'textAlign': 'left',
+                'padding': '6px',
+                'fontFamily': 'Open Sans',
+                'fontSize': '14px',
+                'whiteSpace': 'normal',
+                'maxWidth': '300px'
+            },
+            style_header={
+                'fontWeight': 'bold',
+                'fontSize': '16px',
+                'backgroundColor': '#f9f9f9',
+                'borderBottom': '1px solid #ccc'
+            },
+            style_cell_conditional=[
+                {'if': {'column_id': 'Date'}, 'minWidth': '95px', 'textAlign': 'center'},
+                {'if': {'column_id': 'Amount'}, 'minWidth': '80px', 'textAlign': 'right'},
+                {'if': {'column_id': 'Transaction Detail'}, 'minWidth': '250px'}
+            ]
+        )
+    ], style={'padding': '20px', 'marginTop': '0px'})
+
+
+@app.callback(
+    [Output('transactions-table', 'data'),
+     Output('transactions-table', 'page_count'),
+     Output('transactions-count', 'children')],
+    [Input('transactions-table', 'page_current'),
+     Input('transactions-table', 'page_size'),
+     Input('transactions-table', 'sort_by'),
+     Input('transactions-table', 'filter_query')]
+)
+def update_transactions_table(page_current, page_size, sort_by, filter_query):
+    ds = get_dataset()
+
+    page_current = page_current or 0
+    page_size = page_size or TRANSACTIONS_PAGE_SIZE
+
+    if ds.store is not None:
+        page, count = store_transactions_page(ds, filter_query, sort_by, page_current, page_size)
+        page_count = max(1, -(-count // page_size))
+        return page.to_dict('records'), page_count, f"{count:,} of {ds.row_count:,} transactions"
+
+    mask = transaction_filter_mask(ds, filter_query)
+
+    # Walk the precomputed order for the sort column and keep the rows that pass the filter
+    if sort_by:
+        order = ds.transactions_sort_orders[sort_by[0]['column_id']]
+        if sort_by[0]['direction'] == 'desc':
+            order = order[::-1]
+        rows = order[mask[order]]
+    else:
+        rows = np.flatnonzero(mask)
+
+    page_count = max(1, -(-len(rows) // page_size))
+    page_rows = rows[page_current * page_size: (page_current + 1) * page_size]
+
+    page = ds.transactions_frame.iloc[page_rows].copy()
+    page['Date'] = ds.transactions_date_strings.iloc[page_rows].to_numpy()
+    page['Amount'] = to_dollars(page['Amount'])
+
+    return page.to_dict('records'), page_count, f"{len(rows):,} of {len(ds.transactions_frame):,} transactions"
+
+
+@heavy_callback(
+    Output('history-search-results', 'children'),
+    Input('history-search-button', 'n_clicks'),
+    State('history-search', 'value'),
+    progress=[Output('history-search-progress', 'value'), Output('history-search-progress', 'max')],
+    running=[
+        (Output('history-search-button', 'disabled'), True, False),
+        (Output('history-search-cancel', 'disabled'), False, True),
+        (Output('history-search-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'})
+    ],
+    cancel=[Input('history-search-cancel', 'n_clicks')],
+    prevent_initial_call=True
+)
+def search_transaction_history(set_progress, n_clicks, search_value):
+    ds = get_dataset()
+
+    search = search_value.lower().strip() if search_value else ''
+    if not search:
+        return html.P("Enter a merchant or transaction detail to search.", style={'textAlign': 'center', 'color': '#777'})
+
+    # One year at a time so the progress bar moves
+    matches = []
+    for i, year in enumerate(ds.available_years):
+        matches.append(query_rows(ds, 'all_expense_data', years=int(year), search=search))
+        set_progress((str(i + 1), str(len(ds.available_years))))
+    matched = pd.concat(matches) if matches else query_rows(ds, 'all_expense_data', years=[])
+
+    if matched.empty:
+        return html.P(f"No transactions match '{search_value.strip()}'.", style={'textAlign': 'center', 'color': '#777'})
+
+    monthly = matched.groupby(matched['Date'].dt.to_period('M'))['Amount'].agg(['sum', 'count'])
+    fig = go.Figure(go.Bar(
+        x=monthly.index.to_timestamp(),
+        y=to_dollars(monthly['sum']),
+        customdata=monthly['count'],
+        marker_color='#d62728',
+        hovertemplate='%{x|%b %Y}<br>$%{y:,.0f} over %{customdata} transactions<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"'{search_value.strip()}' Across All History",
+        xaxis_title='Month',
+        yaxis_title='Amount ($)',
+        height=400
+    )
+
+    summary = (
+        f"{len(matched):,} transactions, ${to_dollars(matched['Amount'].sum()):,.0f} total, "
+        f"{matched['Date'].min():%b %d, %Y} to {matched['Date'].max():%b %d, %Y}"
+    )
+    return [html.P(summary, style={'textAlign': 'center', 'color': '#555'}), dcc.Graph(figure=fig)]
+
+
+# === EXPENSE CORRELATIONS ===
+# How variable expense accounts (the EXPENSES category) move together month to month. The
+# month x account matrix is built once per snapshot from the expense cube's monthly totals; the
+# full correlation matrix for a window is then a single np.corrcoef call over its last rows.
+CORRELATION_WINDOWS = [0, 12, 24, 36]  # Trailing months; 0 is the full history
+CORRELATION_MIN_ACTIVE_MONTHS = 3  # Accounts with spending in fewer months of the window are left out
+CORRELATION_TOP_PAIRS = 10
+
+
+def build_expense_month_matrix(ds):
+    # (months, accounts) spending in cents, from the first month with data through the last complete
+    # one, as a month the data ends partway through would read as a drop in every account
+    cube = ds.expense_daily_cube
+    last = last_complete_month(ds)
+    if not cube['months'] or min(cube['months']) > last:
+        months, monthly = pd.PeriodIndex([], freq='M'), np.zeros((0, len(cube['accounts'])), dtype=np.int64)
     else:
-        # Single month logic
-        current_snapshot = df[
-            (df['Category'] == 'CASH_ON_HAND') &
-            (df['Date'].dt.year == selected_year) &
-            (df['Date'].dt.month == selected_month)
-        ]
-        total_cash = current_snapshot['Amount'].sum()
+        months, monthly = cube_month_history(cube, min(cube['months']), last)
+
+    columns = cube['accounts'].get_indexer(pd.Index(ds.sorted_expenses))
+    columns = columns[columns >= 0]
+    return {
+        'months': months,
+        'accounts': cube['accounts'][columns].astype(str),
+        'values': monthly[:, columns]
+    }
 
-        if selected_month == 1:
-            prev_snapshot = df[
-                (df['Category'] == 'CASH_ON_HAND') &
-                (df['Date'].dt.year == selected_year - 1) &
-                (df['Date'].dt.month == 12)
-            ]
-        else:
-            prev_snapshot = df[
-                (df['Category'] == 'CASH_ON_HAND') &
-                (df['Date'].dt.year == selected_year) &
-                (df['Date'].dt.month == selected_month - 1)
-            ]
 
-        prev_total = prev_snapshot['Amount'].sum()
+def expense_month_matrix(ds):
+    return derived(ds, 'expense_month_matrix', build_expense_month_matrix)
 
-        if prev_total > 0:
-            change_amount = total_cash - prev_total
-            change_percent = f"{(change_amount / prev_total) * 100:+.2f}%"
-            change_dollars = f"{change_amount:+,.0f}"
-            change_color = 'green' if change_amount > 0 else 'red'
-        else:
-            change_percent = "N/A"
-            change_dollars = ""
-            change_color = '#777'
 
-    # Pie chart for current snapshot
-    labels = current_snapshot[current_snapshot['Amount'] > 0]['Sub-Category (Account)']
-    values = current_snapshot[current_snapshot['Amount'] > 0]['Amount']
-    colors = [cash_colors.get(label, '#888') for label in labels]
+def top_correlation_pairs(accounts, corr, count, strongest):
+    # The `count` strongest positive (strongest=1) or negative (strongest=-1) off-diagonal pairs
+    rows, cols = np.triu_indices(len(accounts), 1)
+    values = corr[rows, cols] * strongest
+    if len(values) > count:
+        picked = np.argpartition(-values, count)[:count]
+    else:
+        picked = np.arange(len(values))
+    picked = picked[np.argsort(-values[picked], kind='stable')]
+    picked = picked[values[picked] > 0]
+    return pd.DataFrame({
+        'Account A': accounts[rows[picked]],
+        'Account B': accounts[cols[picked]],
+        'Correlation': corr[rows[picked], cols[picked]]
+    })
+
+
+def build_expense_correlations(ds, window, set_progress=None):
+    matrix = expense_month_matrix(ds)
+    if set_progress:
+        set_progress(('1', '3'))
+    values = matrix['values'][-window:] if window else matrix['values']
+    months = matrix['months'][-window:] if window else matrix['months']
+
+    # Constant columns have no correlation to speak of (np.corrcoef would give NaN)
+    keep = (values != 0).sum(axis=0) >= CORRELATION_MIN_ACTIVE_MONTHS
+    if len(values):
+        keep &= values.std(axis=0) > 0
+    accounts = matrix['accounts'][keep]
+    if len(accounts) < 2:
+        corr = np.empty((len(accounts), len(accounts)))
+    else:
+        corr = np.corrcoef(values[:, keep], rowvar=False)
+    if set_progress:
+        set_progress(('2', '3'))
+
+    return {
+        'start': months[0] if len(months) else None,
+        'end': months[-1] if len(months) else None,
+        'months': len(months),
+        'accounts': accounts,
+        'corr': corr,
+        'positive': top_correlation_pairs(accounts, corr, CORRELATION_TOP_PAIRS, 1),
+        'negative': top_correlation_pairs(accounts, corr, CORRELATION_TOP_PAIRS, -1)
+    }
 
-    pie_fig = go.Figure(data=[
-        go.Pie(
-            labels=labels,
-            values=values,
-            textinfo='label+percent',
-            hovertemplate='%{label}<br>$%{value:,.2f}<extra></extra>',
-            marker=dict(colors=colors)
-        )
-    ])
-    pie_fig.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0))
 
-    return (
-        f"${total_cash:,.0f}",
-        change_percent,
-        html.Span(f"${change_dollars}", style={'color': change_color}),
-        pie_fig
+def expense_correlations(ds, window, set_progress=None):
+    return derived(ds, f'expense_correlations_{window}', lambda ds: build_expense_correlations(ds, window, set_progress))
+
+
+def correlation_pairs_table(table_id):
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[
+            {'name': 'Account', 'id': 'Account A'},
+            {'name': 'Account', 'id': 'Account B'},
+            {'name': 'Correlation', 'id': 'Correlation'}
+        ],
+        style_table={'width': '100%'},
+        style_cell={'textAlign': 'left', 'padding': '6px', 'fontFamily': 'Open Sans', 'fontSize': '14px'},
+        style_header={'fontWeight': 'bold', 'backgroundColor': '#f9f9f9', 'borderBottom': '1px solid #ccc'}
     )
 
 
+def correlations_layout():
+    return html.Div([
+        html.Div([
+            # Navigation links
+            html.Div([
+                dcc.Link('Income vs Expenses', href='/income-expense', style={'marginRight': '20px'}),
+                dcc.Link('Yearly Summary', href='/yearly-summary', style={'marginRight': '20px'}),
+                dcc.Link('Transactions', href='/transactions', style={'marginRight': '20px'}),
+                dcc.Link('Correlations', href='/correlations')
+            ], style={
+                'textAlign': 'center',
+                'marginBottom': '10px'
+            }),
+            html.H1("Expense Correlations", style={'textAlign': 'center', 'marginBottom': '2px'}),
+            html.Div(id='correlation-summary', style={'textAlign': 'center', 'color': '#777', 'marginTop': '6px'}),
+            html.Progress(id='correlation-progress', value='0', max='3', style={'display': 'none'})
+        ], style={
+            'position': 'sticky',
+            'top': '0',
+            'zIndex': '1000',
+            'backgroundColor': 'white',
+            'padding': '15px 20px',
+            'borderBottom': '1px solid #ccc'
+        }),
+
+        html.Div([
+            html.Label('Window', style={'fontWeight': 'bold'}),
+            dcc.RadioItems(
+                id='correlation-window',
+                options=[
+                    {'label': f'Last {window} Months' if window else 'Full History', 'value': window}
+                    for window in CORRELATION_WINDOWS
+                ],
+                value=0,
+                inline=True,
+                style={'justifyContent': 'center'}
+            )
+        ], style={'textAlign': 'center', 'marginTop': '15px'}),
+
+        dcc.Graph(id='correlation-heatmap'),
 
-@app.callback(
-    Output('yearly-summary-title', 'children'),
-    Input('year-radio', 'value')
+        html.Div([
+            html.Div([
+                html.H3("Strongest Positive Pairs", style={'textAlign': 'center'}),
+                correlation_pairs_table('correlation-positive-pairs')
+            ], style={'flex': '1'}),
+            html.Div([
+                html.H3("Strongest Negative Pairs", style={'textAlign': 'center'}),
+                correlation_pairs_table('correlation-negative-pairs')
+            ], style={'flex': '1'})
+        ], style={'display': 'flex', 'gap': '40px'}),
+        html.Br(),
+        html.Br()
+
+    ], style={
+        'padding': '20px 40px 20px 40px',  # Top, Right, Bottom, Left
+        'maxWidth': '1200px',
+        'margin': '0 auto'
+    })
+
+
+@heavy_callback(
+    [Output('correlation-summary', 'children'),
+     Output('correlation-heatmap', 'figure'),
+     Output('correlation-positive-pairs', 'data'),
+     Output('correlation-negative-pairs', 'data')],
+    Input('correlation-window', 'value'),
+    progress=[Output('correlation-progress', 'value'), Output('correlation-progress', 'max')],
+    running=[(Output('correlation-progress', 'style'), {'display': 'block', 'margin': '6px auto 0'}, {'display': 'none'})]
 )
-def update_summary_title(selected_year):
-    return html.Div([
-        html.H1("Yearly Summary", style={'marginBottom': '6px'}),
-    ])
+def update_expense_correlations(set_progress, window):
+    ds = get_dataset()
+    result = expense_correlations(ds, int(window or 0), set_progress)
+    accounts = list(result['accounts'])
+
+    if result['months']:
+        summary = (
+            f"{len(accounts)} variable expense accounts over {result['months']} months, "
+            f"{result['start'].strftime('%b %Y')} to {result['end'].strftime('%b %Y')}"
+        )
+    else:
+        summary = "No expense history yet"
+
+    fig = go.Figure(go.Heatmap(
+        z=np.round(result['corr'], 2),
+        x=accounts,
+        y=accounts,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        colorbar=dict(title='r'),
+        hovertemplate='%{y} vs %{x}: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=max(500, 22 * len(accounts) + 200),
+        yaxis=dict(autorange='reversed'),
+        xaxis=dict(tickangle=-45),
+        margin=dict(t=30)
+    )
+
+    def records(pairs):
+        return [
+            {'Account A': row[0], 'Account B': row[1], 'Correlation': f"{row[2]:.2f}"}
+            for row in pairs.itertuples(index=False)
+        ]
+
+    return summary, fig, records(result['positive']), records(result['negative'])
 
 
 # Callback to render the correct layout based on the URL path
@@ -2614,9 +5293,13 @@ def update_summary_title(selected_year):
 )
 def display_page(pathname):
     if pathname == '/income-expense':
-        return income_vs_expenses_layout
+        return income_vs_expenses_layout()
     elif pathname == '/' or pathname == '/yearly-summary':
-        return yearly_summary_layout
+        return yearly_summary_layout()
+    elif pathname == '/transactions':
+        return transactions_layout()
+    elif pathname == '/correlations':
+        return correlations_layout()
     else:
         return html.Div("404 - Page not found", style={'textAlign': 'center', 'padding': '50px'})
 
@@ -2629,24 +5312,19 @@ def display_page(pathname):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_income_type_options(selected_year, selected_month):
     # Filter income data by selected year
-    filtered_income = income_data[income_data['Date'].dt.year == selected_year]
+    ds = get_dataset()
 
-    # If a specific month is selected, filter further
-    if selected_month != 0:
-        filtered_income = filtered_income[filtered_income['Date'].dt.month == selected_month]
+    # A month of 0 means the whole year
+    totals = query_account_totals(ds, 'income_data', years=selected_year, month=selected_month)
 
-    if filtered_income.empty:
+    if totals.empty:
         return [], [], []
 
-    # Group by income source and sort by total amount (descending)
-    totals = (
-        filtered_income
-        .groupby('Sub-Category (Account)')['Amount']
-        .sum()
-        .sort_values(ascending=False)
-    )
+    # Sort income sources by total amount (descending)
+    totals = totals.sort_values(ascending=False)
 
     # Build checklist options
     options = [{'label': i, 'value': i} for i in totals.index]
@@ -2727,39 +5405,22 @@ def toggle_breakdown_categories(select_all, clear_all, options):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_all_expense_breakdown_filters(year, month):
     # === Payments ===
-    payments_filtered = payment_data[payment_data['Date'].dt.year == year]
-    if month != 0:
-        payments_filtered = payments_filtered[payments_filtered['Date'].dt.month == month]
+    ds = get_dataset()
 
-    sorted_payments = (
-        payments_filtered.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
-    )
+    sorted_payments = accounts_by_total(query_account_totals(ds, 'payment_data', years=year, month=month))
     payments_options = [{'label': cat, 'value': cat} for cat in sorted_payments]
 
     # === Utilities & Insurance ===
-    ui_filtered = pd.concat([utilities_data, insurance_data])
-    ui_filtered = ui_filtered[ui_filtered['Date'].dt.year == year]
-    if month != 0:
-        ui_filtered = ui_filtered[ui_filtered['Date'].dt.month == month]
-
-    sorted_ui = (
-        ui_filtered.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
+    sorted_ui = accounts_by_total(
+        query_account_totals(ds, ['utilities_data', 'insurance_data'], years=year, month=month)
     )
     ui_options = [{'label': cat, 'value': cat} for cat in sorted_ui]
 
     # === General Expense Categories ===
-    general_filtered = expenses_data[expenses_data['Date'].dt.year == year]
-    if month != 0:
-        general_filtered = general_filtered[general_filtered['Date'].dt.month == month]
-
-    sorted_expenses = (
-        general_filtered.groupby('Sub-Category (Account)')['Amount']
-        .sum().sort_values(ascending=False).index.tolist()
-    )
+    sorted_expenses = accounts_by_total(query_account_totals(ds, 'expenses_data', years=year, month=month))
     expense_options = [{'label': cat, 'value': cat} for cat in sorted_expenses]
 
     return (
@@ -2785,46 +5446,24 @@ def update_all_expense_breakdown_filters(year, month):
 )
 def auto_select_top5_breakdown_expenses (year, month, stored_search_value):
     # === Filter the full dataset by year/month ===
-    data = all_expense_data[all_expense_data['Date'].dt.year == year]
-    if month != 0:
-        data = data[data['Date'].dt.month == month]
+    ds = get_dataset()
 
     # Optional search filter
-    if stored_search_value:
-        search_term = stored_search_value.lower().strip()
-        data = data[data['Description (Transaction Detail)'].str.lower().str.contains(search_term)]
+    search_term = stored_search_value.lower().strip() if stored_search_value else None
+    data = query_rows(ds, 'all_expense_data', years=year, month=month, search=search_term)
 
     if data.empty:
         return [], [], []
 
-    # Payments
-    filtered_payments = payment_data[payment_data['Date'].dt.year == year]
-    if month != 0:
-        filtered_payments = filtered_payments[filtered_payments['Date'].dt.month == month]
-    current_payment_categories = filtered_payments['Sub-Category (Account)'].unique().tolist()
-
-    # Utilities & Insurance
-    filtered_ui = pd.concat([utilities_data, insurance_data])
-    filtered_ui = filtered_ui[filtered_ui['Date'].dt.year == year]
-    if month != 0:
-        filtered_ui = filtered_ui[filtered_ui['Date'].dt.month == month]
-    current_ui_categories = filtered_ui['Sub-Category (Account)'].unique().tolist()
-
-    # General Expenses
-    filtered_expenses = expenses_data[expenses_data['Date'].dt.year == year]
-    if month != 0:
-        filtered_expenses = filtered_expenses[filtered_expenses['Date'].dt.month == month]
-    current_expense_categories = filtered_expenses['Sub-Category (Account)'].unique().tolist()
+    # Accounts with rows in the period, per group
+    current_payment_categories = query_account_totals(ds, 'payment_data', years=year, month=month).index.tolist()
+    current_ui_categories = query_account_totals(
+        ds, ['utilities_data', 'insurance_data'], years=year, month=month
+    ).index.tolist()
+    current_expense_categories = query_account_totals(ds, 'expenses_data', years=year, month=month).index.tolist()
 
     # Top 5 across all categories
-    top5_cats = (
-        data.groupby('Sub-Category (Account)')['Amount']
-        .sum()
-        .sort_values(ascending=False)
-        .head(5)
-        .index
-        .tolist()
-    )
+    top5_cats = accounts_by_total(account_totals(data))[:5]
 
     top5_payments = [cat for cat in top5_cats if cat in current_payment_categories]
     top5_utilities = [cat for cat in top5_cats if cat in current_ui_categories]
@@ -2916,13 +5555,13 @@ def update_merchant_search(search_clicks, clear_clicks, search_input):
     [Input('year-radio', 'value'),
      Input('month-radio', 'value')]
 )
+@memoized_view
 def update_top5_expenses(year, selected_month):
     # Filter the data by year
-    filtered_data = all_expense_data[all_expense_data['Date'].dt.year == year]
+    ds = get_dataset()
 
-    # If a specific month is selected, filter further
-    if selected_month != 0:
-        filtered_data = filtered_data[filtered_data['Date'].dt.month == selected_month]
+    # A month of 0 means the whole year
+    filtered_data = query_rows(ds, 'all_expense_data', years=year, month=selected_month)
 
     if filtered_data.empty:
         return create_empty_figure(title="Top Expense Categories", message="No data for selected period.")
@@ -2932,10 +5571,11 @@ def update_top5_expenses(year, selected_month):
 
     # Group by sub-category and calculate total expenses
     expense_by_subcategory = (
-        filtered_data.groupby('Sub-Category (Account)')
+        filtered_data.groupby('Sub-Category (Account)', observed=True)
         .agg({'Amount': 'sum'})
         .reset_index()
     )
+    record_scan('groupby', filtered_data, expense_by_subcategory)
 
     # Get the top 5 expenses
     top5_expenses = expense_by_subcategory.nlargest(5, 'Amount').copy()
@@ -2949,12 +5589,12 @@ def update_top5_expenses(year, selected_month):
     )
 
     # Use custom colors for consistency
-    pie_colors = [expense_colors.get(cat, '#888') for cat in top5_expenses['Sub-Category (Account)']]
+    pie_colors = account_colors(ds, ds.expense_colors, top5_expenses['Sub-Category (Account)'])
 
     # Create the pie chart
     fig = go.Figure(data=[go.Pie(
         labels=top5_expenses['Sub-Category (Account)'],
-        values=top5_expenses['Amount'],
+        values=to_dollars(top5_expenses['Amount']),
         text=top5_expenses['Display'], 
         textinfo='text',  
         hovertemplate=(
@@ -2982,35 +5622,29 @@ def update_top5_expenses(year, selected_month):
     Output('top5-purchases-table', 'children'),
     [Input('year-radio', 'value'),
      Input('month-radio', 'value'),
-     Input('top5-toggle-mode', 'value')]
+     Input('top5-toggle-mode', 'value'),
+     Input('top-n-select', 'value')]
 )
-def update_top5_purchases(selected_year, selected_month, toggle_mode):
-    # Filter by selected year and month
-    data = all_expense_data[all_expense_data['Date'].dt.year == selected_year].copy()
-
-    if selected_month != 0:
-        data = data[data['Date'].dt.month == selected_month]
+@memoized_view
+def update_top5_purchases(selected_year, selected_month, toggle_mode, top_n=5):
+    ds = get_dataset()
 
-    if data.empty:
-        return dcc.Graph(figure=create_empty_figure(title="Top Transactions", message="No data for selected period."))
-
-    # Replace missing or blank descriptions
-    data['Description (Transaction Detail)'] = data.apply(
-        lambda row: row['Sub-Category (Account)']
-        if pd.isna(row['Description (Transaction Detail)']) or row['Description (Transaction Detail)'].strip().lower() in ["", "nan"]
-        else row['Description (Transaction Detail)'],
-        axis=1
-    )
+    top_n = min(int(top_n or 5), TOP_TRANSACTIONS_K)
 
     # === MODE: BY AMOUNT ===
     if toggle_mode == 'amount':
-        top5 = data.nlargest(5, 'Amount')[
-            ['Date', 'Description (Transaction Detail)', 'Amount', 'Note / Comment / Memo']
-        ].copy()
+        # Served from the precomputed index, no scan of the period's rows
+        rows = top_transaction_rows(ds, selected_year, selected_month, top_n)
+        if len(rows) == 0:
+            return dcc.Graph(figure=create_empty_figure(title="Top Transactions", message="No data for selected period."))
+
+        top_rows = query_expense_rows(ds, rows)
+        top5 = top_rows[['Date', 'Amount', 'Note / Comment / Memo']].copy()
+        top5.insert(1, 'Description (Transaction Detail)', display_descriptions(top_rows).to_numpy())
 
         # Format
         top5['Date'] = top5['Date'].dt.strftime('%b %d, %Y')
-        top5['Amount'] = top5['Amount'].apply(lambda x: f"${x:,.0f}")
+        top5['Amount'] = top5['Amount'].apply(lambda x: f"${to_dollars(x):,.0f}")
 
         top5 = top5.rename(columns={
             'Description (Transaction Detail)': 'Transaction Detail',
@@ -3022,26 +5656,38 @@ def update_top5_purchases(selected_year, selected_month, toggle_mode):
 
     # === MODE: BY FREQUENCY ===
     else:
+        # Filter by selected year and month (0 is the whole year)
+        data = query_rows(ds, 'all_expense_data', years=selected_year, month=selected_month)
+
+        if data.empty:
+            return dcc.Graph(figure=create_empty_figure(title="Top Transactions", message="No data for selected period."))
+
+        # Replace missing or blank descriptions
+        data = data.assign(**{'Description (Transaction Detail)': display_descriptions(data)})
+
         # Normalize description for matching
         desc_series = data['Description (Transaction Detail)'].str.upper()
 
-        # Identify Amazon/AMZN transactions and tag them
-        data['Merchant_Group'] = desc_series.apply(
-            lambda x: 'Amazon' if x.startswith('AMAZO') or x.startswith('AMZN') else x[:5].capitalize()
+        # Identify Amazon/AMZN transactions and tag them; the rest group by their first 5 characters
+        merchant_groups = pd.Series(
+            np.where(desc_series.str.startswith(('AMAZO', 'AMZN')), 'Amazon', desc_series.str[:5].str.capitalize()),
+            index=data.index,
+            name='Merchant_Group'
         )
 
-        # Group by first 5 characters
-        grouped = data.groupby('Merchant_Group').agg({
+        # Group by merchant without adding a column to the period's rows
+        grouped = data.groupby(merchant_groups).agg({
             'Description (Transaction Detail)': lambda x: pd.Series(x).mode().iloc[0],
             'Amount': 'sum',
             'Date': 'count'
         }).rename(columns={'Date': '# of Trans'}).reset_index()
+        record_scan('groupby', data, grouped)
 
         # Sort by frequency, then amount
-        top5 = grouped.sort_values(by=['# of Trans', 'Amount'], ascending=[False, False]).head(5)
+        top5 = grouped.sort_values(by=['# of Trans', 'Amount'], ascending=[False, False]).head(top_n)
 
         # Format the result
-        top5['Amount'] = top5['Amount'].apply(lambda x: f"${x:,.0f}")
+        top5['Amount'] = top5['Amount'].apply(lambda x: f"${to_dollars(x):,.0f}")
         top5 = top5.rename(columns={'Description (Transaction Detail)': 'Transaction Detail'})[
             ['# of Trans', 'Transaction Detail', 'Amount']
         ]
@@ -3095,35 +5741,16 @@ def update_top5_purchases(selected_year, selected_month, toggle_mode):
      Input('month-radio', 'value'),
      Input('income-type-checklist', 'value')]
 )
+@memoized_view
 def update_monthly_income_bar(year, selected_month, selected_accounts):
+    ds = get_dataset()
+
     if not selected_accounts:
         return create_empty_figure(title='Income Breakdown', message="Please select at least one filter option.")
 
-    # Filter by year and selected income types
-    data = income_data[
-        (income_data['Date'].dt.year == year) &
-        (income_data['Sub-Category (Account)'].isin(selected_accounts))
-    ]
-
     if selected_month != 0:
-        # Filter for selected month
-        data = data[data['Date'].dt.month == selected_month]
-
-        # Create full date range for selected month
-        start_date = pd.Timestamp(year=year, month=selected_month, day=1)
-        end_date = start_date + pd.offsets.MonthEnd(0)
-        all_days = pd.date_range(start=start_date, end=end_date)
-
-        # Group by full date and account
-        grouped = data.groupby([
-            data['Date'].dt.date,
-            data['Sub-Category (Account)']
-        ])['Amount'].sum().reset_index()
-        grouped['Date'] = pd.to_datetime(grouped['Date'])
-
-        # Pivot and reindex with all days
-        pivot = grouped.pivot(index='Date', columns='Sub-Category (Account)', values='Amount').fillna(0)
-        pivot = pivot.reindex(all_days, fill_value=0)
+        # Day x account matrix for the month, sliced from the daily cube
+        pivot = daily_cube_slice(ds.income_daily_cube, year, selected_month, selected_accounts)
         pivot.index.name = 'Date'
 
         x_labels = [d.day for d in pivot.index]
@@ -3131,11 +5758,15 @@ def update_monthly_income_bar(year, selected_month, selected_accounts):
         title = f"Income Breakdown - {calendar.month_name[selected_month]} {year}"
         xaxis_title = "Day"
     else:
+        # Filter by year and selected income types
+        data = query_rows(ds, 'income_data', years=year, accounts=selected_accounts)
+
         # Group by month and account
         grouped = data.groupby([
             data['Date'].dt.month,
             data['Sub-Category (Account)']
-        ])['Amount'].sum().reset_index()
+        ], observed=True)['Amount'].sum().reset_index()
+        record_scan('groupby', data, grouped)
 
         pivot = grouped.pivot(index='Date', columns='Sub-Category (Account)', values='Amount').fillna(0)
         pivot.index.name = 'Month'
@@ -3146,6 +5777,8 @@ def update_monthly_income_bar(year, selected_month, selected_accounts):
         title = f"Income Breakdown - {year}"
         xaxis_title = "Month"
 
+    pivot = to_dollars(pivot)
+
     # Trend line
     pivot['Total'] = pivot.sum(axis=1)
     avg = pivot['Total'][pivot['Total'] > 0].mean()
@@ -3156,13 +5789,13 @@ def update_monthly_income_bar(year, selected_month, selected_accounts):
     # Sort stack order by total income (largest first)
     stack_order = pivot.drop(columns='Total').sum().sort_values(ascending=False).index.tolist()
 
-    for col in stack_order:
+    for col, color in zip(stack_order, account_colors(ds, ds.income_colors, stack_order)):
         fig.add_trace(go.Bar(
             x=x_labels,
             y=pivot[col],
             name=col,
             customdata=np.array(hover_labels).reshape(-1, 1),
-            marker_color=income_colors.get(col, '#888'),
+            marker_color=color,
             hovertemplate='%{customdata[0]}<br>%{fullData.name}: $%{y:,.0f}<extra></extra>'
         ))
 
@@ -3203,6 +5836,62 @@ def update_monthly_income_bar(year, selected_month, selected_accounts):
 
     return fig
 
+def build_expense_breakdown_figure(ds, pivot, x_labels, hover_labels, title, xaxis_title):
+    # === Compute totals & average ===
+    pivot = to_dollars(pivot)
+    pivot['Total'] = pivot.sum(axis=1)
+    avg = pivot['Total'][pivot['Total'] > 0].mean()
+
+    # === Create figure ===
+    fig = go.Figure()
+    stack_order = pivot.drop(columns='Total').sum().sort_values(ascending=False).index.tolist()
+
+    for col, color in zip(stack_order, account_colors(ds, ds.expense_colors, stack_order)):
+        fig.add_trace(go.Bar(
+            x=x_labels,
+            y=pivot[col],
+            name=col,
+            customdata=np.array(hover_labels).reshape(-1, 1),
+            marker_color=color,
+            hovertemplate='%{customdata[0]}<br>%{fullData.name}: $%{y:,.0f}<extra></extra>'
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=x_labels,
+        y=[avg] * len(pivot),
+        mode='lines',
+        name='Average Expense',
+        line=dict(color='black', dash='dot'),
+        hovertemplate='Average: $%{y:,.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title="Amount ($)",
+        barmode='stack',
+        height=500,
+        width=700,
+        margin=dict(l=60, r=50, t=105, b=50),
+        legend=dict(
+            orientation='h',
+            x=0,
+            y=-0.2,
+            xanchor='left',
+            yanchor='top',
+            font=dict(size=12)
+        ),
+        xaxis=dict(
+            tickmode='array',
+            tickvals=x_labels,
+            tickangle=0,
+            tickfont=dict(size=12)
+        )
+    )
+
+    return fig
+
+
 @app.callback(
     Output('monthly-expense-bar-chart', 'figure'),
     [
@@ -3217,8 +5906,11 @@ def update_monthly_income_bar(year, selected_month, selected_accounts):
     State('merchant-search', 'value'),  
     prevent_initial_call=True
 )
+@memoized_view
 def update_monthly_expenses(year, selected_month, payments, utilities, categories, stored_search_value, _, search_input):
     # === Combine selected categories ===
+    ds = get_dataset()
+
     selected_categories = (payments or []) + (utilities or []) + (categories or [])
     if not selected_categories and not stored_search_value:
         return create_empty_figure(title='Expense Breakdown',
@@ -3228,18 +5920,21 @@ def update_monthly_expenses(year, selected_month, payments, utilities, categorie
     filter_label = f" - Filter: '{search_input.strip()}'" if search_input and search_input.strip() else ""
     title = f"Expense Breakdown - {month_name} {year}{filter_label}".strip()
 
-    # === Filter data ===
-    data = all_expense_data[
-        (all_expense_data['Date'].dt.year == year) &
-        (all_expense_data['Sub-Category (Account)'].isin(selected_categories))
-    ]
-
-    if stored_search_value:
-        search_term = stored_search_value.lower().strip()
-        data = data[data['Description (Transaction Detail)'].str.lower().str.contains(search_term)]
+    # === Month without a search: slice the daily cube ===
+    if selected_month != 0 and not stored_search_value:
+        pivot = daily_cube_slice(ds.expense_daily_cube, year, selected_month, selected_categories)
+        if pivot.columns.empty:
+            return create_empty_figure(title=title, message="No data for selected period.")
+        x_labels = [d.day for d in pivot.index]
+        hover_labels = [d.strftime('%b %d') for d in pivot.index]
+        xaxis_title = "Day"
+        return build_expense_breakdown_figure(ds, pivot, x_labels, hover_labels, title, xaxis_title)
 
-    if selected_month != 0:
-        data = data[data['Date'].dt.month == selected_month]
+    # === Filter data ===
+    data = query_rows(
+        ds, 'all_expense_data', years=year, month=selected_month, accounts=selected_categories,
+        search=stored_search_value.lower().strip() if stored_search_value else None
+    )
 
     if data.empty:
         return create_empty_figure(
@@ -3256,7 +5951,8 @@ def update_monthly_expenses(year, selected_month, payments, utilities, categorie
         grouped = data.groupby([
             data['Date'].dt.date,
             data['Sub-Category (Account)']
-        ])['Amount'].sum().reset_index()
+        ], observed=True)['Amount'].sum().reset_index()
+        record_scan('groupby', data, grouped)
 
         pivot = grouped.pivot(index='Date', columns='Sub-Category (Account)', values='Amount').fillna(0)
         pivot = pivot.reindex(all_days, fill_value=0)
@@ -3267,7 +5963,8 @@ def update_monthly_expenses(year, selected_month, payments, utilities, categorie
         grouped = data.groupby([
             data['Date'].dt.month,
             data['Sub-Category (Account)']
-        ])['Amount'].sum().reset_index()
+        ], observed=True)['Amount'].sum().reset_index()
+        record_scan('groupby', data, grouped)
 
         pivot = grouped.pivot(index='Date', columns='Sub-Category (Account)', values='Amount').fillna(0)
         pivot = pivot.sort_index()
@@ -3275,58 +5972,8 @@ def update_monthly_expenses(year, selected_month, payments, utilities, categorie
         hover_labels = x_labels
         xaxis_title = "Month"
 
-    # === Compute totals & average ===
-    pivot['Total'] = pivot.sum(axis=1)
-    avg = pivot['Total'][pivot['Total'] > 0].mean()
-
-    # === Create figure ===
-    fig = go.Figure()
-    stack_order = pivot.drop(columns='Total').sum().sort_values(ascending=False).index.tolist()
-
-    for col in stack_order:
-        fig.add_trace(go.Bar(
-            x=x_labels,
-            y=pivot[col],
-            name=col,
-            customdata=np.array(hover_labels).reshape(-1, 1),
-            marker_color=expense_colors.get(col, '#888'),
-            hovertemplate='%{customdata[0]}<br>%{fullData.name}: $%{y:,.0f}<extra></extra>'
-        ))
-
-    fig.add_trace(go.Scatter(
-        x=x_labels,
-        y=[avg] * len(pivot),
-        mode='lines',
-        name='Average Expense',
-        line=dict(color='black', dash='dot'),
-        hovertemplate='Average: $%{y:,.0f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        title=title,
-        xaxis_title=xaxis_title,
-        yaxis_title="Amount ($)",
-        barmode='stack',
-        height=500,
-        width=700,
-        margin=dict(l=60, r=50, t=105, b=50),
-        legend=dict(
-            orientation='h',
-            x=0,
-            y=-0.2,
-            xanchor='left',
-            yanchor='top',
-            font=dict(size=12)
-        ),
-        xaxis=dict(
-            tickmode='array',
-            tickvals=x_labels,
-            tickangle=0,
-            tickfont=dict(size=12)
-        )
-    )
+    return build_expense_breakdown_figure(ds, pivot, x_labels, hover_labels, title, xaxis_title)
 
-    return fig
 
 
 
@@ -3350,6 +5997,8 @@ def update_monthly_expenses(year, selected_month, payments, utilities, categorie
     prevent_initial_call=True
 )
 def update_filters_on_search_or_clear(search_clicks, clear_clicks, search_value, year, month):
+    ds = get_dataset()
+
     ctx = dash.callback_context
 
     if not ctx.triggered:
@@ -3364,16 +6013,16 @@ def update_filters_on_search_or_clear(search_clicks, clear_clicks, search_value,
 
     if triggered_id == 'search-button' and search_value:
         search_value = search_value.lower().strip()
-        filtered = all_expense_data[all_expense_data['Description (Transaction Detail)'].str.lower().str.contains(search_value)]
+        filtered = query_rows(ds, 'all_expense_data', search=search_value)
 
         if filtered.empty:
             return [], [], [], search_value, search_value
 
         matched_categories = filtered['Sub-Category (Account)'].unique()
 
-        selected_payments = [cat for cat in matched_categories if cat in sorted_payments]
-        selected_utilities = [cat for cat in matched_categories if cat in sorted_utilities_insurance]
-        selected_general = [cat for cat in matched_categories if cat in sorted_expenses]
+        selected_payments = [cat for cat in matched_categories if cat in ds.sorted_payments]
+        selected_utilities = [cat for cat in matched_categories if cat in ds.sorted_utilities_insurance]
+        selected_general = [cat for cat in matched_categories if cat in ds.sorted_expenses]
 
         return selected_payments, selected_utilities, selected_general, search_value, search_value
 
@@ -3393,6 +6042,8 @@ def update_filters_on_search_or_clear(search_clicks, clear_clicks, search_value,
     prevent_initial_call=True
 )
 def update_expense_filters_on_date_change(year, month, search_value):
+    ds = get_dataset()
+
     ctx = dash.callback_context
 
     if not ctx.triggered:
@@ -3405,27 +6056,377 @@ def update_expense_filters_on_date_change(year, month, search_value):
         search_value = search_value.lower().strip()
 
         # Filter for search match using updated year/month
-        filtered = all_expense_data[
-            (all_expense_data['Date'].dt.year == year) &
-            ((all_expense_data['Date'].dt.month == month) if month != 0 else True) &
-            all_expense_data['Description (Transaction Detail)'].str.lower().str.contains(search_value)
-        ]
+        filtered = query_rows(ds, 'all_expense_data', years=year, month=month, search=search_value)
 
         if filtered.empty:
             return [], [], [], search_value, search_value
 
         matched_categories = filtered['Sub-Category (Account)'].unique()
 
-        selected_payments = [cat for cat in matched_categories if cat in sorted_payments]
-        selected_utilities = [cat for cat in matched_categories if cat in sorted_utilities_insurance]
-        selected_general = [cat for cat in matched_categories if cat in sorted_expenses]
+        selected_payments = [cat for cat in matched_categories if cat in ds.sorted_payments]
+        selected_utilities = [cat for cat in matched_categories if cat in ds.sorted_utilities_insurance]
+        selected_general = [cat for cat in matched_categories if cat in ds.sorted_expenses]
 
         return selected_payments, selected_utilities, selected_general, search_value, search_value
 
     raise dash.exceptions.PreventUpdate
 
 
+# === STARTUP WARM-UP ===
+# After startup and every reload, precompute the views a first visitor lands on into the view cache:
+# the full-history Income vs Expenses figure, the default Yearly Summary year and its most recent months.
+# FINANCE_DASHBOARD_WARMUP=0 turns this off
+VIEW_WARMUP = os.environ.get('FINANCE_DASHBOARD_WARMUP', '1') != '0'
+WARMUP_MONTHS = int(os.environ.get('FINANCE_DASHBOARD_WARMUP_MONTHS', 3))
+WARMUP_WORKERS = int(os.environ.get('FINANCE_DASHBOARD_WARMUP_WORKERS', 4))
+
+
+def warmup_year_months(ds):
+    # The Yearly Summary default (latest year, full year) followed by the latest months
+    views = [(int(ds.latest_year), 0)]
+    if WARMUP_MONTHS > 0:
+        for period in pd.period_range(end=ds.latest_transaction_date, periods=WARMUP_MONTHS, freq='M')[::-1]:
+            views.append((period.year, period.month))
+    return views
+
+
+def warm_income_expense_view(ds):
+    # Same inputs the page sends on first load: every year and every account selected
+    years = ds.available_years
+    filter_outputs = income_expense_filter_options(year_set_aggregate(ds, years), years)
+    build_income_expense_figure(
+        *filter_outputs[1::3], years, ['income', 'expense'], 'regression', 'month', None, None
+    )
+
+
+def warm_yearly_summary_view(year, month):
+    for view in (update_income_to_expense_gauge, update_cash_to_debt_gauge, update_debt_to_income_gauge,
+                 update_change_titles, update_income_overview, update_expense_overview,
+                 update_debt_overview, update_cash_overview, update_top5_expenses):
+        view(year, month)
+    for view in (update_income_expense_ratio, update_cash_to_debt_ratio, update_summary_title):
+        view(year)
+    # Background jobs fork from this process, so they start with the forecast already built
+    year_end_forecast(get_dataset())
+    update_top5_purchases(year, month, 'amount', top_n_options[0])
+    update_rolling_ratios(12, year)
+    update_net_worth_history('total', year)
+
+    # Charts whose filters are filled in by another callback get the values it would send
+    _, income_accounts, _ = update_income_type_options(year, month)
+    update_monthly_income_bar(year, month, income_accounts)
+    _, payments, _, utilities, _, categories = update_all_expense_breakdown_filters(year, month)
+    update_monthly_expenses(year, month, payments, utilities, categories, None, 0, None)
+
+
+def warm_up_views():
+    ds = get_dataset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(WARMUP_WORKERS, 1), thread_name_prefix='view-warmup') as pool:
+        futures = [pool.submit(warm_income_expense_view, ds)] + [
+            pool.submit(warm_yearly_summary_view, year, month) for year, month in warmup_year_months(ds)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                logger.exception("View warm-up failed for dataset version %s", ds.version)
+    logger.info("Warmed views for dataset version %s in %.2fs", ds.version, time.perf_counter() - started)
+
+
+def start_view_warmup():
+    if not VIEW_WARMUP or VIEW_CACHE_SIZE <= 0 or is_worker_process:
+        return None
+    thread = threading.Thread(target=warm_up_views, name='view-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+start_view_warmup()
+
+
+# === ADMIN ROUTES ===
+# With FINANCE_DASHBOARD_ADMIN_TOKEN set, admin routes need a matching X-Admin-Token header;
+# without it they only answer requests from this machine
+ADMIN_TOKEN = os.environ.get('FINANCE_DASHBOARD_ADMIN_TOKEN', '')
+
+
+def admin_authorized():
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(flask.request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+    return flask.request.remote_addr in ('127.0.0.1', '::1')
+
+
+@app.server.route('/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    if not admin_authorized():
+        flask.abort(403)
+
+    ds = get_dataset()
+    if flask.request.method == 'POST':
+        reload_dataset_in_background(force=flask.request.args.get('force') == '1')
+        return flask.jsonify(status='reloading', version=ds.version), 202
+
+    return flask.jsonify(
+        version=ds.version,
+        fingerprint=ds.fingerprint,
+        path=ds.path,
+        loaded_at=ds.loaded_at.isoformat(),
+        reloading=dataset_reload_lock.locked()
+    )
+
+
+# === PROFILING ===
+# Opt-in cProfile of callback requests: FINANCE_DASHBOARD_PROFILE=1 profiles every one, or an admin
+# adds ?profile=1 to a single /_dash-update-component request. Each profile is written to
+# FINANCE_DASHBOARD_PROFILE_DIR as <time>-<callback>-<inputs hash>.pstats (snakeviz or flameprof
+# turn it into a flame graph), next to a .json of the callback's inputs
+PROFILE_ALL = os.environ.get('FINANCE_DASHBOARD_PROFILE', '0') == '1'
+PROFILE_DIR = os.environ.get('FINANCE_DASHBOARD_PROFILE_DIR', os.path.join(DEFAULT_CACHE_DIR, 'profiles'))
+# From Python 3.12 cProfile hooks the whole interpreter, so only one request is profiled at a time
+# and requests that arrive meanwhile run unprofiled. The profile still records whatever other
+# request threads do while it runs, so profiles are only per-request on a single-threaded server
+profile_lock = threading.Lock()
+
+
+def profile_requested():
+    if flask.request.path != app.config.routes_pathname_prefix + '_dash-update-component':
+        return False
+    return PROFILE_ALL or (flask.request.args.get('profile') == '1' and admin_authorized())
+
+
+def callback_name(output):
+    callback = app.callback_map.get(output, {}).get('callback')
+    return getattr(callback, '__name__', None) or 'callback'
+
+
+@app.server.before_request
+def start_callback_profile():
+    if not profile_requested() or not profile_lock.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler (a debugger, or one enabled outside the dashboard) is already active
+        profile_lock.release()
+        logger.warning("Skipped profiling %s: another profiler is active", flask.request.path)
+        return
+    flask.g.profile_started = time.perf_counter()
+    flask.g.profiler = profiler
+
+
+@app.server.after_request
+def write_callback_profile(response):
+    profiler = flask.g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    profile_lock.release()
+    seconds = time.perf_counter() - flask.g.pop('profile_started')
+
+    body = flask.request.get_json(silent=True) or {}
+    callback = callback_name(body.get('output', ''))
+    inputs = {key: body.get(key, []) for key in ('inputs', 'state', 'changedPropIds')}
+    tag = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:10]
+    now = time.time()
+    name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}-{callback}-{tag}"
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}.pstats"))
+        with open(os.path.join(PROFILE_DIR, f"{name}.json"), 'w') as f:
+            json.dump({
+                'callback': callback,
+                'output': body.get('output'),
+                'status': response.status_code,
+                'seconds': round(seconds, 6),
+                **inputs
+            }, f, indent=2, default=str)
+        logger.info("Profiled %s (%.3fs) into %s.pstats", callback, seconds, os.path.join(PROFILE_DIR, name))
+    except OSError:
+        logger.warning("Could not write profile to %s", PROFILE_DIR, exc_info=True)
+    return response
+
+
+@app.server.teardown_request
+def abandon_callback_profile(error):
+    # A request that failed before its response was processed still has to free the profiler
+    profiler = flask.g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profile_lock.release()
+
+
+# === CALLBACK METRICS ===
+# Scan accounting per callback, totalled since startup; each request is also logged at debug level
+callback_metrics = {}
+callback_metrics_lock = threading.Lock()
+
+
+@app.server.before_request
+def start_scan_accounting():
+    if flask.request.path == app.config.routes_pathname_prefix + '_dash-update-component':
+        flask.g.scan_token = scan_stats.set({'rows_scanned': 0, 'filters': 0, 'groupbys': 0, 'temp_bytes': 0})
+
+
+@app.server.after_request
+def record_callback_metrics(response):
+    token = flask.g.pop('scan_token', None)
+    if token is None:
+        return response
+    stats = scan_stats.get()
+    scan_stats.reset(token)
+
+    callback = callback_name((flask.request.get_json(silent=True) or {}).get('output', ''))
+    logger.debug(
+        "%s scanned %s rows in %s filters and %s groupbys, %s temporary bytes",
+        callback, stats['rows_scanned'], stats['filters'], stats['groupbys'], stats['temp_bytes']
+    )
+    with callback_metrics_lock:
+        metrics = callback_metrics.setdefault(callback, {
+            'calls': 0, 'rows_scanned': 0, 'filters': 0, 'groupbys': 0, 'temp_bytes': 0, 'max_rows_scanned': 0
+        })
+        metrics['calls'] += 1
+        for key, value in stats.items():
+            metrics[key] += value
+        metrics['max_rows_scanned'] = max(metrics['max_rows_scanned'], stats['rows_scanned'])
+        metrics['last'] = stats
+    return response
+
+
+@app.server.route('/admin/metrics')
+def admin_metrics():
+    if not admin_authorized():
+        flask.abort(403)
+
+    with callback_metrics_lock:
+        callbacks = {
+            name: {
+                **metrics,
+                'mean_rows_scanned': metrics['rows_scanned'] / metrics['calls'],
+                'mean_filters': metrics['filters'] / metrics['calls'],
+                'mean_groupbys': metrics['groupbys'] / metrics['calls']
+            }
+            for name, metrics in sorted(callback_metrics.items())
+        }
+    return flask.jsonify(dataset_version=get_dataset().version, view_cache_entries=len(view_cache), callbacks=callbacks)
+
+
+# === MEMORY REPORT ===
+# Deep memory of the live snapshot and the in-process caches, to see which structures dominate on
+# small hosts. Available as GET /admin/memory and `python finance_dashboard.py memory-report`.
+def deep_nbytes(value, seen):
+    # Objects reachable from more than one structure are counted once, at their first owner
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(deep_nbytes(item, seen) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_nbytes(k, seen) + deep_nbytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_nbytes(item, seen) for item in value)
+    if isinstance(value, (str, bytes, int, float, bool, np.generic, pd.Timestamp)) or value is None:
+        return sys.getsizeof(value)
+    try:
+        # Figures and components: their pickled size is a fair estimate
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def process_rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def memory_report(ds):
+    seen = set()
+    structures = {}
+    columns = {}
+
+    def add(name, value):
+        if id(value) in seen:
+            return  # An alias of a structure already listed, e.g. ds.income_range_sums
+        structures[name] = deep_nbytes(value, seen)
+        if isinstance(value, pd.DataFrame):
+            usage = value.memory_usage(index=True, deep=True)
+            columns[name] = {str(col): int(nbytes) for col, nbytes in usage.items()}
+
+    for name, value in vars(ds).items():
+        if name == 'aggregates':
+            for key, aggregate in value.items():
+                add(f"aggregates.{key}", aggregate)
+        else:
+            add(name, value)
+    dataset_bytes = sum(structures.values())
+
+    add('palettes', [master_palette, income_colors_list, debt_colors_list, cash_colors_list, expense_colors_list])
+    with view_cache_lock:
+        add('view_cache', dict(view_cache))
+    accounted_bytes = sum(structures.values())
+    rss = process_rss_bytes()
+
+    return {
+        'dataset_version': ds.version,
+        'rows': ds.row_count,
+        'structures': dict(sorted(structures.items(), key=lambda item: -item[1])),
+        'columns': columns,
+        'dataset_bytes': dataset_bytes,
+        'accounted_bytes': accounted_bytes,
+        'process_rss_bytes': rss,
+        # Each worker process holds its own snapshot and caches, so size hosts by this times the worker
+        # count (less the shared pages when the tables are memory-mapped from an Arrow snapshot)
+        'per_worker_estimate_bytes': max(rss, accounted_bytes)
+    }
+
+
+def format_memory_report(report):
+    def mib(nbytes):
+        return f"{nbytes / 2 ** 20:10.2f} MiB"
+
+    lines = [f"Dataset version {report['dataset_version']}, {report['rows']:,} rows", ""]
+    for name, nbytes in report['structures'].items():
+        lines.append(f"{mib(nbytes)}  {name}")
+        for col, col_bytes in sorted(report['columns'].get(name, {}).items(), key=lambda item: -item[1]):
+            lines.append(f"{mib(col_bytes)}      {col}")
+    lines += [
+        "",
+        f"{mib(report['dataset_bytes'])}  dataset total",
+        f"{mib(report['accounted_bytes'])}  accounted total (dataset, palettes, view cache)",
+        f"{mib(report['process_rss_bytes'])}  process resident set",
+        f"{mib(report['per_worker_estimate_bytes'])}  estimate per worker"
+    ]
+    return "\n".join(lines)
+
+
+@app.server.route('/admin/memory')
+def admin_memory():
+    if not admin_authorized():
+        flask.abort(403)
+    return flask.jsonify(memory_report(get_dataset()))
+
+
 if __name__ == '__main__':
+    if sys.argv[1:] == ['memory-report']:
+        # Report after the startup warm-up, so the view cache is as a first visitor leaves it
+        for thread in threading.enumerate():
+            if thread.name == 'view-warmup':
+                thread.join()
+        print(format_memory_report(memory_report(get_dataset())))
+        sys.exit(0)
     app.run(host='127.0.0.1', debug=True)
 ###
 
@@ -0,0 +1,298 @@
+# Regression test for holding amounts as int64 cents: every KPI callback, run on the sample file,
+# must report the same amounts (to the cent) as a float64 computation straight from the CSV.
+# Display strings round to whole dollars, where exact cents and float sums can legitimately
+# land on different sides of a .5, so amounts are compared as they reach to_dollars().
+import inspect
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_FILE = os.path.join(REPO_DIR, 'Test Financial Data.csv')
+
+os.environ['FINANCE_DASHBOARD_DATA'] = SAMPLE_FILE
+os.environ['FINANCE_DASHBOARD_CACHE_DIR'] = ''
+os.environ['FINANCE_DASHBOARD_WARMUP'] = '0'
+sys.path.insert(0, REPO_DIR)
+
+import finance_dashboard as fd  # noqa: E402
+
+CENT = 0.005  # Half a cent: amounts must agree once rounded to cents
+
+
+# === FLOAT64 REFERENCE ===
+def load_reference():
+    df = pd.read_csv(SAMPLE_FILE)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df['Amount'] = pd.to_numeric(df['Amount'].replace({',': '', '$': ''}, regex=True), errors='coerce')
+    df = df.dropna(subset=['Amount', 'Date'])
+    df['Description (Transaction Detail)'] = df['Description (Transaction Detail)'].astype(str)
+
+    frames = {}
+    for name, categories in fd.CATEGORY_FRAMES.items():
+        subset = df[df['Category'].isin(categories)].copy()
+        if set(categories) <= set(fd.OUTFLOW_CATEGORIES):
+            subset['Amount'] = -subset['Amount']
+        frames[name] = subset
+    frames['df'] = df
+    return frames
+
+
+REF = load_reference()
+YEARS = sorted(REF['df']['Date'].dt.year.unique().tolist())
+LATEST_YEAR = max(YEARS)
+PERIODS = [(year, month) for year in YEARS + [min(YEARS) - 1] for month in range(13)]
+
+
+def period(name, year, month=0):
+    data = REF[name]
+    mask = data['Date'].dt.year == year
+    if month:
+        mask &= data['Date'].dt.month == month
+    return data[mask]
+
+
+def previous_period(name, year, month):
+    return period(name, year - 1, 12) if month == 1 else period(name, year, month - 1)
+
+
+def ref_flow_overview(name, year, month, absolute):
+    # Total, monthly average and change for income or expenses (update_income/expense_overview)
+    current = period(name, year)
+    if month == 0:
+        if current.empty:
+            return []
+        latest_month = current['Date'].dt.month.max()
+        months = latest_month if year == LATEST_YEAR else 12
+        total = current.loc[current['Date'].dt.month <= latest_month, 'Amount'].sum()
+        amounts = [abs(total), abs(total / months)] if absolute else [total, total / months]
+        prev = period(name, year - 1)
+        if not prev.empty:
+            amounts.append(total - prev.loc[prev['Date'].dt.month <= latest_month, 'Amount'].sum())
+        return amounts
+
+    total = period(name, year, month)['Amount'].sum()
+    prev_total = previous_period(name, year, month)['Amount'].sum()
+    amounts = [abs(total)] * 2 if absolute else [total] * 2
+    if prev_total > 0:
+        amounts.append(total - prev_total)
+    return amounts
+
+
+def ref_debt_overview(year, month):
+    if month == 0:
+        current = period('debt_data', year)
+        if current.empty:
+            return []
+        latest_month = current['Date'].dt.month.max()
+        snapshot = current[current['Date'].dt.month == latest_month]
+        prev = period('debt_data', year - 1, latest_month)
+    else:
+        snapshot = period('debt_data', year, month)
+        prev = previous_period('debt_data', year, month)
+
+    total = snapshot['Amount'].sum()
+    amounts = [abs(total)] + snapshot.loc[snapshot['Amount'] > 0, 'Amount'].tolist()
+    if not prev.empty:
+        amounts.append(total - prev['Amount'].sum())
+    return amounts
+
+
+def ref_cash_overview(year, month):
+    if month == 0:
+        current = period('cash_data', year)
+        if current.empty:
+            return []
+        snapshot = current[current['Date'].dt.month == current['Date'].dt.month.max()]
+        total = snapshot['Amount'].sum()
+        prev = period('cash_data', year - 1)
+        change = None
+        if not prev.empty:
+            prev_snapshot = prev[prev['Date'].dt.month == prev['Date'].dt.month.max()]
+            change = total - prev_snapshot['Amount'].sum()
+    else:
+        snapshot = period('cash_data', year, month)
+        total = snapshot['Amount'].sum()
+        prev_total = previous_period('cash_data', year, month)['Amount'].sum()
+        change = total - prev_total if prev_total > 0 else None
+
+    amounts = [total] + snapshot.loc[snapshot['Amount'] > 0, 'Amount'].tolist()
+    if change is not None:
+        amounts.append(change)
+    return amounts
+
+
+def ref_top5_expenses(year, month):
+    data = period('all_expense_data', year, month)
+    return data.groupby('Sub-Category (Account)')['Amount'].sum().nlargest(5).tolist()
+
+
+def ref_top_purchases(year, month, mode):
+    data = period('all_expense_data', year, month)
+    if data.empty:
+        return []
+    if mode == 'amount':
+        return data['Amount'].nlargest(5).tolist()
+
+    description = data['Description (Transaction Detail)']
+    blank = description.str.strip().str.lower().isin(['', 'nan'])
+    description = description.where(~blank, data['Sub-Category (Account)']).str.upper()
+    merchant = np.where(description.str.startswith(('AMAZO', 'AMZN')), 'Amazon', description.str[:5].str.capitalize())
+    grouped = data.groupby(merchant)['Amount'].agg(['sum', 'count'])
+    return grouped.sort_values(['count', 'sum'], ascending=[False, False]).head(5)['sum'].tolist()
+
+
+def ref_income_to_expense(year, month):
+    income, expense = period('income_data', year), period('all_expense_data', year)
+    if income.empty or expense.empty:
+        return None
+    if month == 0:
+        latest_month = min(income['Date'].dt.month.max(), expense['Date'].dt.month.max())
+        income_total = income.loc[income['Date'].dt.month <= latest_month, 'Amount'].sum()
+        expense_total = expense.loc[expense['Date'].dt.month <= latest_month, 'Amount'].sum()
+    else:
+        income_total = income.loc[income['Date'].dt.month == month, 'Amount'].sum()
+        expense_total = expense.loc[expense['Date'].dt.month == month, 'Amount'].sum()
+    return 2 if expense_total == 0 else income_total / expense_total
+
+
+def ref_debt_to_income(year, month):
+    income_total = period('income_data', year, month)['Amount'].sum()
+    payments_total = period('payment_data', year, month)['Amount'].sum()
+    return 1 if income_total == 0 else payments_total / income_total
+
+
+def ref_cash_to_debt(year, month):
+    cash, debt = period('cash_data', year), period('debt_data', year)
+    if cash.empty or debt.empty:
+        return None
+    latest_month = month or min(cash['Date'].dt.month.max(), debt['Date'].dt.month.max())
+    current_cash = cash.loc[cash['Date'].dt.month == latest_month, 'Amount'].sum()
+    current_debt = abs(debt.loc[debt['Date'].dt.month == latest_month, 'Amount'].sum())
+    return 2 if current_debt == 0 else current_cash / current_debt
+
+
+# === INT64-CENTS PATH ===
+@pytest.fixture
+def displayed(monkeypatch):
+    # Every amount a callback converts for display, in cents, in call order
+    amounts = []
+    to_dollars = fd.to_dollars
+
+    def record(cents):
+        amounts.extend(np.atleast_1d(np.asarray(cents, dtype=np.float64)).tolist())
+        return to_dollars(cents)
+
+    monkeypatch.setattr(fd, 'to_dollars', record)
+    return amounts
+
+
+def run(callback, *args):
+    # The undecorated callback, so the view cache cannot answer instead of the code under test
+    return inspect.unwrap(callback)(*args)
+
+
+def assert_amounts(displayed, expected):
+    got = sorted(cents / 100 for cents in displayed)
+    np.testing.assert_allclose(got, sorted(expected), rtol=0, atol=CENT)
+
+
+def test_amounts_parse_to_exact_cents():
+    ds = fd.get_dataset()
+    assert ds.df['Amount'].dtype == np.int64
+    np.testing.assert_array_equal(ds.df['Amount'].to_numpy(), np.round(REF['df']['Amount'].to_numpy() * 100))
+
+
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_income_overview(displayed, year, month):
+    run(fd.update_income_overview, year, month)
+    assert_amounts(displayed, ref_flow_overview('income_data', year, month, absolute=False))
+
+
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_expense_overview(displayed, year, month):
+    run(fd.update_expense_overview, year, month)
+    assert_amounts(displayed, ref_flow_overview('all_expense_data', year, month, absolute=True))
+
+
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_debt_overview(displayed, year, month):
+    run(fd.update_debt_overview, year, month)
+    assert_amounts(displayed, ref_debt_overview(year, month))
+
+
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_cash_overview(displayed, year, month):
+    run(fd.update_cash_overview, year, month)
+    assert_amounts(displayed, ref_cash_overview(year, month))
+
+
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_top5_expenses(displayed, year, month):
+    run(fd.update_top5_expenses, year, month)
+    assert_amounts(displayed, ref_top5_expenses(year, month))
+
+
+@pytest.mark.parametrize('mode', ['amount', 'frequency'])
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_top_purchases(displayed, year, month, mode):
+    run(fd.update_top5_purchases, year, month, mode)
+    assert_amounts(displayed, ref_top_purchases(year, month, mode))
+
+
+@pytest.mark.parametrize('callback,reference', [
+    (fd.update_income_to_expense_gauge, ref_income_to_expense),
+    (fd.update_debt_to_income_gauge, ref_debt_to_income),
+    (fd.update_cash_to_debt_gauge, ref_cash_to_debt)
+], ids=['income-to-expense', 'debt-to-income', 'cash-to-debt'])
+@pytest.mark.parametrize('year,month', PERIODS)
+def test_ratio_gauges(callback, reference, year, month):
+    fig = run(callback, year, month)
+    expected = reference(year, month)
+    if expected is None:
+        assert not fig.data
+    else:
+        assert fig.data[0].value == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize('year', YEARS)
+def test_ratio_displays(year):
+    income, expense = period('income_data', year), period('all_expense_data', year)
+    latest_month = max(income['Date'].dt.month.max(), expense['Date'].dt.month.max())
+    expected = (
+        income.loc[income['Date'].dt.month <= latest_month, 'Amount'].sum()
+        / expense.loc[expense['Date'].dt.month <= latest_month, 'Amount'].sum()
+    )
+    assert float(run(fd.update_income_expense_ratio, year).children) == pytest.approx(expected, abs=0.005)
+
+    cash, debt = period('cash_data', year), period('debt_data', year)
+    latest_month = cash['Date'].dt.month.max()
+    expected = (
+        cash.loc[cash['Date'].dt.month == latest_month, 'Amount'].sum()
+        / debt.loc[debt['Date'].dt.month == latest_month, 'Amount'].sum()
+    )
+    assert float(run(fd.update_cash_to_debt_ratio, year).children) == pytest.approx(expected, abs=0.005)
+
+
+@pytest.mark.parametrize('start,end', [
+    ('2018-01-01', '2025-04-01'),
+    ('2020-02-15', '2020-11-30'),
+    ('2024-12-31', '2025-01-01'),
+    ('2022-06-10', '2022-06-10')
+])
+def test_range_kpis(displayed, start, end):
+    ds = fd.get_dataset()
+    run(
+        fd.update_range_kpis, start, end, ds.income_type_sorted,
+        ds.sorted_payments, ds.sorted_utilities_insurance, ds.sorted_expenses
+    )
+
+    def total(name):
+        data = REF[name]
+        return data.loc[(data['Date'] >= start) & (data['Date'] <= end), 'Amount'].sum()
+
+    income, expense = total('income_data'), total('all_expense_data')
+    assert_amounts(displayed, [income, expense, income - expense])